@@ -0,0 +1,242 @@
+# banco_decks.py
+import argparse, hashlib, json, math, os, random, re, sys, time
+from conexoes import ConexoesSQLite, transacao
+from similares import filtrar_quase_iguais
+from texto import limpar_texto, normalizar_pergunta
+
+# -------------------- Banco local de decks --------------------
+# Guarda todo deck gerado com sucesso (e os importados em lote), com índice
+# FTS5 por trigramas sobre perguntas e termos. "Gerar Desafio" consulta o banco
+# antes de chamar o Gemini: conteúdo de edital é finito e se repete muito.
+# Duas perguntas só são "a mesma" pelas palavras de conteúdo: sem palavras
+# vazias e sem o molde da pergunta ("Quais são os ... da"), com peso IDF do
+# próprio banco, e a palavra mais distintiva da pergunta tem de estar no deck.
+# Assim "poderes da Administração Pública" não recebe o deck dos princípios.
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS decks (
+    id            INTEGER PRIMARY KEY,
+    pergunta      TEXT NOT NULL,
+    pergunta_norm TEXT NOT NULL,
+    modelo        TEXT,
+    pares         TEXT NOT NULL,
+    qtd           INTEGER NOT NULL,
+    hash          TEXT NOT NULL UNIQUE,
+    criado_em     REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS decks_fts USING fts5(
+    pergunta_norm, termos, content='decks', content_rowid='id', tokenize='trigram'
+);
+CREATE TABLE IF NOT EXISTS palavras (
+    palavra TEXT PRIMARY KEY,
+    decks   INTEGER NOT NULL
+);
+"""
+
+LIMIAR_SIMILARIDADE = 0.6
+MAX_CANDIDATOS = 50
+MAX_DECKS_REUNIDOS = 1000
+
+# Palavras vazias e o molde das perguntas, já sem acento (ver normalizar_pergunta)
+PALAVRAS_VAZIAS = frozenset("""
+a o as os um uma uns umas de da do das dos em na no nas nos ao aos e ou que se sua seu suas seus
+qual quais quem como quando onde porque por para pelo pela pelos pelas com sem sobre entre acerca
+sao ser esta estao este esse essa isso isto ha mais menos muito muitos principais
+explique explica defina cite liste descreva diga fale quero saber me respeito relacao
+""".split())
+
+def _radical(p: str) -> str:
+    # Plural -> singular, o bastante para "princípios" casar com "princípio"
+    if p.isdigit() or len(p) <= 3:
+        return p
+    for fim, troca in (("oes", "ao"), ("aes", "ao"), ("ais", "al"), ("eis", "el")):
+        if p.endswith(fim):
+            return p[:-3] + troca
+    if p.endswith(("res", "zes", "ses")) and len(p) > 4:
+        return p[:-2]
+    return p[:-1] if p.endswith("s") else p
+
+def _palavras(pergunta_norm: str) -> list:
+    texto = re.sub(r"(?<=\d)[.](?=\d)", "", pergunta_norm)  # "8.112" -> "8112"
+    return [p for p in "".join(ch if ch.isalnum() else " " for ch in texto).split()
+            if p not in PALAVRAS_VAZIAS and (len(p) >= 2 or p.isdigit())]
+
+def palavras_chave(pergunta_norm: str) -> set:
+    """Palavras de conteúdo (radicais) de uma pergunta já normalizada."""
+    return {_radical(p) for p in _palavras(pergunta_norm)}
+
+def similaridade(a: str, b: str, peso=None) -> float:
+    """
+    Jaccard ponderado das palavras de conteúdo de duas perguntas já normalizadas;
+    `peso(palavra)` é o IDF (padrão: 1 para todas).
+    """
+    pa, pb = palavras_chave(a), palavras_chave(b)
+    if not pa or not pb:
+        return 0.0
+    peso = peso or (lambda p: 1.0)
+    return sum(peso(p) for p in pa & pb) / sum(peso(p) for p in pa | pb)
+
+def _consulta_fts(pergunta_norm: str) -> str:
+    # Palavras de conteúdo com 3+ letras (o tokenizer de trigramas ignora as menores), em OR
+    palavras = {p for p in _palavras(pergunta_norm) if len(p) >= 3}
+    return " OR ".join(f'"{p}"' for p in sorted(palavras))
+
+class BancoDecks:
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self._conexao = ConexoesSQLite(caminho)
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        self._conexao().executescript(_ESQUEMA)
+        self._contar_palavras_se_preciso()
+
+    def _contar_palavras_se_preciso(self):
+        # Banco de antes da tabela `palavras`: conta a frequência de cada palavra uma vez
+        with transacao(self._conexao()) as con:
+            if con.execute("SELECT 1 FROM palavras LIMIT 1").fetchone() or not con.execute("SELECT 1 FROM decks LIMIT 1").fetchone():
+                return
+            for (norm,) in con.execute("SELECT pergunta_norm FROM decks").fetchall():
+                self._contar_palavras(con, norm)
+
+    def _contar_palavras(self, con, pergunta_norm: str):
+        con.executemany(
+            "INSERT INTO palavras (palavra, decks) VALUES (?, 1) "
+            "ON CONFLICT (palavra) DO UPDATE SET decks = decks + 1",
+            [(p,) for p in palavras_chave(pergunta_norm)],
+        )
+
+    def _idf(self, con, palavras) -> tuple:
+        """({palavra: IDF suavizado}, {palavra: nº de decks}): raras pesam mais; desconhecidas, o máximo."""
+        total = con.execute("SELECT COUNT(*) FROM decks").fetchone()[0]
+        palavras = list(palavras)
+        df = dict(con.execute(
+            f"SELECT palavra, decks FROM palavras WHERE palavra IN ({','.join('?' * len(palavras))})", palavras
+        ).fetchall()) if palavras else {}
+        return {p: math.log((total + 1) / (df.get(p, 0) + 1)) + 1 for p in palavras}, df
+
+    def _inserir(self, con, pergunta: str, modelo, pares) -> bool:
+        pergunta = limpar_texto(pergunta)
+        norm = normalizar_pergunta(pergunta)
+        dados = json.dumps([[t, c] for t, c in pares], ensure_ascii=False)
+        digest = hashlib.sha256(f"{norm}\x1f{dados}".encode("utf-8")).hexdigest()
+        cur = con.execute(
+            "INSERT OR IGNORE INTO decks (pergunta, pergunta_norm, modelo, pares, qtd, hash, criado_em) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (pergunta, norm, modelo, dados, len(pares), digest, time.time()),
+        )
+        if not cur.rowcount:
+            return False  # deck idêntico já está no banco
+        termos = " ".join(normalizar_pergunta(t) for t, _ in pares)
+        con.execute(
+            "INSERT INTO decks_fts (rowid, pergunta_norm, termos) VALUES (?, ?, ?)",
+            (cur.lastrowid, norm, termos),
+        )
+        self._contar_palavras(con, norm)
+        return True
+
+    def adicionar(self, pergunta: str, pares, modelo: str | None = None) -> bool:
+        """Guarda um deck [(termo, conceito), ...]; retorna False se já existia."""
+        with transacao(self._conexao()) as con:
+            return self._inserir(con, pergunta, modelo, list(pares))
+
+    def buscar(self, pergunta: str, min_pares: int, limiar: float = LIMIAR_SIMILARIDADE):
+        """
+        Deck parecido o bastante com a pergunta e com pelo menos `min_pares` pares.
+        Entre os candidatos acima do limiar escolhe um ao acaso (variedade entre
+        cliques) e sorteia `min_pares` pares dele. Retorna [(termo, conceito), ...] ou None.
+        """
+        norm = normalizar_pergunta(pergunta)
+        consulta = _consulta_fts(norm)
+        chave = palavras_chave(norm)
+        if not consulta or not chave:
+            return None
+        con = self._conexao()
+        linhas = con.execute(
+            "SELECT d.pergunta_norm, d.pares FROM decks_fts f JOIN decks d ON d.id = f.rowid "
+            "WHERE decks_fts MATCH ? AND d.qtd >= ? ORDER BY bm25(decks_fts) LIMIT ?",
+            (consulta, int(min_pares), MAX_CANDIDATOS),
+        ).fetchall()
+        if not linhas:
+            return None
+        idf, df = self._idf(con, chave.union(*(palavras_chave(pnorm) for pnorm, _ in linhas)))
+        # As palavras mais raras da pergunta (entre as que o banco conhece) são o assunto: têm de estar no deck
+        conhecidas = [p for p in chave if df.get(p)]
+        if not conhecidas:
+            return None
+        topo = max(idf[p] for p in conhecidas)
+        distintivas = {p for p in conhecidas if idf[p] >= topo - 1e-9}
+        bons = [dados for pnorm, dados in linhas
+                if distintivas <= palavras_chave(pnorm) and similaridade(norm, pnorm, idf.get) >= limiar]
+        if not bons:
+            return None
+        pares = [(t, c) for t, c in json.loads(random.choice(bons))]
+        return random.sample(pares, int(min_pares))
+
+    def reunir(self, pergunta: str, max_pares: int):
+        """
+        Deck grande para revisão: junta pares de todos os decks cujo índice (pergunta
+        ou termos) casa com a pergunta, dos mais relevantes para os menos, sem termos
+        repetidos nem quase iguais, até `max_pares`. Retorna [(termo, conceito), ...] (pode vir vazio).
+        """
+        consulta = _consulta_fts(normalizar_pergunta(pergunta))
+        if not consulta:
+            return []
+        linhas = self._conexao().execute(
+            "SELECT d.pares FROM decks_fts f JOIN decks d ON d.id = f.rowid "
+            "WHERE decks_fts MATCH ? ORDER BY bm25(decks_fts) LIMIT ?",
+            (consulta, MAX_DECKS_REUNIDOS),
+        )
+        candidatos = []
+        vistos = set()
+        for (dados,) in linhas:
+            for t, c in json.loads(dados):
+                chave = normalizar_pergunta(t)
+                if chave in vistos:
+                    continue
+                vistos.add(chave)
+                candidatos.append((t, c))
+        # Decks de perguntas diferentes repetem o mesmo conteúdo com outras palavras
+        return filtrar_quase_iguais(candidatos, max_pares)
+
+    def importar_jsonl(self, arquivo) -> int:
+        """Importa decks {"pergunta", "modelo"?, "pares": [{"termo", "conceito"}]} em uma transação."""
+        novos = 0
+        with transacao(self._conexao()) as con:
+            for linha in arquivo:
+                if not linha.strip():
+                    continue
+                deck = json.loads(linha)
+                pares = [(limpar_texto(p["termo"]), limpar_texto(p["conceito"])) for p in deck["pares"]]
+                novos += self._inserir(con, deck["pergunta"], deck.get("modelo"), pares)
+        return novos
+
+    def exportar_jsonl(self, arquivo) -> int:
+        total = 0
+        for pergunta, modelo, dados in self._conexao().execute("SELECT pergunta, modelo, pares FROM decks ORDER BY id"):
+            pares = [{"termo": t, "conceito": c} for t, c in json.loads(dados)]
+            arquivo.write(json.dumps({"pergunta": pergunta, "modelo": modelo, "pares": pares}, ensure_ascii=False) + "\n")
+            total += 1
+        return total
+
+    def total(self) -> int:
+        return self._conexao().execute("SELECT COUNT(*) FROM decks").fetchone()[0]
+
+# -------------------- CLI: importação/exportação em lote --------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importa/exporta o banco local de decks (JSONL).")
+    parser.add_argument("acao", choices=["importar", "exportar"])
+    parser.add_argument("arquivo", help="Arquivo JSONL ('-' para stdin/stdout)")
+    parser.add_argument("--banco", default=os.getenv("JOGO_BANCO_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "banco.sqlite3")))
+    args = parser.parse_args(argv)
+
+    banco = BancoDecks(args.banco)
+    if args.acao == "importar":
+        with (sys.stdin if args.arquivo == "-" else open(args.arquivo, encoding="utf-8")) as f:
+            print(f"{banco.importar_jsonl(f)} deck(s) novo(s); {banco.total()} no banco.")
+    else:
+        with (sys.stdout if args.arquivo == "-" else open(args.arquivo, "w", encoding="utf-8")) as f:
+            n = banco.exportar_jsonl(f)
+        if args.arquivo != "-":
+            print(f"{n} deck(s) exportado(s).")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+# benchmark.py
+import argparse, json, os, pickle, platform, random, statistics, sys, tempfile, time
+
+# -------------------- Benchmark offline --------------------
+# Mede o jogo sem chave nem rede: o genai.GenerativeModel é trocado por um
+# modelo gravado que repete respostas reais (inclusive as malformadas) com
+# latência configurável. Resultados em JSON; --comparar aponta regressões.
+#
+#   python benchmark.py --saida base.json
+#   python benchmark.py --comparar base.json --tolerancia 0.25
+
+_SILABAS = ("ba", "ce", "di", "fo", "gu", "la", "me", "ni", "po", "ru", "sa", "te", "vi", "xo", "za")
+
+def _deck(n: int, prefixo: str = "Termo") -> list:
+    # Conceitos com palavras sorteadas (semente fixa): diferentes o bastante para não caírem como quase iguais
+    rng = random.Random(n)
+    frase = lambda: " ".join("".join(rng.choice(_SILABAS) for _ in range(3)) for _ in range(6))
+    return [{"termo": f"{prefixo} {i}", "conceito": f"Conceito   número {i}: {frase()}, com  espaços\nsobrando."} for i in range(n)]
+
+def _json(itens) -> str:
+    return json.dumps(itens, ensure_ascii=False)
+
+# Tipos de resposta vistos na prática (o último é o caso feliz do modo JSON)
+RESPOSTAS_GRAVADAS = {
+    "ok": _json(_deck(6)),
+    "markdown": "```json\n" + _json(_deck(6)) + "\n```",
+    "texto_em_volta": "Claro! Seguem os pares:\n" + _json(_deck(6)) + "\nBons estudos!",
+    "truncado": _json(_deck(6))[:-60],
+    "duplicados": _json(_deck(3) + _deck(3) + [{"termo": "termo 0", "conceito": "Repetido em outra caixa."}]),
+    "conceito_longo": _json([{"termo": f"Termo {i}", "conceito": "Texto muito longo. " * 30} for i in range(6)]),
+    "poucos": _json(_deck(2)),
+    "nao_json": "Desculpe, não posso ajudar com isso.",
+    "vazio": "",
+    "grande": _json(_deck(100)),
+}
+
+class _Uso:
+    def __init__(self, entrada: int, saida: int):
+        self.prompt_token_count = entrada
+        self.candidates_token_count = saida
+
+class _Resposta:
+    def __init__(self, texto: str, uso=None):
+        self.text = texto
+        self.usage_metadata = uso
+
+class GeminiGravado:
+    """
+    Substituto do genai.GenerativeModel: devolve as respostas gravadas em ordem
+    circular, dormindo `latencia` segundos por chamada (no streaming, até o
+    primeiro pedaço; depois `latencia_pedaco` entre pedaços).
+    """
+    respostas = [RESPOSTAS_GRAVADAS["ok"]]
+    latencia = 0.0
+    latencia_pedaco = 0.0
+    tamanho_pedaco = 40
+
+    def __init__(self, model_name: str = "gemini-1.5-flash", **_):
+        self.model_name = model_name
+        self._client = None
+        self._proxima = 0
+
+    def _texto(self) -> str:
+        texto = self.respostas[self._proxima % len(self.respostas)]
+        self._proxima += 1
+        return texto
+
+    def generate_content(self, prompt, generation_config=None, stream=False, **_):
+        texto = self._texto()
+        uso = _Uso(len(str(prompt)) // 4, len(texto) // 4)
+        time.sleep(self.latencia)
+        if not stream:
+            return _Resposta(texto, uso)
+        return self._pedacos(texto, uso)
+
+    def _pedacos(self, texto: str, uso):
+        n = self.tamanho_pedaco
+        for i in range(0, max(len(texto), 1), n):
+            if i:
+                time.sleep(self.latencia_pedaco)
+            yield _Resposta(texto[i:i + n], uso if i + n >= len(texto) else None)
+
+def instalar_gemini_gravado():
+    """Troca genai.GenerativeModel pelo GeminiGravado (clientes_gemini o busca na hora)."""
+    import google.generativeai as genai
+    genai.GenerativeModel = GeminiGravado
+
+def preparar_ambiente(prefixo: str = "jogo-bench-") -> str:
+    """Isola o jogo num diretório temporário, sem chave real e com o Gemini gravado; retorna o diretório."""
+    tmp = tempfile.mkdtemp(prefix=prefixo)
+    os.environ["GOOGLE_API_KEY"] = "benchmark"
+    os.environ["JOGO_CHAVES_RPM"] = "0"  # o Gemini gravado não tem cota
+    os.environ.pop("GOOGLE_API_KEYS", None)
+    for var, arquivo in (("JOGO_CACHE_PATH", "cache.sqlite3"), ("JOGO_BANCO_PATH", "banco.sqlite3"),
+                         ("JOGO_REVISAO_PATH", "revisao.sqlite3"), ("JOGO_EVENTOS_PATH", "eventos.sqlite3")):
+        os.environ[var] = os.path.join(tmp, arquivo)
+    for var in ("JOGO_METRICAS_ARQUIVO", "JOGO_METRICAS_PORTA", "JOGO_DEBUG"):
+        os.environ.pop(var, None)
+    instalar_gemini_gravado()
+    return tmp
+
+# -------------------- Medição --------------------
+def _medir(fn, repeticoes: int, aquecimento: int = 3) -> dict:
+    for _ in range(aquecimento):
+        fn()
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        fn()
+        tempos.append(time.perf_counter() - inicio)
+    return _estatisticas(tempos)
+
+def _estatisticas(tempos) -> dict:
+    tempos = sorted(tempos)
+    q = lambda p: tempos[min(len(tempos) - 1, int(p * len(tempos)))]
+    return {
+        "n": len(tempos),
+        "media_s": statistics.fmean(tempos),
+        "p50_s": q(0.5),
+        "p95_s": q(0.95),
+        "p99_s": q(0.99),
+        "max_s": tempos[-1],
+        "ops_s": len(tempos) / sum(tempos) if sum(tempos) else float("inf"),
+    }
+
+def bench_interpretar(repeticoes: int) -> dict:
+    """Pipeline extração/limpeza/deduplicação por tipo de resposta."""
+    from nucleo import interpretar_resposta
+    resultados = {}
+    for tipo, texto in RESPOSTAS_GRAVADAS.items():
+        r = _medir(lambda: interpretar_resposta(texto), repeticoes)
+        pares, motivo = interpretar_resposta(texto)
+        r.update(pares=len(pares), motivo=motivo, bytes=len(texto.encode("utf-8")))
+        resultados[f"interpretar/{tipo}"] = r
+    return resultados
+
+def bench_limpar_texto(repeticoes: int) -> dict:
+    from texto import limpar_texto, normalizar_pergunta
+    curto = "  Princípio   da\nlegalidade  "
+    longo = "Texto muito   longo,\tcom espaços\n sobrando. " * 40
+    return {
+        "limpar_texto/curto": _medir(lambda: limpar_texto(curto), repeticoes * 10),
+        "limpar_texto/longo": _medir(lambda: limpar_texto(longo), repeticoes),
+        "normalizar_pergunta": _medir(lambda: normalizar_pergunta(curto), repeticoes * 10),
+    }
+
+def bench_tabuleiro(repeticoes: int) -> dict:
+    """Montagem do payload do componente (o antigo html_code) e o tamanho enviado ao navegador."""
+    from nucleo import dados_tabuleiro
+    resultados = {}
+    for n in (6, 10, 100, 500):
+        pares = [(p["termo"], p["conceito"]) for p in _deck(n)]
+        termos = [t for t, _ in pares]
+        conceitos = [c for _, c in pares]
+        random.Random(n).shuffle(conceitos)
+        gabarito = dict(pares)
+        montar = lambda: json.dumps(dados_tabuleiro(termos, conceitos, gabarito), ensure_ascii=False)
+        r = _medir(montar, max(10, repeticoes // (1 + n // 100)))
+        r["bytes"] = len(montar().encode("utf-8"))
+        resultados[f"tabuleiro/{n}_pares"] = r
+    return resultados
+
+def bench_geracao(repeticoes: int) -> dict:
+    """gerar_pares/gerar_pares_stream contra o modelo gravado (latência simulada incluída)."""
+    from nucleo import ErroGeracao, gerar_pares, gerar_pares_stream
+    resultados = {}
+    cenarios = {
+        "ok": [RESPOSTAS_GRAVADAS["ok"]],
+        "com_reparo": [RESPOSTAS_GRAVADAS["poucos"], RESPOSTAS_GRAVADAS["ok"]],
+        "falha": [RESPOSTAS_GRAVADAS["nao_json"]],
+    }
+    for nome, respostas in cenarios.items():
+        model = GeminiGravado()
+        model.respostas = respostas
+
+        def bloqueante():
+            model._proxima = 0
+            try:
+                gerar_pares(model, "Princípios da administração pública", 6)
+            except ErroGeracao:
+                pass
+
+        def stream():
+            model._proxima = 0
+            try:
+                for _ in gerar_pares_stream(model, "Princípios da administração pública", 6):
+                    pass
+            except ErroGeracao:
+                pass
+
+        resultados[f"gerar_pares/{nome}"] = _medir(bloqueante, repeticoes, aquecimento=1)
+        resultados[f"gerar_pares_stream/{nome}"] = _medir(stream, repeticoes, aquecimento=1)
+    return resultados
+
+def bench_reruns(repeticoes: int) -> dict:
+    """Tempo de rerun ponta a ponta do jogo.py no AppTest: abertura, Gerar (com e sem streaming), reembaralhar."""
+    from streamlit.testing.v1 import AppTest
+    caminho = os.path.join(os.path.dirname(os.path.abspath(__file__)), "jogo.py")
+    tempos = {"abrir": [], "gerar_stream": [], "gerar": [], "reembaralhar": []}
+
+    def cronometrar(nome, fn):
+        inicio = time.perf_counter()
+        at = fn()
+        tempos[nome].append(time.perf_counter() - inicio)
+        if at.exception:
+            raise RuntimeError(f"{nome}: {at.exception[0].message}")
+        return at
+
+    for i in range(repeticoes):
+        at = AppTest.from_file(caminho, default_timeout=60)
+        at = cronometrar("abrir", at.run)
+        at.checkbox[3].uncheck()  # sem banco: sempre passa pela geração
+        at.text_input[0].input(f"Pergunta de benchmark {i}")
+        at = cronometrar("gerar_stream", at.button[0].click().run)
+        at.checkbox[2].uncheck()
+        at.text_input[0].input(f"Pergunta de benchmark {i} sem streaming")
+        at = cronometrar("gerar", at.button[0].click().run)
+        at = cronometrar("reembaralhar", at.button[1].click().run)
+    resultados = {f"rerun/{nome}": _estatisticas(t) for nome, t in tempos.items()}
+    # O que cada sessão guarda do desafio (o deck em si fica no armazém do processo)
+    resultados["rerun/reembaralhar"]["bytes_desafio"] = len(pickle.dumps(at.session_state["desafio"]))
+    return resultados
+
+# Módulos que a interface e o lote carregam; nenhum deve puxar a SDK do Gemini
+MODULOS_IMPORTACAO = ("texto", "metricas", "nucleo", "decks", "eventos", "chaves", "clientes_gemini", "cache_pares", "banco_decks",
+                      "revisao", "prefetch", "lote", "google.generativeai", "streamlit")
+
+def bench_importacao(repeticoes: int) -> dict:
+    """Import a frio de cada módulo (processo novo, -X importtime) e se a SDK veio junto."""
+    import subprocess
+    raiz = os.path.dirname(os.path.abspath(__file__))
+    resultados = {}
+    for modulo in MODULOS_IMPORTACAO:
+        tempos, sdk = [], False
+        for _ in range(max(3, repeticoes // 40)):
+            proc = subprocess.run(
+                [sys.executable, "-X", "importtime", "-W", "ignore", "-c",
+                 f"import sys, {modulo}; print('google.generativeai' in sys.modules)"],
+                cwd=raiz, capture_output=True, text=True, check=True,
+            )
+            sdk = proc.stdout.strip() == "True"
+            # última linha do importtime: "import time: self | cumulativo | módulo"
+            linha = [l for l in proc.stderr.splitlines() if l.startswith("import time:") and l.rstrip().endswith(modulo.split(".")[-1])][-1]
+            tempos.append(int(linha.split("|")[1]) / 1e6)
+        r = _estatisticas(tempos)
+        r["sdk_gemini"] = sdk
+        resultados[f"importacao/{modulo}"] = r
+    return resultados
+
+ETAPAS = {
+    "importacao": bench_importacao,
+    "interpretar": bench_interpretar,
+    "limpar_texto": bench_limpar_texto,
+    "tabuleiro": bench_tabuleiro,
+    "geracao": bench_geracao,
+    "reruns": bench_reruns,
+}
+
+# -------------------- Comparação --------------------
+def comparar(base: dict, atual: dict, tolerancia: float) -> list:
+    """Séries cujo p50 piorou mais que `tolerancia` (fração) em relação à base."""
+    regressoes = []
+    for nome, r in atual["resultados"].items():
+        anterior = base.get("resultados", {}).get(nome)
+        if not anterior or not anterior.get("p50_s"):
+            continue
+        razao = r["p50_s"] / anterior["p50_s"]
+        if razao > 1 + tolerancia:
+            regressoes.append({"serie": nome, "base_p50_s": anterior["p50_s"], "p50_s": r["p50_s"], "razao": razao})
+    return regressoes
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark offline do jogo (Gemini gravado, sem rede).")
+    parser.add_argument("--etapas", default=",".join(ETAPAS), help=f"Lista separada por vírgulas: {', '.join(ETAPAS)}")
+    parser.add_argument("--repeticoes", type=int, default=200, help="Repetições por medição (reruns usam /20)")
+    parser.add_argument("--latencia", type=float, default=0.0, help="Segundos por chamada ao modelo gravado")
+    parser.add_argument("--latencia-pedaco", type=float, default=0.0, help="Segundos entre pedaços no streaming")
+    parser.add_argument("--respostas", help="JSONL {\"tipo\", \"texto\"} para substituir as respostas gravadas")
+    parser.add_argument("--saida", help="Arquivo JSON de resultados ('-' para stdout)", default="-")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="Piora de p50 aceita na comparação (fração)")
+    args = parser.parse_args(argv)
+
+    if args.respostas:
+        with open(args.respostas, encoding="utf-8") as f:
+            gravadas = [json.loads(l) for l in f if l.strip()]
+        RESPOSTAS_GRAVADAS.update({g["tipo"]: g["texto"] for g in gravadas})
+    GeminiGravado.latencia = args.latencia
+    GeminiGravado.latencia_pedaco = args.latencia_pedaco
+
+    preparar_ambiente()
+
+    resultados = {}
+    for nome in [e.strip() for e in args.etapas.split(",") if e.strip()]:
+        if nome not in ETAPAS:
+            parser.error(f"etapa desconhecida: {nome}")
+        repeticoes = max(3, args.repeticoes // 20) if nome == "reruns" else args.repeticoes
+        print(f"· {nome}...", file=sys.stderr)
+        resultados.update(ETAPAS[nome](repeticoes))
+
+    saida = {
+        "maquina": {"python": platform.python_version(), "plataforma": platform.platform(), "cpus": os.cpu_count()},
+        "parametros": {"repeticoes": args.repeticoes, "latencia": args.latencia, "latencia_pedaco": args.latencia_pedaco},
+        "criado_em": time.time(),
+        "resultados": resultados,
+    }
+    codigo = 0
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            saida["regressoes"] = comparar(json.load(f), saida, args.tolerancia)
+        for r in saida["regressoes"]:
+            print(f"REGRESSÃO {r['serie']}: p50 {r['base_p50_s'] * 1e6:.1f}µs -> {r['p50_s'] * 1e6:.1f}µs ({r['razao']:.2f}x)", file=sys.stderr)
+        codigo = 1 if saida["regressoes"] else 0
+
+    texto = json.dumps(saida, ensure_ascii=False, indent=2)
+    if args.saida == "-":
+        print(texto)
+    else:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            f.write(texto + "\n")
+    return codigo
+
+if __name__ == "__main__":
+    sys.exit(main())
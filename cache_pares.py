@@ -0,0 +1,138 @@
+# cache_pares.py
+import hashlib, json, os, threading, time
+from conexoes import ConexoesSQLite, transacao
+
+# -------------------- Cache persistente de pares (SQLite) --------------------
+# Compartilhado entre sessões do Streamlit e entre processos do servidor: o
+# estado vive no arquivo SQLite (modo WAL), não na memória do processo.
+# Uma leitura não escreve: acertos, falhas e o último acesso de cada chave
+# (para o LRU) ficam na memória e vão ao disco junto com a próxima gravação
+# ou a cada `intervalo_contadores` segundos.
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS pares (
+    chave       TEXT PRIMARY KEY,
+    dados       TEXT NOT NULL,
+    criado_em   REAL NOT NULL,
+    acessado_em REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_pares_acessado ON pares (acessado_em);
+CREATE TABLE IF NOT EXISTS contadores (
+    nome  TEXT PRIMARY KEY,
+    valor INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO contadores (nome, valor) VALUES ('acertos', 0), ('falhas', 0);
+"""
+
+def chave_pares(pergunta_normalizada: str, max_itens: int, modelo: str) -> str:
+    """Chave estável para (pergunta normalizada, quantidade, modelo)."""
+    bruto = f"{pergunta_normalizada}\x1f{int(max_itens)}\x1f{modelo}"
+    return hashlib.sha256(bruto.encode("utf-8")).hexdigest()
+
+class CachePares:
+    """
+    Cache em disco de listas de pares (termo, conceito), com TTL, despejo LRU
+    por limite de entradas e contadores de acertos/falhas.
+    """
+
+    def __init__(self, caminho: str, ttl: float = 7 * 24 * 3600, max_entradas: int = 5000,
+                 intervalo_contadores: float = 10.0):
+        self.caminho = caminho
+        self.ttl = float(ttl)
+        self.max_entradas = int(max_entradas)
+        self.intervalo_contadores = float(intervalo_contadores)
+        self._conexao = ConexoesSQLite(caminho)
+        self._lock = threading.Lock()
+        self._contagens = {"acertos": 0, "falhas": 0}  # ainda não gravadas
+        self._acessos = {}  # chave -> último acesso ainda não gravado
+        self._descarregado_em = time.monotonic()
+        pasta = os.path.dirname(os.path.abspath(caminho))
+        os.makedirs(pasta, exist_ok=True)
+        self._conexao().executescript(_ESQUEMA)
+
+    def _contar(self, nome: str, chave: str | None = None, agora: float | None = None):
+        with self._lock:
+            self._contagens[nome] += 1
+            if chave is not None:
+                self._acessos[chave] = agora
+            descarregar = time.monotonic() - self._descarregado_em >= self.intervalo_contadores
+            if descarregar:
+                self._descarregado_em = time.monotonic()  # só uma thread grava por intervalo
+        if descarregar:
+            try:
+                with transacao(self._conexao()) as con:
+                    self._gravar_pendentes(con)
+            except Exception:
+                pass  # banco ocupado: fica para a próxima
+
+    def _gravar_pendentes(self, con):
+        """Leva contadores e acessos pendentes ao disco, dentro da transação de `con`."""
+        with self._lock:
+            contagens, self._contagens = self._contagens, {"acertos": 0, "falhas": 0}
+            acessos, self._acessos = self._acessos, {}
+            self._descarregado_em = time.monotonic()
+        try:
+            con.executemany("UPDATE contadores SET valor = valor + ? WHERE nome = ?",
+                            [(n, nome) for nome, n in contagens.items() if n])
+            con.executemany("UPDATE pares SET acessado_em = MAX(acessado_em, ?) WHERE chave = ?",
+                            [(em, chave) for chave, em in acessos.items()])
+        except Exception:
+            with self._lock:  # devolve o que não foi gravado
+                for nome, n in contagens.items():
+                    self._contagens[nome] += n
+                for chave, em in acessos.items():
+                    self._acessos.setdefault(chave, em)
+            raise
+
+    def obter(self, chave: str, contar: bool = True):
+        """
+        Retorna a lista de pares [(termo, conceito), ...] ou None se ausente/expirada.
+        contar=False para sondagens que não devem entrar em acertos/falhas.
+        """
+        agora = time.time()
+        row = self._conexao().execute("SELECT dados, criado_em FROM pares WHERE chave = ?", (chave,)).fetchone()
+        if row is not None and self.ttl and agora - row[1] > self.ttl:
+            row = None  # expirada: quem apaga é o próximo guardar
+        if row is None:
+            if contar:
+                self._contar("falhas")
+            return None
+        if contar:
+            self._contar("acertos", chave, agora)
+        return [(t, c) for t, c in json.loads(row[0])]
+
+    def guardar(self, chave: str, pares):
+        agora = time.time()
+        dados = json.dumps([[t, c] for t, c in pares], ensure_ascii=False)
+        with transacao(self._conexao()) as con:
+            self._gravar_pendentes(con)
+            con.execute(
+                "INSERT OR REPLACE INTO pares (chave, dados, criado_em, acessado_em) VALUES (?, ?, ?, ?)",
+                (chave, dados, agora, agora),
+            )
+            if self.ttl:
+                con.execute("DELETE FROM pares WHERE criado_em < ?", (agora - self.ttl,))
+            excesso = con.execute("SELECT COUNT(*) FROM pares").fetchone()[0] - self.max_entradas
+            if excesso > 0:
+                con.execute(
+                    "DELETE FROM pares WHERE chave IN "
+                    "(SELECT chave FROM pares ORDER BY acessado_em LIMIT ?)",
+                    (excesso,),
+                )
+
+    def estatisticas(self) -> dict:
+        con = self._conexao()
+        stats = dict(con.execute("SELECT nome, valor FROM contadores").fetchall())
+        with self._lock:
+            for nome, n in self._contagens.items():
+                stats[nome] = stats.get(nome, 0) + n
+        stats["entradas"] = con.execute("SELECT COUNT(*) FROM pares").fetchone()[0]
+        return stats
+
+    def limpar(self):
+        with self._lock:
+            self._contagens = {"acertos": 0, "falhas": 0}
+            self._acessos = {}
+        con = self._conexao()
+        con.execute("DELETE FROM pares")
+        con.execute("UPDATE contadores SET valor = 0")
@@ -0,0 +1,163 @@
+# carga.py
+import argparse, gc, json, os, platform, random, resource, sys, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from benchmark import GeminiGravado, _estatisticas, comparar, preparar_ambiente
+
+# -------------------- Teste de carga (sessões simultâneas) --------------------
+# N sessões do jogo.py no AppTest, todas no mesmo processo (como num servidor
+# Streamlit: cache_resource, armazém de decks e executores compartilhados),
+# com o Gemini gravado do benchmark. Cada sessão faz o fluxo real: abre, digita
+# a pergunta, muda a quantidade, "Gerar Desafio" e "Novo Embaralhamento".
+# Mede a latência de cada rerun (p50/p95/p99), a vazão e a memória por sessão
+# para cada N; --comparar serve de portão de regressão para mudanças no jogo.py.
+#
+#   python carga.py --sessoes 1,5,10,20 --saida carga.json
+#   python carga.py --sessoes 10 --latencia 1.5 --comparar carga.json
+
+ETAPAS_SESSAO = ("abrir", "pergunta", "quantidade", "gerar", "embaralhar")
+
+def _permitir_apptests_simultaneos():
+    """
+    O AppTest foi feito para uma sessão por vez: cada run() instala um Runtime
+    falso global e o apaga (None) no fim, derrubando as outras sessões em curso.
+    Aqui o AppTest passa a ver uma subclasse cuja atribuição de _instance vai
+    para o Runtime de verdade, ignorando o apagar; e global.appTest fica ligado
+    de vez, para o patch de configuração de cada run() não desligá-lo no meio de outra.
+    O bytecode do jogo.py é compilado uma vez e compartilhado, como no servidor
+    (compilar o mesmo script em várias threads ao mesmo tempo quebra o CPython 3.11).
+    """
+    from streamlit import config
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import app_test, local_script_runner
+
+    class _Compartilhado(type):
+        def __setattr__(cls, nome, valor):
+            if nome == "_instance":
+                if valor is not None:
+                    Runtime._instance = valor
+                return
+            super().__setattr__(nome, valor)
+
+    app_test.Runtime = _Compartilhado("Runtime", (Runtime,), {})
+    config.set_option("global.appTest", True)
+    cache_scripts = ScriptCache()
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: cache_scripts
+
+def rss_bytes() -> int:
+    """Memória residente do processo agora (Linux); fora dele, o pico do ru_maxrss."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return pico if sys.platform == "darwin" else pico * 1024
+
+def _elemento(lista, rotulo: str):
+    return next(e for e in lista if e.label == rotulo)
+
+def sessao(indice: int, rodadas: int, perguntas: int, tempos: dict, lock: threading.Lock, seed: int):
+    """Uma sessão do fluxo completo; retorna o AppTest (com a sessão viva) para medir memória."""
+    from streamlit.testing.v1 import AppTest
+    caminho = os.path.join(os.path.dirname(os.path.abspath(__file__)), "jogo.py")
+    rng = random.Random(seed * 1000 + indice)
+    medidos = {etapa: [] for etapa in ETAPAS_SESSAO}
+
+    def rerun(etapa, fn):
+        inicio = time.perf_counter()
+        at = fn()
+        medidos[etapa].append(time.perf_counter() - inicio)
+        if at.exception:
+            raise RuntimeError(f"sessão {indice}, {etapa}: {at.exception[0].message}")
+        return at
+
+    at = rerun("abrir", AppTest.from_file(caminho, default_timeout=120).run)
+    for rodada in range(rodadas):
+        at = rerun("pergunta", _elemento(at.text_input, "Pergunta").input(f"Pergunta de carga {rng.randrange(perguntas)} ({rodada})").run)
+        at = rerun("quantidade", _elemento(at.slider, "Quantidade de pares").set_value(rng.randint(4, 10)).run)
+        at = rerun("gerar", _elemento(at.button, "🎲 Gerar Desafio").click().run)
+        at = rerun("embaralhar", _elemento(at.button, "🔄 Novo Embaralhamento").click().run)
+    with lock:
+        for etapa, valores in medidos.items():
+            tempos[etapa].extend(valores)
+    return at
+
+def medir_carga(n: int, rodadas: int, perguntas: int | None, seed: int) -> dict:
+    """Roda n sessões simultâneas e resume latências, vazão e memória por sessão."""
+    tempos = {etapa: [] for etapa in ETAPAS_SESSAO}
+    lock = threading.Lock()
+    gc.collect()
+    rss_antes = rss_bytes()
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n, thread_name_prefix="carga") as executor:
+        futuros = [executor.submit(sessao, i, rodadas, perguntas or n, tempos, lock, seed) for i in range(n)]
+        sessoes = [f.result() for f in futuros]
+    duracao = time.perf_counter() - inicio
+    gc.collect()
+    rss_depois = rss_bytes()
+    todos = [t for valores in tempos.values() for t in valores]
+    resultados = {f"carga/{n}/{etapa}": _estatisticas(valores) for etapa, valores in tempos.items() if valores}
+    resultados[f"carga/{n}/rerun"] = _estatisticas(todos)
+    resultados[f"carga/{n}/rerun"].update(
+        sessoes=n,
+        duracao_s=duracao,
+        reruns_s=len(todos) / duracao,
+        rss_sessao_bytes=max(0, rss_depois - rss_antes) // n,
+        rss_processo_bytes=rss_depois,
+    )
+    del sessoes
+    return resultados
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga do jogo com N sessões simultâneas (AppTest, Gemini gravado).")
+    parser.add_argument("--sessoes", default="1,5,10,20", help="Valores de N separados por vírgulas")
+    parser.add_argument("--rodadas", type=int, default=3, help="Ciclos pergunta/quantidade/gerar/embaralhar por sessão")
+    parser.add_argument("--perguntas", type=int, help="Perguntas distintas sorteadas (padrão: uma por sessão)")
+    parser.add_argument("--latencia", type=float, default=0.0, help="Segundos por chamada ao modelo gravado")
+    parser.add_argument("--latencia-pedaco", type=float, default=0.0, help="Segundos entre pedaços no streaming")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--saida", help="Arquivo JSON de resultados ('-' para stdout)", default="-")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="Piora de p50 aceita na comparação (fração)")
+    args = parser.parse_args(argv)
+
+    GeminiGravado.latencia = args.latencia
+    GeminiGravado.latencia_pedaco = args.latencia_pedaco
+    preparar_ambiente("jogo-carga-")
+    _permitir_apptests_simultaneos()
+
+    # Aquecimento: imports, compilação do jogo.py e recursos do processo não entram na conta da primeira medição
+    medir_carga(1, 1, None, args.seed + 1)
+    resultados = {}
+    for n in [int(x) for x in args.sessoes.split(",") if x.strip()]:
+        print(f"· {n} sessão(ões)...", file=sys.stderr)
+        resultados.update(medir_carga(n, args.rodadas, args.perguntas, args.seed))
+        r = resultados[f"carga/{n}/rerun"]
+        print(f"  p50 {r['p50_s'] * 1e3:.0f} ms · p95 {r['p95_s'] * 1e3:.0f} ms · p99 {r['p99_s'] * 1e3:.0f} ms · "
+              f"{r['reruns_s']:.1f} reruns/s · {r['rss_sessao_bytes'] / 1024:.0f} KiB/sessão", file=sys.stderr)
+
+    saida = {
+        "maquina": {"python": platform.python_version(), "plataforma": platform.platform(), "cpus": os.cpu_count()},
+        "parametros": {"rodadas": args.rodadas, "perguntas": args.perguntas, "latencia": args.latencia,
+                       "latencia_pedaco": args.latencia_pedaco, "seed": args.seed},
+        "criado_em": time.time(),
+        "resultados": resultados,
+    }
+    codigo = 0
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            saida["regressoes"] = comparar(json.load(f), saida, args.tolerancia)
+        for r in saida["regressoes"]:
+            print(f"REGRESSÃO {r['serie']}: p50 {r['base_p50_s'] * 1e3:.1f} ms -> {r['p50_s'] * 1e3:.1f} ms ({r['razao']:.2f}x)", file=sys.stderr)
+        codigo = 1 if saida["regressoes"] else 0
+
+    texto = json.dumps(saida, ensure_ascii=False, indent=2)
+    if args.saida == "-":
+        print(texto)
+    else:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            f.write(texto + "\n")
+    return codigo
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+# chaves.py
+import logging, math, threading, time
+from contextlib import contextmanager
+from metricas import metricas
+
+# -------------------- Pool de chaves do Gemini --------------------
+# A cota do Gemini é por chave e por modelo (pedidos por minuto), então há um
+# balde de fichas para cada par (chave, modelo). Cada chamada à API (geração,
+# reparo, stream) tira uma ficha da chave com mais saldo para aquele modelo: a
+# vazão cresce com o número de chaves. Um par que responde "cota esgotada"
+# (429 / RESOURCE_EXHAUSTED) fica de castigo por um recuo exponencial e a mesma
+# chamada é tentada na próxima chave. ModeloDoPool faz isso por baixo de
+# generate_content, para nucleo.py não saber de chaves. Os rótulos das métricas
+# e o painel mostram só o fim da chave.
+
+log = logging.getLogger("jogo")
+
+class SemCota(TimeoutError):
+    """Nenhuma chave com saldo dentro da espera máxima."""
+    motivo = "sem_cota"
+
+def erro_de_cota(e: BaseException) -> bool:
+    """A API recusou por cota/limite de taxa (429)?"""
+    try:
+        from google.api_core import exceptions as gexc
+    except ImportError:
+        return False
+    return isinstance(e, gexc.TooManyRequests)  # ResourceExhausted é subclasse
+
+def mascarar(chave: str) -> str:
+    return "…" + chave[-4:]
+
+class _Balde:
+    __slots__ = ("chave", "nome", "modelo", "fichas", "atualizado_em", "bloqueada_ate", "falhas_seguidas",
+                 "em_curso", "pedidos", "sucessos", "erros_cota", "erros")
+
+    def __init__(self, chave: str, modelo: str, fichas: float):
+        self.chave = chave
+        self.nome = mascarar(chave)
+        self.modelo = modelo
+        self.fichas = fichas
+        self.atualizado_em = time.monotonic()
+        self.bloqueada_ate = 0.0
+        self.falhas_seguidas = 0
+        self.em_curso = self.pedidos = self.sucessos = self.erros_cota = self.erros = 0
+
+class PoolChaves:
+    """
+    Chaves com um balde de fichas por modelo (`rpm` por minuto, até `rajada`
+    acumuladas; rpm=0 = sem limite). reservar() espera até `espera_max` s
+    por uma ficha; depois levanta SemCota.
+    """
+
+    def __init__(self, chaves, rpm: float = 0, rajada: float | None = None, espera_max: float = 5.0,
+                 recuo_base: float = 30.0, recuo_max: float = 600.0):
+        chaves = list(dict.fromkeys(c for c in chaves if c))
+        if not chaves:
+            raise ValueError("Pool de chaves vazio")
+        self.taxa = rpm / 60.0
+        self.capacidade = float(rajada or rpm) if rpm else math.inf
+        self.espera_max = espera_max
+        self.recuo_base = recuo_base
+        self.recuo_max = recuo_max
+        self._lock = threading.Lock()
+        self._chaves = chaves
+        self._baldes = {}  # (chave, modelo) -> _Balde, criado no primeiro uso
+
+    def __len__(self) -> int:
+        return len(self._chaves)
+
+    def _baldes_do_modelo(self, modelo: str) -> list:
+        # Chamado com o lock
+        baldes = []
+        for chave in self._chaves:
+            b = self._baldes.get((chave, modelo))
+            if b is None:
+                b = self._baldes[(chave, modelo)] = _Balde(chave, modelo, self.capacidade)
+            baldes.append(b)
+        return baldes
+
+    def _repor(self, c: _Balde, agora: float):
+        if self.taxa:
+            c.fichas = min(self.capacidade, c.fichas + max(0.0, agora - c.atualizado_em) * self.taxa)
+        c.atualizado_em = max(c.atualizado_em, agora)  # no castigo, conta a partir do fim dele
+
+    def reservar(self, modelo: str = "", timeout: float | None = None) -> str:
+        """Tira uma ficha da chave livre com mais saldo para `modelo` (empate: menos pedidos em curso) e a retorna."""
+        limite = time.monotonic() + (self.espera_max if timeout is None else timeout)
+        inicio = time.monotonic()
+        while True:
+            with self._lock:
+                agora = time.monotonic()
+                baldes = self._baldes_do_modelo(modelo)
+                livres = [c for c in baldes if c.bloqueada_ate <= agora]
+                for c in livres:
+                    self._repor(c, agora)
+                melhor = max(livres, key=lambda c: (c.fichas, -c.em_curso), default=None)
+                if melhor is not None and melhor.fichas >= 1:
+                    melhor.fichas -= 1
+                    melhor.em_curso += 1
+                    melhor.pedidos += 1
+                    metricas.observar("jogo_chaves_espera_segundos", agora - inicio)
+                    return melhor.chave
+                # Quando aparece a próxima ficha: numa chave livre ou numa que sai do castigo
+                espera = min([(1 - c.fichas) / self.taxa for c in livres] +
+                             [c.bloqueada_ate - agora for c in baldes if c.bloqueada_ate > agora])
+            if agora + espera > limite:
+                metricas.contar("jogo_chaves_sem_cota_total", modelo=modelo)
+                raise SemCota(f"Todas as {len(self._chaves)} chave(s) sem cota para {modelo or 'o modelo'}; próxima ficha em {espera:.1f}s")
+            time.sleep(max(espera, 0.01))
+
+    def sucesso(self, chave: str, modelo: str = ""):
+        with self._lock:
+            c = self._baldes[(chave, modelo)]
+            c.falhas_seguidas = 0
+            c.sucessos += 1
+        metricas.contar("jogo_chaves_total", chave=c.nome, modelo=modelo, resultado="sucesso")
+
+    def falha(self, chave: str, erro: BaseException, modelo: str = ""):
+        """Erro de cota põe a chave de castigo para o modelo (recuo dobrando a cada falha seguida); os demais só contam."""
+        with self._lock:
+            c = self._baldes[(chave, modelo)]
+            if erro_de_cota(erro):
+                c.falhas_seguidas += 1
+                recuo = min(self.recuo_max, self.recuo_base * 2 ** (c.falhas_seguidas - 1))
+                c.bloqueada_ate = time.monotonic() + recuo
+                if self.taxa:  # ao sair do castigo: uma ficha de teste e o balde volta a encher dali
+                    c.fichas = min(c.fichas, 1.0)
+                    c.atualizado_em = c.bloqueada_ate
+                c.erros_cota += 1
+                resultado = "cota"
+            else:
+                c.erros += 1
+                resultado = "erro"
+        if resultado == "cota":
+            log.warning("Chave %s sem cota para %s; de castigo por %.0fs", c.nome, modelo, recuo)
+        metricas.contar("jogo_chaves_total", chave=c.nome, modelo=modelo, resultado=resultado)
+
+    def _liberar(self, chave: str, modelo: str):
+        with self._lock:
+            self._baldes[(chave, modelo)].em_curso -= 1
+
+    @contextmanager
+    def usar(self, modelo: str = "", timeout: float | None = None):
+        """Reserva uma chave para `modelo` e registra o desfecho do bloco (sucesso ou falha)."""
+        chave = self.reservar(modelo, timeout)
+        try:
+            yield chave
+        except Exception as e:
+            self.falha(chave, e, modelo)
+            raise
+        else:
+            self.sucesso(chave, modelo)
+        finally:
+            self._liberar(chave, modelo)
+
+    def executar(self, fn, modelo: str = ""):
+        """fn(chave) numa chave do pool; em erro de cota, tenta de novo nas outras chaves."""
+        for tentativa in range(len(self._chaves)):
+            try:
+                with self.usar(modelo) as chave:
+                    return fn(chave)
+            except Exception as e:
+                if not erro_de_cota(e) or tentativa == len(self._chaves) - 1:
+                    raise
+
+    def executar_stream(self, fn, modelo: str = ""):
+        """Como executar, para geradores: só troca de chave se nada tiver saído ainda."""
+        for tentativa in range(len(self._chaves)):
+            recebeu = False
+            try:
+                with self.usar(modelo) as chave:
+                    for item in fn(chave):
+                        recebeu = True
+                        yield item
+                return
+            except Exception as e:
+                if recebeu or not erro_de_cota(e) or tentativa == len(self._chaves) - 1:
+                    raise
+
+    def uso(self) -> list:
+        """Contadores e saldo de cada chave (mascarada) por modelo já usado, para o painel."""
+        with self._lock:
+            agora = time.monotonic()
+            linhas = []
+            for c in self._baldes.values():
+                self._repor(c, agora)
+                linhas.append({
+                    "chave": c.nome, "modelo": c.modelo, "fichas": None if math.isinf(c.fichas) else round(c.fichas, 1),
+                    "castigo_s": round(max(0.0, c.bloqueada_ate - agora), 1), "em_curso": c.em_curso,
+                    "pedidos": c.pedidos, "sucessos": c.sucessos, "erros_cota": c.erros_cota, "erros": c.erros,
+                })
+        return linhas
+
+class ModeloDoPool:
+    """
+    Fica no lugar de um GenerativeModel: cada generate_content (com ou sem
+    stream) reserva uma chave do pool para este modelo, ou seja, uma ficha por
+    chamada à API. `criar(chave, nome)` dá o GenerativeModel da chave.
+    """
+
+    def __init__(self, pool: PoolChaves, criar, nome: str):
+        self.pool = pool
+        self.criar = criar
+        self.nome = nome
+        self.model_name = nome
+
+    def generate_content(self, *args, stream: bool = False, **kwargs):
+        if stream:
+            return self.pool.executar_stream(lambda k: self.criar(k, self.nome).generate_content(*args, stream=True, **kwargs), self.nome)
+        return self.pool.executar(lambda k: self.criar(k, self.nome).generate_content(*args, **kwargs), self.nome)
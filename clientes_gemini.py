@@ -0,0 +1,76 @@
+# clientes_gemini.py
+import threading
+
+# -------------------- Clientes do Gemini reaproveitáveis --------------------
+# genai.configure() altera um cliente global do processo; com várias chaves (ou
+# uma chave trocada no meio da sessão) isso vira corrida entre sessões. Aqui cada
+# chave tem o seu próprio gerenciador de clientes (mesma classe usada pela SDK),
+# e os GenerativeModel ficam guardados por (chave, modelo) para reaproveitar o
+# canal gRPC entre reruns e sessões.
+# A SDK (meio segundo de import) só é carregada na primeira geração de verdade:
+# abrir a página ou jogar com o deck mock não paga esse custo.
+
+def _genai():
+    import google.generativeai as genai
+    return genai
+
+class RegistroClientes:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._gerentes = {}   # api_key -> _ClientManager
+        self._modelos = {}    # (api_key, modelo) -> GenerativeModel
+        self._modelos_async = {}  # (api_key, modelo) -> GenerativeModel com cliente assíncrono
+
+    def _gerente(self, api_key: str):
+        gerente = self._gerentes.get(api_key)
+        if gerente is None:
+            from google.generativeai import client as genai_client
+            gerente = genai_client._ClientManager()
+            gerente.configure(api_key=api_key)
+            self._gerentes[api_key] = gerente
+        return gerente
+
+    def modelo(self, api_key: str, nome: str):
+        """GenerativeModel já ligado ao cliente da chave; criado uma única vez por processo."""
+        chave = (api_key, nome)
+        model = self._modelos.get(chave)
+        if model is not None:
+            return model
+        with self._lock:
+            model = self._modelos.get(chave)
+            if model is None:
+                gerente = self._gerente(api_key)
+                model = _genai().GenerativeModel(nome)
+                model._client = gerente.get_default_client("generative")
+                self._modelos[chave] = model
+        return model
+
+    def modelo_async(self, api_key: str, nome: str):
+        """
+        GenerativeModel com o cliente assíncrono da chave (generate_content_async).
+        O canal gRPC assíncrono fica preso ao loop em que foi criado: use um
+        registro por loop (ex.: um por asyncio.run).
+        """
+        chave = (api_key, nome)
+        with self._lock:
+            model = self._modelos_async.get(chave)
+            if model is None:
+                gerente = self._gerente(api_key)
+                model = _genai().GenerativeModel(nome)
+                model._client = gerente.get_default_client("generative")
+                model._async_client = gerente.get_default_client("generative_async")
+                self._modelos_async[chave] = model
+        return model
+
+    def invalidar(self, api_key: str | None = None):
+        """Descarta os clientes de uma chave (ou de todas, se api_key for None)."""
+        with self._lock:
+            if api_key is None:
+                self._gerentes.clear()
+                self._modelos.clear()
+                self._modelos_async.clear()
+                return
+            self._gerentes.pop(api_key, None)
+            for modelos in (self._modelos, self._modelos_async):
+                for chave in [k for k in modelos if k[0] == api_key]:
+                    del modelos[chave]
@@ -0,0 +1,73 @@
+# conexoes.py
+import sqlite3, threading, weakref
+from contextlib import contextmanager
+
+# -------------------- Conexões SQLite compartilhadas --------------------
+# Cache, banco de decks, revisão e log de eventos usam o mesmo arranjo: uma
+# conexão por thread, modo WAL para leitores não esperarem o escritor, e
+# transações explícitas de escrita. O Streamlit roda quase todo rerun numa
+# thread nova (ScriptRunner), então a conexão não morre com a thread: volta
+# para um estoque do processo e a próxima thread a reaproveita, sem abrir o
+# arquivo e repetir os PRAGMAs a cada rerun.
+
+class _Emprestimo:
+    """Guarda a conexão emprestada no threading.local; coletado quando a thread termina."""
+    __slots__ = ("con", "__weakref__")
+
+    def __init__(self, con):
+        self.con = con
+
+class ConexoesSQLite:
+    """Chamável que retorna a conexão da thread atual para `caminho` (do estoque ou nova)."""
+
+    def __init__(self, caminho: str, timeout: float = 10, max_livres: int = 8):
+        self.caminho = caminho
+        self.timeout = timeout
+        self.max_livres = max_livres
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._livres = []
+
+    def _abrir(self) -> sqlite3.Connection:
+        # check_same_thread=False: a conexão troca de thread, mas nunca é usada por duas ao mesmo tempo
+        con = sqlite3.connect(self.caminho, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")
+        return con
+
+    def _devolver(self, con: sqlite3.Connection):
+        try:
+            if con.in_transaction:
+                con.execute("ROLLBACK")  # thread morreu no meio de uma transação
+        except sqlite3.Error:
+            con.close()
+            return
+        with self._lock:
+            if len(self._livres) < self.max_livres:
+                self._livres.append(con)
+                return
+        con.close()
+
+    def __call__(self) -> sqlite3.Connection:
+        emprestimo = getattr(self._local, "emprestimo", None)
+        if emprestimo is None:
+            with self._lock:
+                con = self._livres.pop() if self._livres else None
+            emprestimo = _Emprestimo(con or self._abrir())
+            weakref.finalize(emprestimo, self._devolver, emprestimo.con)
+            self._local.emprestimo = emprestimo
+        return emprestimo.con
+
+    def livres(self) -> int:
+        return len(self._livres)
+
+@contextmanager
+def transacao(con: sqlite3.Connection):
+    """BEGIN IMMEDIATE ... COMMIT, com ROLLBACK se o bloco levantar."""
+    con.execute("BEGIN IMMEDIATE")
+    try:
+        yield con
+    except BaseException:
+        con.execute("ROLLBACK")
+        raise
+    con.execute("COMMIT")
@@ -0,0 +1,92 @@
+# corrida.py
+import threading, time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+# -------------------- Corrida com prazo e reserva (hedging) --------------------
+# A geração principal roda num executor; se ela não trouxe nada até o atraso
+# (tipicamente um percentil alto da latência do modelo), a mesma pergunta vai
+# também para um modelo de reserva mais rápido. O primeiro resultado válido
+# vence e o outro é avisado para parar. Passado o prazo duro, desiste com
+# PrazoEsgotado (levando os pares parciais) para o chamador usar cache/banco/mock.
+
+class PrazoEsgotado(TimeoutError):
+    """Nenhum corredor terminou dentro do prazo; `parciais` traz os pares já recebidos."""
+    motivo = "prazo_esgotado"
+
+    def __init__(self, mensagem: str, parciais=()):
+        super().__init__(mensagem)
+        self.parciais = list(parciais)
+
+class Corredor:
+    """Uma tentativa na corrida: acrescenta em `pares` conforme chegam e desiste quando `parar` é ligado."""
+
+    def __init__(self, nome: str):
+        self.nome = nome
+        self.pares = []
+        self.parar = threading.Event()
+
+def correr(executor, primario, reserva=None, atraso_reserva: float | None = None,
+           prazo: float | None = None, ao_progresso=None, intervalo: float = 0.05):
+    """
+    Roda primario(corredor) no executor e, se ele não trouxe nenhum par em
+    `atraso_reserva` segundos (ou falhou, mesmo com pares parciais), também reserva(corredor).
+    ao_progresso(pares) é chamado nesta thread quando o corredor mais adiantado
+    recebe pares novos. Retorna (resultado, nome_do_vencedor: "primario"/"reserva").
+    Levanta o primeiro erro se todos falharem, ou PrazoEsgotado após `prazo` segundos.
+    """
+    inicio = time.monotonic()
+    atraso_reserva = atraso_reserva or 0.0
+    corredores = {}  # Future -> Corredor
+    erros = []
+    mostrados = 0
+
+    def largar(nome, fn):
+        corredor = Corredor(nome)
+        fut = executor.submit(fn, corredor)
+        corredores[fut] = corredor
+        return fut
+
+    def encerrar(vencedor=None):
+        for fut, corredor in corredores.items():
+            if corredor is not vencedor:
+                corredor.parar.set()
+                fut.cancel()
+
+    vencedor = None
+    pendentes = {largar("primario", primario)}
+    try:
+        while True:
+            decorrido = time.monotonic() - inicio
+            esperas = [intervalo] if ao_progresso else []
+            if reserva is not None and not any(c.pares for c in corredores.values()):
+                esperas.append(max(0.0, atraso_reserva - decorrido))
+            if prazo is not None:
+                esperas.append(max(0.0, prazo - decorrido))
+            prontos, pendentes = wait(pendentes, timeout=min(esperas) if esperas else None, return_when=FIRST_COMPLETED)
+
+            for fut in prontos:
+                if fut.cancelled():
+                    continue
+                if fut.exception() is None:
+                    vencedor = corredores[fut]
+                    return fut.result(), vencedor.nome
+                erros.append(fut.exception())
+
+            lider = max(corredores.values(), key=lambda c: len(c.pares))
+            if ao_progresso and len(lider.pares) > mostrados:
+                mostrados = len(lider.pares)
+                ao_progresso(list(lider.pares))
+
+            decorrido = time.monotonic() - inicio
+            # Primário respondendo segura a reserva, mas ela fica armada até ele
+            # terminar: se falhar (mesmo com pares parciais), a reserva larga já
+            if reserva is not None and (erros or (not lider.pares and decorrido >= atraso_reserva)):
+                pendentes.add(largar("reserva", reserva))
+                reserva = None
+            if not pendentes:
+                raise erros[0]
+            if prazo is not None and decorrido >= prazo:
+                raise PrazoEsgotado(f"Sem resposta do Gemini em {prazo:.0f}s", lider.pares)
+    finally:
+        # Vale também se ao_progresso levantar: ninguém fica rodando sem dono
+        encerrar(vencedor)
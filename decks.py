@@ -0,0 +1,77 @@
+# decks.py
+import hashlib, json, random, sys, threading
+from collections import OrderedDict
+from types import MappingProxyType
+
+# -------------------- Decks compartilhados --------------------
+# Cada deck existe uma vez só no processo, imutável: textos internados, tuplas e
+# um gabarito somente leitura. O id é o hash do conteúdo, então o mesmo deck
+# vindo do cache, do banco ou de outra sessão vira o mesmo objeto. A sessão
+# guarda só {"deck": id, "semente": n}; reembaralhar é trocar a semente, e a
+# ordem de cada um sai de duas permutações pequenas calculadas a cada rerun.
+
+class Deck:
+    __slots__ = ("id", "termos", "conceitos", "gabarito")
+
+    def __init__(self, pares):
+        pares = [(sys.intern(t), sys.intern(c)) for t, c in pares]
+        self.id = id_deck(pares)
+        self.termos = tuple(t for t, _ in pares)
+        self.conceitos = tuple(c for _, c in pares)
+        self.gabarito = MappingProxyType(dict(pares))
+
+    def __len__(self) -> int:
+        return len(self.termos)
+
+    def __setattr__(self, nome, valor):
+        if hasattr(self, nome):
+            raise AttributeError(f"Deck é imutável ({nome})")
+        object.__setattr__(self, nome, valor)
+
+    def pares(self) -> list:
+        return list(zip(self.termos, self.conceitos))
+
+    def permutacoes(self, semente) -> tuple:
+        """Ordem dos termos e dos conceitos para a semente (None = ordem original)."""
+        n = len(self.termos)
+        if semente is None:
+            return range(n), range(n)
+        rng = random.Random(semente)
+        return rng.sample(range(n), n), rng.sample(range(n), n)
+
+    def embaralhado(self, semente=None) -> tuple:
+        """(termos, conceitos, gabarito) na ordem da semente; o gabarito é o compartilhado."""
+        pt, pc = self.permutacoes(semente)
+        return [self.termos[i] for i in pt], [self.conceitos[i] for i in pc], self.gabarito
+
+def id_deck(pares) -> str:
+    """Hash do conteúdo (ordem dos pares incluída): o mesmo deck tem sempre o mesmo id."""
+    return hashlib.sha1(json.dumps(list(pares), ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+
+class ArmazemDecks:
+    """Decks do processo por id, em LRU: os menos usados saem quando passa de `max_decks`."""
+
+    def __init__(self, max_decks: int = 10_000):
+        self.max_decks = max_decks
+        self._lock = threading.Lock()
+        self._decks = OrderedDict()  # id -> Deck
+
+    def guardar(self, pares) -> Deck:
+        """Retorna o Deck dos pares, reaproveitando o já guardado se o conteúdo for o mesmo."""
+        novo = Deck(pares)
+        with self._lock:
+            deck = self._decks.setdefault(novo.id, novo)
+            self._decks.move_to_end(deck.id)
+            while len(self._decks) > self.max_decks:
+                self._decks.popitem(last=False)
+        return deck
+
+    def obter(self, deck_id: str) -> Deck | None:
+        with self._lock:
+            deck = self._decks.get(deck_id)
+            if deck is not None:
+                self._decks.move_to_end(deck_id)
+        return deck
+
+    def total(self) -> int:
+        return len(self._decks)
@@ -0,0 +1,178 @@
+# eventos.py
+import argparse, json, logging, os, sys, threading, time
+from conexoes import ConexoesSQLite, transacao
+from metricas import metricas
+
+# -------------------- Log de eventos das respostas (write-behind) --------------------
+# Cada colocação, verificação, limpeza e revelação do tabuleiro vira uma linha
+# compacta. registrar() só acrescenta numa lista em memória; uma thread grava
+# em lotes (uma transação por lote) num SQLite em modo WAL, só de acréscimo.
+# Os textos dos termos ficam uma vez na tabela `termos`; o evento guarda o id.
+# As agregações por termo percorrem um índice que cobre as colunas usadas.
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS termos (
+    id    INTEGER PRIMARY KEY,
+    texto TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS eventos (
+    em      REAL NOT NULL,
+    tipo    INTEGER NOT NULL,
+    deck    TEXT NOT NULL,
+    termo   INTEGER,
+    correto INTEGER,
+    ms      INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_eventos_termo ON eventos (termo, tipo, em, correto, ms);
+"""
+
+TIPOS = {"colocar": 1, "verificar": 2, "limpar": 3, "revelar": 4}
+NOMES_TIPOS = {v: k for k, v in TIPOS.items()}
+
+log = logging.getLogger("jogo")
+
+class LogEventos:
+    """
+    Eventos (tipo, deck, termo, correto, ms) em memória, gravados em lote por uma
+    thread a cada `intervalo` s ou `lote` eventos. Passando de `max_fila`
+    pendentes (disco travado), os novos são descartados e contados.
+    """
+
+    def __init__(self, caminho: str, lote: int = 500, intervalo: float = 2.0, max_fila: int = 100_000):
+        self.caminho = caminho
+        self.lote = int(lote)
+        self.intervalo = float(intervalo)
+        self.max_fila = int(max_fila)
+        self._conexao = ConexoesSQLite(caminho)
+        self._cond = threading.Condition()
+        self._fila = []
+        self._enfileirados = 0
+        self._concluidos = 0  # gravados ou perdidos na gravação
+        self._fechando = False
+        self._pedido = False  # descarregar() pediu gravação imediata
+        self._ids_termos = {}  # só a thread de gravação usa
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        self._conexao().executescript(_ESQUEMA)
+        self._thread = threading.Thread(target=self._gravar_sempre, name="log-eventos", daemon=True)
+        self._thread.start()
+
+    # ---- escrita ----
+    def registrar(self, tipo: str, deck: str, termo: str | None = None, correto: bool | None = None,
+                  ms: int | None = None, em: float | None = None):
+        self.registrar_varios([(tipo, deck, termo, correto, ms)], em)
+
+    def registrar_varios(self, eventos, em: float | None = None):
+        """Enfileira [(tipo, deck, termo, correto, ms), ...] sem tocar no disco."""
+        em = time.time() if em is None else em
+        linhas = [(em, TIPOS[tipo], deck, termo, None if correto is None else int(bool(correto)), None if ms is None else int(ms))
+                  for tipo, deck, termo, correto, ms in eventos]
+        if not linhas:
+            return
+        with self._cond:
+            if len(self._fila) + len(linhas) > self.max_fila:
+                metricas.contar("jogo_eventos_descartados_total", len(linhas), motivo="fila_cheia")
+                return
+            self._fila.extend(linhas)
+            self._enfileirados += len(linhas)
+            if len(self._fila) >= self.lote:
+                self._cond.notify_all()
+
+    def descarregar(self, timeout: float | None = None) -> bool:
+        """Espera gravar tudo o que já foi registrado; False se não deu no `timeout`."""
+        with self._cond:
+            alvo = self._enfileirados
+            self._pedido = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._concluidos >= alvo, timeout)
+
+    def fechar(self, timeout: float | None = 10):
+        with self._cond:
+            self._fechando = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def pendentes(self) -> int:
+        return len(self._fila)
+
+    def _gravar_sempre(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._fechando or self._pedido or len(self._fila) >= self.lote, self.intervalo)
+                linhas, self._fila, self._pedido = self._fila, [], False
+                fechando = self._fechando
+            if linhas:
+                try:
+                    with metricas.cronometrar("jogo_eventos_gravacao_segundos"):
+                        self._gravar(linhas)
+                    metricas.contar("jogo_eventos_total", len(linhas))
+                except Exception:
+                    log.exception("Falha ao gravar %d evento(s)", len(linhas))
+                    metricas.contar("jogo_eventos_descartados_total", len(linhas), motivo="erro_gravacao")
+            with self._cond:
+                self._concluidos += len(linhas)
+                self._cond.notify_all()
+            if fechando and not self._fila:
+                return
+
+    def _gravar(self, linhas):
+        try:
+            with transacao(self._conexao()) as con:
+                novos = {l[3] for l in linhas if l[3] is not None and l[3] not in self._ids_termos}
+                if novos:
+                    con.executemany("INSERT OR IGNORE INTO termos (texto) VALUES (?)", [(t,) for t in novos])
+                    for texto in novos:
+                        self._ids_termos[texto] = con.execute("SELECT id FROM termos WHERE texto = ?", (texto,)).fetchone()[0]
+                con.executemany(
+                    "INSERT INTO eventos (em, tipo, deck, termo, correto, ms) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(em, tipo, deck, None if termo is None else self._ids_termos[termo], correto, ms)
+                     for em, tipo, deck, termo, correto, ms in linhas],
+                )
+        except Exception:
+            self._ids_termos.clear()  # ids de termos inseridos na transação desfeita
+            raise
+
+    # ---- consultas ----
+    def taxas_erro(self, min_respostas: int = 1, limite: int = 50, desde: float | None = None) -> list:
+        """
+        Termos com mais erros primeiro: respostas verificadas, erros, revelações,
+        taxa de erro e tempo médio até colocar o termo no lugar certo (ms).
+        """
+        linhas = self._conexao().execute(
+            "SELECT t.texto, a.respostas, a.erros, a.revelacoes, a.tempo_medio_ms FROM ("
+            "  SELECT termo, SUM(tipo = 2) AS respostas, SUM(tipo = 2 AND correto = 0) AS erros,"
+            "         SUM(tipo = 4) AS revelacoes, AVG(CASE WHEN tipo = 2 AND correto = 1 THEN ms END) AS tempo_medio_ms"
+            "  FROM eventos WHERE termo IS NOT NULL AND tipo IN (2, 4) AND em >= ?"
+            "  GROUP BY termo HAVING respostas >= ?"
+            ") a JOIN termos t ON t.id = a.termo "
+            "ORDER BY 1.0 * a.erros / a.respostas DESC, a.respostas DESC LIMIT ?",
+            (desde or 0, max(1, int(min_respostas)), int(limite)),
+        )
+        return [
+            {"termo": texto, "respostas": respostas, "erros": erros, "revelacoes": revelacoes,
+             "taxa_erro": erros / respostas, "tempo_medio_ms": tempo}
+            for texto, respostas, erros, revelacoes, tempo in linhas
+        ]
+
+    def resumo(self, desde: float | None = None) -> dict:
+        """Quantidade de eventos gravados por tipo."""
+        linhas = self._conexao().execute(
+            "SELECT tipo, COUNT(*) FROM eventos WHERE em >= ? GROUP BY tipo", (desde or 0,)
+        )
+        return {NOMES_TIPOS.get(tipo, str(tipo)): n for tipo, n in linhas}
+
+# -------------------- CLI: relatório por termo --------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Taxa de erro e tempo por termo a partir do log de eventos.")
+    parser.add_argument("--eventos", default=os.getenv("JOGO_EVENTOS_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "eventos.sqlite3")))
+    parser.add_argument("--min-respostas", type=int, default=5)
+    parser.add_argument("--limite", type=int, default=50)
+    parser.add_argument("--dias", type=float, help="Só eventos dos últimos N dias")
+    args = parser.parse_args(argv)
+
+    eventos = LogEventos(args.eventos)
+    desde = time.time() - args.dias * 24 * 3600 if args.dias else None
+    for linha in eventos.taxas_erro(args.min_respostas, args.limite, desde):
+        print(json.dumps(linha, ensure_ascii=False), file=sys.stdout)
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,57 @@
 # jogo.py
-import os, re, json, random
+import os, json, time, random, logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
-from streamlit.components.v1 import html as st_html
-import google.generativeai as genai
+import streamlit.components.v1 as components
+from banco_decks import BancoDecks
+from cache_pares import CachePares, chave_pares
+from chaves import ModeloDoPool, PoolChaves
+from clientes_gemini import RegistroClientes
+from corrida import PrazoEsgotado, correr
+from decks import ArmazemDecks
+from eventos import LogEventos
+from metricas import metricas, LIMITES_BYTES
+from nucleo import MIN_PARES, dados_tabuleiro, gerar_pares, gerar_pares_mock, gerar_pares_stream
+from parciais import GeracaoParcial
+from prefetch import FilaPrefetch
+from revisao import AgendaRevisao
+from rodadas import lembrar, ordem_rodadas, proxima_rodada
+from salas import TAMANHO_CODIGO, RegistroSalas
+from texto import normalizar_pergunta as _normalizar_pergunta
+from voo_unico import VooUnico
 
 # -------------------- Config básica --------------------
 # -------------------- Config básica --------------------
+_inicio_rerun = time.perf_counter()
 st.set_page_config(page_title="Jogo de Associação - Concursos", layout="wide")
 st.title("🎮 Jogo de Associação de Palavras - Concursos")
 
 # -------------------- API KEY (3 opções) --------------------
-def load_api_key():
-    import os
-    import streamlit as st
-
+def _lista_chaves(val) -> list:
+    # GOOGLE_API_KEYS: lista no secrets.toml ou texto separado por vírgulas
+    if isinstance(val, str):
+        val = val.split(",")
+    return [c.strip() for c in val or () if c and c.strip()]
+
+def load_api_keys():
+    """Chaves do Gemini: a digitada nesta sessão ou o pool (GOOGLE_API_KEYS e/ou GOOGLE_API_KEY)."""
     # 0) Já digitada nesta sessão?
     if st.session_state.get("GOOGLE_API_KEY"):
-        return st.session_state["GOOGLE_API_KEY"]
+        return [st.session_state["GOOGLE_API_KEY"]]
 
     # 1) Tentar secrets.toml (sem quebrar se não existir)
     try:
         # Alguns Streamlit não suportam .get() em secrets; então usamos try/except
-        val = st.secrets.get("GOOGLE_API_KEY") if hasattr(st.secrets, "get") else st.secrets["GOOGLE_API_KEY"]  # noqa
+        ler = st.secrets.get if hasattr(st.secrets, "get") else (lambda k: st.secrets[k] if k in st.secrets else None)  # noqa
+        val = _lista_chaves(ler("GOOGLE_API_KEYS")) + _lista_chaves(ler("GOOGLE_API_KEY"))
         if val:
             return val
     except Exception:
         pass  # nada de secrets.toml, seguimos
 
-    # 2) Variável de ambiente
-    val = os.getenv("GOOGLE_API_KEY")
+    # 2) Variáveis de ambiente
+    val = _lista_chaves(os.getenv("GOOGLE_API_KEYS")) + _lista_chaves(os.getenv("GOOGLE_API_KEY"))
     if val:
         return val
 
@@ -37,538 +60,723 @@ def load_api_key():
     key = st.text_input("Digite sua GOOGLE_API_KEY", type="password")
     if key:
         st.session_state["GOOGLE_API_KEY"] = key
-        return key
+        return [key]
 
-    return None
+    return []
 
-API_KEY = load_api_key()
+API_KEYS = load_api_keys()
 
-if not API_KEY:
+if not API_KEYS:
     st.stop()  # espera o usuário digitar a chave
 
-# Só configura a SDK depois que temos a chave
-import google.generativeai as genai
-genai.configure(api_key=API_KEY)
+# Clientes do Gemini: criados uma vez por processo e reaproveitados entre reruns/sessões
+@st.cache_resource(show_spinner=False)
+def obter_registro_clientes():
+    return RegistroClientes()
+
+# Chave trocada nesta sessão: descarta os clientes das chaves que saíram
+_chaves_anteriores = st.session_state.get("_api_keys_em_uso") or ()
+for _chave in set(_chaves_anteriores) - set(API_KEYS):
+    obter_registro_clientes().invalidar(_chave)
+st.session_state["_api_keys_em_uso"] = tuple(API_KEYS)
+
+# -------------------- Pool de chaves --------------------
+# Cada chamada à API vai para a chave com mais saldo para o modelo; chave sem
+# cota fica de castigo e a chamada passa para a próxima (chaves.py). O pool é do
+# processo, então todas as sessões dividem o mesmo saldo de cada chave.
+CHAVES_RPM = float(os.getenv("JOGO_CHAVES_RPM", 0))             # por chave e modelo; 0 = sem limite
+CHAVES_RAJADA = float(os.getenv("JOGO_CHAVES_RAJADA", 0)) or None  # fichas acumuladas (padrão: um minuto)
+CHAVES_ESPERA = float(os.getenv("JOGO_CHAVES_ESPERA", 5))        # espera máxima por uma ficha (s)
+
+@st.cache_resource(show_spinner=False)
+def obter_pool_chaves(chaves: tuple):
+    return PoolChaves(chaves, rpm=CHAVES_RPM, rajada=CHAVES_RAJADA, espera_max=CHAVES_ESPERA)
+
+pool_chaves = obter_pool_chaves(tuple(API_KEYS))
+
 # -------------------- UI: pergunta e controles --------------------
+MAX_PARES_DECK_GRANDE = 500
+MAX_PARES_GEMINI = 10   # deck grande só sai do banco; do Gemini, no máximo isto por chamada
+POOL_TAMANHO = int(os.getenv("JOGO_POOL_TAMANHO", 50))
+MODELOS = ["gemini-1.5-flash", "gemini-1.5-pro"]
+
 st.write("Digite sua pergunta (ex.: **Quais são os princípios da Administração Pública?**) e clique em **Gerar Desafio**:")
 
 pergunta = st.text_input("Pergunta", placeholder="Ex.: Quais são os princípios da Administração Pública?")
 
 col_a, col_b, col_c = st.columns([1,1,1])
 with col_a:
-    qtd_pares = st.slider("Quantidade de pares", 4, 10, 6, help="Quantos termos/conceitos o Gemini deve propor.")
+    deck_grande = st.checkbox("Modo deck grande (revisão do edital)", value=False, help="Até centenas de pares, reunidos do banco local.")
+    qtd_pares = st.slider("Quantidade de pares", 4, MAX_PARES_DECK_GRANDE if deck_grande else MAX_PARES_GEMINI, 6, help="Quantos termos/conceitos o Gemini deve propor.")
+    qtd_gemini = min(qtd_pares, MAX_PARES_GEMINI)
 with col_b:
-    modelo = st.selectbox("Modelo do Gemini", ["gemini-1.5-flash", "gemini-1.5-pro"], index=0)
+    modelo = st.selectbox("Modelo do Gemini", MODELOS, index=0)
 with col_c:
     embaralhar_auto = st.checkbox("Embaralhar ao gerar", value=True)
+    streaming = st.checkbox("Mostrar pares conforme chegam", value=True, help=f"O tabuleiro abre com {MIN_PARES} pares e cresce à medida que os outros chegam; Verificar libera com o deck completo.")
+    usar_banco = st.checkbox("Usar banco local de decks", value=True, help="Reaproveita decks de perguntas parecidas antes de chamar o Gemini.")
+    prefetch = st.checkbox("Pré-carregar próximos desafios", value=False, help="Gera os próximos decks da mesma pergunta enquanto você joga.")
+    em_lote = st.checkbox("Gerar em lote e dividir em rodadas", value=False, help=f"Uma chamada traz até {POOL_TAMANHO} pares; os próximos desafios da mesma pergunta saem desse lote, sem repetir pares.")
+
+# -------------------- Revisão espaçada --------------------
+REVISAO_CAMINHO = os.getenv("JOGO_REVISAO_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "revisao.sqlite3"))
+
+@st.cache_resource(show_spinner=False)
+def obter_agenda_revisao():
+    return AgendaRevisao(REVISAO_CAMINHO)
+
+with st.sidebar.expander("🧠 Revisão espaçada"):
+    aluno = (st.text_input("Seu nome ou apelido", key="aluno", help="Guarda seus erros e acertos para montar revisões.") or "").strip()
+    revisar_agora = False
+    if aluno:
+        _rev = obter_agenda_revisao().estatisticas(aluno)
+        st.caption(f"Cartões: {_rev['cartoes']} · Para revisar agora: {_rev['vencidos']}")
+        # Revisão é um desafio à parte: "Gerar Desafio" continua respondendo à pergunta digitada
+        revisar_agora = st.button("🧠 Revisar pares vencidos", disabled=_rev["vencidos"] < MIN_PARES)
+
+def _registrar_revisao(aluno: str, resultado: dict, deck_id: str, termos, gabarito):
+    # Só a primeira resposta de cada termo neste deck conta (reembaralhar não zera); revelar o gabarito conta como erro
+    if st.session_state.get("revisao_deck") != deck_id:
+        st.session_state.revisao_deck = deck_id
+        st.session_state.revisao_registrados = set()
+    registrados = st.session_state.revisao_registrados
+    if resultado.get("revelado"):
+        novos = [(t, False) for t in termos if t not in registrados]
+    else:
+        novos = [(r["termo"], r["correto"]) for r in resultado["respostas"] if r["termo"] not in registrados]
+    novos = [(t, gabarito[t], correto) for t, correto in novos if t in gabarito]
+    if novos:
+        obter_agenda_revisao().registrar(aluno, novos)
+        registrados.update(t for t, _, _ in novos)
+
+# -------------------- Log de eventos das respostas --------------------
+# Colocações, verificações, limpezas e revelações vão para um log gravado em
+# lote por uma thread (eventos.py): registrar aqui não espera o disco.
+EVENTOS_CAMINHO = os.getenv("JOGO_EVENTOS_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "eventos.sqlite3"))
+EVENTOS_LOTE = int(os.getenv("JOGO_EVENTOS_LOTE", 500))
+EVENTOS_INTERVALO = float(os.getenv("JOGO_EVENTOS_INTERVALO", 2))
+
+@st.cache_resource(show_spinner=False)
+def obter_log_eventos():
+    return LogEventos(EVENTOS_CAMINHO, lote=EVENTOS_LOTE, intervalo=EVENTOS_INTERVALO)
+
+def _registrar_eventos(resultado: dict, deck_id: str, gabarito):
+    # O componente repete o último valor a cada rerun e manda as listas acumuladas da rodada: só o que é novo vai para o log
+    marca = st.session_state.get("_eventos_marca")
+    if not marca or marca["rodada"] != resultado.get("rodada"):
+        marca = {"rodada": resultado.get("rodada"), "enviado_em": None, "colocacoes": 0, "limpezas": 0}
+    if marca["enviado_em"] == resultado.get("enviado_em"):
+        return
+    colocacoes, limpezas = resultado.get("colocacoes", []), resultado.get("limpezas", [])
+    eventos = [("colocar", deck_id, p["termo"], gabarito.get(p["termo"]) == p["conceito"], p["t_ms"]) for p in colocacoes[marca["colocacoes"]:]]
+    eventos += [("limpar", deck_id, None, None, ms) for ms in limpezas[marca["limpezas"]:]]
+    if resultado.get("revelado"):
+        eventos += [("revelar", deck_id, t, False, resultado.get("tempo_ms")) for t in gabarito]
+    else:
+        colocado_em = {p["termo"]: p["t_ms"] for p in colocacoes}  # última colocação de cada termo
+        eventos += [("verificar", deck_id, r["termo"], r["correto"], colocado_em.get(r["termo"])) for r in resultado["respostas"]]
+    obter_log_eventos().registrar_varios(eventos)
+    st.session_state._eventos_marca = {"rodada": marca["rodada"], "enviado_em": resultado.get("enviado_em"),
+                                       "colocacoes": len(colocacoes), "limpezas": len(limpezas)}
 
 # -------------------- Gemini helpers --------------------
-def _limpar_texto(s: str) -> str:
-    s = (s or "").strip()
-    s = re.sub(r"\s+", " ", s)
-    return s
-
-def gerar_pares_gemini(pergunta: str, max_itens: int = 6, modelo: str = "gemini-1.5-flash"):
+def gerar_pares_gemini(pergunta: str, max_itens: int = 6, modelo: str = "gemini-1.5-flash", chaves: PoolChaves | None = None, timeout: float | None = None, evitar=()):
     """
-    Retorna (termos, conceitos, gabarito_dict)
+    Retorna (termos, conceitos, gabarito_dict); cada chamada usa uma chave do pool
     """
-    prompt = f"""
-Você é um gerador de flashcards objetivos para concursos públicos no Brasil.
-
-Tarefa: Dada a pergunta abaixo, gere entre 4 e {max_itens} pares de "termo" e "conceito" curtos, corretos e não ambíguos.
-- Evite termos quase iguais entre si.
-- Conceitos devem ter 1–2 frases, no máximo ~160 caracteres cada.
-- Responda exclusivamente em português do Brasil.
-- Saída ESTRITAMENTE em JSON no formato:
-[
-  {{"termo": "Texto do termo", "conceito": "Texto do conceito"}},
-  ...
-]
-
-Pergunta do usuário: "{pergunta}"
-Somente JSON. Sem comentários, sem markdown, sem texto extra antes ou depois.
-"""
-    model = genai.GenerativeModel(modelo)
-    resp = model.generate_content(prompt)
-    text = resp.text or ""
-
-    m = re.search(r"\[\s*\{.*?\}\s*\]", text, flags=re.S)
-    if not m:
-        raise ValueError(f"JSON não encontrado na resposta do modelo: {text[:200]}...")
+    model = ModeloDoPool(chaves or pool_chaves, obter_registro_clientes().modelo, modelo)
+    return gerar_pares(model, pergunta, max_itens, timeout, evitar)
+
+def gerar_pares_gemini_stream(pergunta: str, max_itens: int = 6, modelo: str = "gemini-1.5-flash", chaves: PoolChaves | None = None, timeout: float | None = None, evitar=()):
+    """Versão em streaming de gerar_pares_gemini: gera (termo, conceito) um a um."""
+    model = ModeloDoPool(chaves or pool_chaves, obter_registro_clientes().modelo, modelo)
+    yield from gerar_pares_stream(model, pergunta, max_itens, timeout, evitar)
+
+# -------------------- Prazo e modelo de reserva --------------------
+# O que importa é o tempo até o desafio, não qual modelo respondeu: se o modelo
+# escolhido não trouxe nada até o percentil HEDGE_PERCENTIL da própria latência,
+# a pergunta vai também para o HEDGE_MODELO e fica o primeiro deck válido.
+# Após PRAZO_SEGUNDOS desiste e o desafio sai do cache, do banco ou do mock.
+PRAZO_SEGUNDOS = float(os.getenv("JOGO_PRAZO_SEGUNDOS", 30))
+HEDGE_MODELO = os.getenv("JOGO_HEDGE_MODELO", "gemini-1.5-flash")   # vazio desliga a reserva
+HEDGE_PERCENTIL = float(os.getenv("JOGO_HEDGE_PERCENTIL", 0.9))
+HEDGE_ATRASO = float(os.getenv("JOGO_HEDGE_ATRASO", 8))   # enquanto não há amostras suficientes
+HEDGE_MIN_AMOSTRAS = 20
+
+@st.cache_resource(show_spinner=False)
+def obter_executor_corrida():
+    return ThreadPoolExecutor(max_workers=32, thread_name_prefix="corrida")
+
+def _atraso_reserva(modelo: str, streaming: bool) -> float:
+    if streaming:  # no streaming, "respondeu" = chegou o primeiro par
+        q = metricas.quantil("jogo_gemini_primeiro_par_segundos", HEDGE_PERCENTIL, HEDGE_MIN_AMOSTRAS, modelo=modelo)
+    else:
+        q = metricas.quantil("jogo_gemini_segundos", HEDGE_PERCENTIL, HEDGE_MIN_AMOSTRAS, modelo=modelo, etapa="geracao")
+    return HEDGE_ATRASO if q is None else q
+
+def gerar_pares_com_prazo(pergunta: str, max_itens: int, modelo: str, streaming: bool = False, ao_receber=None, evitar=()):
+    """
+    Corrida entre o modelo escolhido e o de reserva, limitada a PRAZO_SEGUNDOS.
+    Retorna (pares, completo): completo=False para um stream interrompido com ao menos
+    MIN_PARES pares. Levanta PrazoEsgotado (com os parciais) ou o erro da geração.
+    """
+    chaves = pool_chaves
 
+    def corredor(nome_modelo):
+        def gerar(c):
+            if not streaming:
+                termos, conceitos, _ = gerar_pares_gemini(pergunta, max_itens, nome_modelo, chaves, timeout=PRAZO_SEGUNDOS, evitar=evitar)
+                return list(zip(termos, conceitos)), True
+            try:
+                for par in gerar_pares_gemini_stream(pergunta, max_itens, nome_modelo, chaves, timeout=PRAZO_SEGUNDOS, evitar=evitar):
+                    if c.parar.is_set():
+                        break  # perdeu a corrida: fecha o stream
+                    c.pares.append(par)
+            except Exception:
+                if len(c.pares) < MIN_PARES:
+                    raise
+                return c.pares, False
+            return c.pares, True
+        return gerar
+
+    reserva = corredor(HEDGE_MODELO) if HEDGE_MODELO and HEDGE_MODELO != modelo else None
     try:
-        data = json.loads(m.group(0))
-    except json.JSONDecodeError as e:
-        raise ValueError(f"Falha ao decodificar JSON: {e}") from e
-
-    data = json.loads(m.group(0))
-
-    pares = []
-    vistos_termos = set()
-    for item in data:
-        termo = _limpar_texto(item.get("termo", ""))
-        conceito = _limpar_texto(item.get("conceito", ""))
-        if not termo or not conceito:
-            continue
-        if termo.lower() in vistos_termos:
-            continue
-        if len(conceito) > 220:
-            conceito = conceito[:217].rstrip() + "..."
-        vistos_termos.add(termo.lower())
-        pares.append((termo, conceito))
-
-    if len(pares) < 4:
-        raise ValueError("Poucos pares válidos retornados pelo modelo.")
-
+        (pares, completo), vencedor = correr(
+            obter_executor_corrida(), corredor(modelo), reserva,
+            atraso_reserva=_atraso_reserva(modelo, streaming), prazo=PRAZO_SEGUNDOS, ao_progresso=ao_receber,
+        )
+    except PrazoEsgotado as e:
+        if len(e.parciais) < MIN_PARES:
+            raise
+        metricas.contar("jogo_corrida_total", modelo=modelo, vencedor="parcial")
+        return e.parciais, False
+    metricas.contar("jogo_corrida_total", modelo=modelo, vencedor=vencedor)
+    return pares, completo
+
+# -------------------- Cache de pares --------------------
+CACHE_CAMINHO = os.getenv("JOGO_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "pares.sqlite3"))
+CACHE_TTL = float(os.getenv("JOGO_CACHE_TTL", 7 * 24 * 3600))
+CACHE_MAX_ENTRADAS = int(os.getenv("JOGO_CACHE_MAX_ENTRADAS", 5000))
+
+@st.cache_resource(show_spinner=False)
+def obter_cache_pares():
+    return CachePares(CACHE_CAMINHO, ttl=CACHE_TTL, max_entradas=CACHE_MAX_ENTRADAS)
+
+# -------------------- Banco local de decks --------------------
+BANCO_CAMINHO = os.getenv("JOGO_BANCO_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "banco.sqlite3"))
+
+@st.cache_resource(show_spinner=False)
+def obter_banco_decks():
+    return BancoDecks(BANCO_CAMINHO)
+
+# -------------------- Voo único: pedidos iguais simultâneos --------------------
+VOO_TIMEOUT = float(os.getenv("JOGO_VOO_TIMEOUT", 90))
+
+@st.cache_resource(show_spinner=False)
+def obter_voo_unico():
+    return VooUnico()
+
+def _coalescer(chave, gerar, ao_esperar=None):
+    """Uma chamada ao Gemini por chave entre sessões simultâneas; as demais recebem os mesmos pares."""
+    pares, lider = obter_voo_unico().executar(chave, gerar, timeout=VOO_TIMEOUT, ao_esperar=ao_esperar)
+    metricas.contar("jogo_voo_unico_total", papel="lider" if lider else "espera")
+    return pares
+
+def deck_de_reserva(pergunta: str, max_itens: int):
+    """Depois do prazo: um deck já pronto para a pergunta (cache de qualquer modelo ou banco), ou None."""
+    norm = _normalizar_pergunta(pergunta)
+    cache = obter_cache_pares()
+    for m in dict.fromkeys([HEDGE_MODELO, *MODELOS]):
+        pares = cache.obter(chave_pares(norm, max_itens, m), contar=False) if m else None
+        if pares:
+            return pares
+    banco = obter_banco_decks()
+    return banco.buscar(pergunta, max_itens) or banco.buscar(pergunta, MIN_PARES)
+
+def gerar_pares_com_cache(pergunta: str, max_itens: int = 6, modelo: str = "gemini-1.5-flash", evitar=()):
+    """
+    Igual a gerar_pares_gemini, mas consulta antes o cache persistente. Com
+    `evitar` (termos já vistos), pula o cache e a geração nova o substitui.
+    Retorna (termos, conceitos, gabarito_dict).
+    """
+    cache = obter_cache_pares()
+    chave = chave_pares(_normalizar_pergunta(pergunta), max_itens, modelo)
+    pares = None if evitar else cache.obter(chave)
+    if pares is None:
+        def gerar():
+            pares, _ = gerar_pares_com_prazo(pergunta, max_itens, modelo, evitar=evitar)
+            cache.guardar(chave, pares)
+            obter_banco_decks().adicionar(pergunta, pares, modelo=modelo)
+            return pares
+
+        pares = _coalescer((chave, "renovar") if evitar else chave, gerar)
     termos = [t for t, _ in pares]
     conceitos = [c for _, c in pares]
     gabarito = {t: c for t, c in pares}
+    return termos, conceitos, gabarito
 
+def gerar_pares_stream_com_cache(pergunta: str, max_itens: int = 6, modelo: str = "gemini-1.5-flash", ao_receber=None, evitar=()):
+    """
+    Como gerar_pares_com_cache, mas em streaming: chama ao_receber(pares_ate_agora)
+    a cada par novo. Um deck parcial (stream interrompido após MIN_PARES) é
+    aproveitado, mas não vai para o cache.
+    """
+    cache = obter_cache_pares()
+    chave = chave_pares(_normalizar_pergunta(pergunta), max_itens, modelo)
+    pares = None if evitar else cache.obter(chave)
+    if pares is None:
+        def gerar():
+            pares, completo = gerar_pares_com_prazo(pergunta, max_itens, modelo, streaming=True, ao_receber=ao_receber, evitar=evitar)
+            if completo:
+                cache.guardar(chave, pares)
+                obter_banco_decks().adicionar(pergunta, pares, modelo=modelo)
+            return pares
+
+        # Quem espera outra sessão não vê os pares chegando, só o aviso de espera
+        pares = _coalescer((chave, "renovar") if evitar else chave, gerar, ao_esperar=(lambda: ao_receber([])) if ao_receber else None)
+    termos = [t for t, _ in pares]
+    conceitos = [c for _, c in pares]
+    gabarito = {t: c for t, c in pares}
     return termos, conceitos, gabarito
 
-def gerar_pares_mock():
-    base = {
-        "Legalidade": "A administração só pode agir conforme a lei.",
-        "Impessoalidade": "Os atos devem visar ao interesse público, sem favorecimento.",
-        "Moralidade": "Os atos devem respeitar princípios éticos.",
-        "Publicidade": "Os atos devem ser transparentes e acessíveis.",
-        "Eficiência": "Os serviços devem ser prestados de forma adequada e rápida."
-    }
-    termos = list(base.keys())
-    conceitos = list(base.values())
-    return termos, conceitos, base
+# -------------------- Fallbacks para o mock --------------------
+log = logging.getLogger("jogo")
+
+def _registrar_fallback(motivo: str, detalhe: str = ""):
+    metricas.contar("jogo_fallback_total", motivo=motivo)
+    log.warning("Usando deck mock (%s): %s", motivo, detalhe)
+
+with st.sidebar.expander("📦 Cache de desafios"):
+    _stats = obter_cache_pares().estatisticas()
+    st.caption(f"Acertos: {_stats['acertos']} · Falhas: {_stats['falhas']} · Entradas: {_stats['entradas']}")
+    st.caption(f"Decks no banco local: {obter_banco_decks().total()}")
+    _motivos = sorted(((dict(r)["motivo"], n) for r, n in metricas.contadores("jogo_fallback_total").items()), key=lambda x: -x[1])
+    if _motivos:
+        st.caption("Fallbacks para o mock: " + " · ".join(f"{m}: {n:.0f}" for m, n in _motivos))
+    if len(pool_chaves) > 1:
+        st.caption("Chaves do Gemini: " + " · ".join(
+            f"{u['chave']} ({u['modelo']}): {u['pedidos']} pedido(s)" + (f", castigo {u['castigo_s']:.0f}s" if u["castigo_s"] else "")
+            for u in pool_chaves.uso()))
+
+# -------------------- Métricas: exportação e painel de debug --------------------
+METRICAS_ARQUIVO = os.getenv("JOGO_METRICAS_ARQUIVO")   # ex.: /var/lib/node_exporter/jogo.prom
+METRICAS_PORTA = os.getenv("JOGO_METRICAS_PORTA")       # ex.: 9108 -> http://host:9108/metrics
+
+metricas.descrever("jogo_gemini_segundos", "Latência das chamadas ao Gemini por modelo e etapa.")
+metricas.descrever("jogo_gemini_primeiro_par_segundos", "Tempo até o primeiro par válido no streaming.")
+metricas.descrever("jogo_gemini_tokens_total", "Tokens de entrada/saída por modelo.")
+metricas.descrever("jogo_gemini_erros_total", "Exceções nas chamadas ao Gemini.")
+metricas.descrever("jogo_parse_segundos", "Tempo de extração do JSON e de validação/deduplicação dos pares.")
+metricas.descrever("jogo_fallback_total", "Desafios servidos com o deck mock, por motivo.")
+metricas.descrever("jogo_desafios_total", "Desafios montados, por origem.")
+metricas.descrever("jogo_corrida_total", "Gerações com prazo, por modelo pedido e vencedor (primario/reserva/parcial).")
+metricas.descrever("jogo_voo_unico_total", "Gerações por papel no voo único (líder chama o Gemini, espera reaproveita).")
+metricas.descrever("jogo_tabuleiro_bytes", "Tamanho dos dados do deck enviados ao tabuleiro.")
+metricas.descrever("jogo_tabuleiro_segundos", "Tempo de renderização do tabuleiro no servidor.")
+metricas.descrever("jogo_rerun_segundos", "Duração total de cada rerun do script.")
+metricas.descrever("jogo_eventos_total", "Eventos do tabuleiro gravados no log.")
+metricas.descrever("jogo_eventos_descartados_total", "Eventos do tabuleiro perdidos, por motivo (fila cheia, erro de gravação).")
+metricas.descrever("jogo_eventos_gravacao_segundos", "Tempo de gravação de cada lote de eventos.")
+metricas.descrever("jogo_chaves_total", "Gerações por chave do Gemini (mascarada) e resultado (sucesso/cota/erro).")
+metricas.descrever("jogo_chaves_espera_segundos", "Espera por uma ficha no pool de chaves.")
+metricas.descrever("jogo_chaves_sem_cota_total", "Gerações recusadas porque nenhuma chave tinha saldo a tempo.")
+
+@st.cache_resource(show_spinner=False)
+def iniciar_endpoint_metricas():
+    return metricas.servir_http(int(METRICAS_PORTA)) if METRICAS_PORTA else None
+
+iniciar_endpoint_metricas()
+
+def _encerrar_rerun():
+    metricas.observar("jogo_rerun_segundos", time.perf_counter() - _inicio_rerun)
+    if METRICAS_ARQUIVO:
+        metricas.gravar_se_preciso(METRICAS_ARQUIVO)
+    if st.query_params.get("debug") or os.getenv("JOGO_DEBUG"):
+        with st.sidebar.expander("⏱️ Métricas (debug)", expanded=True):
+            st.dataframe(metricas.resumo(), hide_index=True)
+            st.caption("Uso das chaves do Gemini")
+            st.dataframe(pool_chaves.uso(), hide_index=True)
+            st.caption("Termos mais errados (log de eventos)")
+            st.dataframe(obter_log_eventos().taxas_erro(min_respostas=3, limite=10), hide_index=True)
+            st.download_button("Baixar (Prometheus)", metricas.exportar_prometheus(), file_name="jogo.prom", mime="text/plain")
+
+# -------------------- Tabuleiro (componente) --------------------
+# HTML/CSS/JS estáticos em tabuleiro/; por rerun só os dados do deck vão ao navegador
+_tabuleiro = components.declare_component("tabuleiro", path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "tabuleiro"))
+
+def tabuleiro(termos, conceitos, gabarito, key: str = "tabuleiro", serie: str | None = None, embaralhar: bool = False, parcial: bool = False):
+    """
+    Renderiza o jogo. Retorna o último resultado enviado pelo navegador
+    (acertos, total, tempo_ms, respostas, colocações, limpezas) ou None.
+    Com `serie` (deck ainda chegando em streaming), o navegador cresce o tabuleiro
+    no lugar enquanto as listas só ganham pares no fim e embaralha ele mesmo as
+    posições (`embaralhar`); `parcial` bloqueia Verificar e Gabarito.
+    """
+    args = dados_tabuleiro(termos, conceitos, gabarito)
+    if serie:
+        args.update(serie=serie, embaralhar=embaralhar, parcial=parcial)
+    deck_id = args["deck_id"]
+    metricas.observar("jogo_tabuleiro_bytes", len(json.dumps(args, ensure_ascii=False).encode("utf-8")), limites=LIMITES_BYTES)
+    with metricas.cronometrar("jogo_tabuleiro_segundos"):
+        resultado = _tabuleiro(**args, key=key, default=None)
+    if not resultado or resultado.get("deck_id") != deck_id:
+        return None  # nada enviado ainda, ou resultado de um deck anterior
+    # ids -> textos, para quem consome o resultado no Python
+    resultado = dict(resultado)
+    resultado["respostas"] = [{"termo": termos[r["t"]], "conceito": conceitos[r["c"]], "correto": r["ok"]} for r in resultado.get("respostas", [])]
+    resultado["colocacoes"] = [{"termo": termos[p["t"]], "conceito": conceitos[p["c"]], "t_ms": p["ms"]} for p in resultado.get("colocacoes", [])]
+    return resultado
+
+# -------------------- Pré-carregamento --------------------
+PREFETCH_TAMANHO = int(os.getenv("JOGO_PREFETCH_TAMANHO", 2))
+PREFETCH_MAX_CONCORRENTES = int(os.getenv("JOGO_PREFETCH_MAX_CONCORRENTES", 4))
+
+@st.cache_resource(show_spinner=False)
+def obter_executor_prefetch():
+    # Teto de chamadas de pré-carregamento simultâneas no processo inteiro
+    return ThreadPoolExecutor(max_workers=PREFETCH_MAX_CONCORRENTES, thread_name_prefix="prefetch")
+
+def _gerar_deck_prefetch(pergunta: str, max_itens: int, modelo: str, chaves: PoolChaves, banco: BancoDecks):
+    termos, conceitos, _ = gerar_pares_gemini(pergunta, max_itens=max_itens, modelo=modelo, chaves=chaves, timeout=PRAZO_SEGUNDOS)
+    pares = list(zip(termos, conceitos))
+    banco.adicionar(pergunta, pares, modelo=modelo)
+    return pares
+
+# -------------------- Decks compartilhados --------------------
+# O deck fica uma vez só no processo (decks.py); a sessão guarda o id e a
+# semente do embaralhamento, e "Novo Embaralhamento" só troca a semente.
+DECKS_MAX = int(os.getenv("JOGO_DECKS_MAX", 10_000))
+
+@st.cache_resource(show_spinner=False)
+def obter_armazem_decks():
+    return ArmazemDecks(max_decks=DECKS_MAX)
+
+def _novo_desafio(pares, serie: str | None = None):
+    _descartar_geracao()
+    deck = obter_armazem_decks().guardar(pares)
+    if serie:
+        # Deck que chegou em streaming: o tabuleiro já está na tela, embaralhado pelo
+        # navegador; a ordem original deixa o deck final crescer o mesmo tabuleiro.
+        st.session_state.desafio = {"deck": deck.id, "semente": None, "serie": serie, "embaralhar": embaralhar_auto}
+    else:
+        st.session_state.desafio = {"deck": deck.id, "semente": random.getrandbits(32) if embaralhar_auto else None}
+
+def _deck_atual():
+    desafio = st.session_state.get("desafio")
+    return obter_armazem_decks().obter(desafio["deck"]) if desafio else None
+
+# -------------------- Geração em segundo plano --------------------
+# Em streaming, "Gerar Desafio" só dispara a geração (parciais.py) e o rerun
+# termina; o fragmento do tabuleiro relê os pares a cada INTERVALO_PARCIAIS s e
+# abre o jogo com MIN_PARES. Quando a geração acaba, a página inteira roda e o
+# deck final vira o desafio.
+INTERVALO_PARCIAIS = float(os.getenv("JOGO_INTERVALO_PARCIAIS", 1))
+
+@st.cache_resource(show_spinner=False)
+def obter_executor_geracao():
+    # Não é o da corrida: cada geração fica esperando os corredores que ela mesma
+    # põe lá, e no mesmo pool essas esperas podiam ocupar todos os workers.
+    return ThreadPoolExecutor(max_workers=32, thread_name_prefix="geracao")
+
+def _descartar_geracao():
+    geracao = st.session_state.pop("geracao", None)
+    if geracao is not None:
+        geracao.cancelar()  # se já começou, termina sozinha e o deck vai para o cache
+
+def _iniciar_geracao(pergunta: str, max_itens: int, modelo: str):
+    _descartar_geracao()
+    st.session_state.desafio = None
+    st.session_state.geracao = GeracaoParcial(
+        obter_executor_geracao(),
+        lambda ao_receber: gerar_pares_stream_com_cache(pergunta, max_itens, modelo, ao_receber=ao_receber),
+    )
+
+# -------------------- Rodadas a partir de um lote --------------------
+# Com "Gerar em lote", uma chamada pede POOL_TAMANHO pares (cache e voo único
+# valem para o lote como para um deck) e cada "Gerar Desafio" seguinte tira a
+# próxima rodada do lote, sem repetir par (rodadas.py). Um deck do banco local
+# com POOL_TAMANHO pares serve de primeiro lote, paginado do mesmo jeito. A
+# sessão guarda o id do lote no armazém, a ordem e o cursor; acabou o lote,
+# pede outro ao Gemini evitando os termos vistos.
+RECENTES_MAX = int(os.getenv("JOGO_RECENTES_MAX", 200))
+
+def rodada_do_lote(pergunta: str, n: int, modelo: str, streaming: bool, ao_receber=None, usar_banco: bool = True):
+    """Próxima rodada de n pares do lote da pergunta; retorna (pares, origem: "rodada", "banco" ou "gerado")."""
+    armazem = obter_armazem_decks()
+    chave = (_normalizar_pergunta(pergunta), modelo)
+    estado = st.session_state.get("rodadas")
+    lote = armazem.obter(estado["lote"]) if estado and estado["chave"] == chave else None
+    indices, origem = [], "rodada"
+    if lote is not None:
+        indices, cursor = proxima_rodada(estado["ordem"], estado["cursor"], n, MIN_PARES)
+    if not indices:
+        # Lote esgotado: o próximo vem do Gemini e deve trazer termos novos
+        pares = obter_banco_decks().buscar(pergunta, POOL_TAMANHO) if usar_banco and lote is None else None
+        if pares:
+            origem = "banco"
+        else:
+            evitar = lote.termos if lote is not None else ()
+            if streaming:
+                termos, conceitos, _ = gerar_pares_stream_com_cache(pergunta, POOL_TAMANHO, modelo, ao_receber=ao_receber, evitar=evitar)
+            else:
+                termos, conceitos, _ = gerar_pares_com_cache(pergunta, POOL_TAMANHO, modelo, evitar=evitar)
+            pares = zip(termos, conceitos)
+            origem = "gerado"
+        lote = armazem.guardar(pares)
+        ordem = ordem_rodadas(lote.termos, random.getrandbits(32), st.session_state.get("recentes", ()))
+        estado = {"chave": chave, "lote": lote.id, "ordem": ordem, "cursor": 0}
+        indices, cursor = proxima_rodada(ordem, 0, n, MIN_PARES)
+    st.session_state.rodadas = {**estado, "cursor": cursor}
+    pares = [(lote.termos[i], lote.conceitos[i]) for i in indices]
+    recentes = st.session_state.setdefault("recentes", deque(maxlen=RECENTES_MAX))
+    lembrar(recentes, (t for t, _ in pares))
+    return pares, origem
 
 # -------------------- Estado --------------------
 if "desafio" not in st.session_state:
     st.session_state.desafio = None
+if "fila_prefetch" not in st.session_state:
+    st.session_state.fila_prefetch = FilaPrefetch(obter_executor_prefetch(), tamanho=PREFETCH_TAMANHO)
+
+# Pergunta, quantidade ou modelo mudou (ou o pré-carregamento foi desligado): descarta a fila
+fila_prefetch = st.session_state.fila_prefetch
+chave_prefetch = (_normalizar_pergunta(pergunta), qtd_pares, modelo)
+if fila_prefetch.chave is not None and (not prefetch or fila_prefetch.chave != chave_prefetch):
+    fila_prefetch.cancelar()
+
+# -------------------- Sala de aula --------------------
+# O professor abre uma sala com o desafio atual; os participantes jogam o mesmo
+# deck (guardado uma vez no processo), cada um com o seu embaralhamento.
+SALA_TTL = float(os.getenv("JOGO_SALA_TTL", 4 * 3600))
+PLACAR_INTERVALO = float(os.getenv("JOGO_PLACAR_INTERVALO", 3))
+
+@st.cache_resource(show_spinner=False)
+def obter_registro_salas():
+    return RegistroSalas(ttl=SALA_TTL)
+
+sala_sessao = st.session_state.get("sala")  # {"codigo", "anfitriao", "semente"}
+sala = obter_registro_salas().obter(sala_sessao["codigo"]) if sala_sessao else None
+if sala_sessao and sala is None:
+    st.session_state.sala = sala_sessao = None
+    st.warning("A sala expirou ou foi encerrada.")
+participante = bool(sala and not sala_sessao["anfitriao"])
+
+def _nome_no_placar() -> str:
+    if aluno:
+        return aluno
+    if "_apelido" not in st.session_state:
+        st.session_state._apelido = f"Anônimo {random.randint(100, 999)}"
+    return st.session_state._apelido
+
+painel_sala = st.sidebar.expander("🏫 Sala de aula", expanded=sala is not None)
+with painel_sala:
+    if sala is None:
+        _codigo = (st.text_input("Código da sala", max_chars=TAMANHO_CODIGO) or "").strip().upper()
+        if st.button("Entrar na sala", disabled=not _codigo):
+            if obter_registro_salas().obter(_codigo):
+                st.session_state.sala = {"codigo": _codigo, "anfitriao": False, "semente": random.getrandbits(32)}
+                st.session_state.desafio = None  # o deck passa a vir da sala
+                st.rerun()
+            st.error("Sala não encontrada.")
+    else:
+        st.markdown(f"Sala **{sala.codigo}** · {'você é o professor' if sala_sessao['anfitriao'] else 'participante'}")
+        st.caption(f"Seu nome no placar: {_nome_no_placar()}")
+        if st.button("Sair da sala"):
+            st.session_state.sala = None
+            st.rerun()
+
+@st.fragment(run_every=PLACAR_INTERVALO)
+def placar_ao_vivo(codigo: str, versao: int, nome: str):
+    """Atualiza só o placar a cada PLACAR_INTERVALO s; se o professor trocou o deck, roda a página inteira."""
+    registro = obter_registro_salas()
+    atual = registro.obter(codigo)
+    if atual is None:
+        return
+    if atual.versao != versao:
+        st.rerun(scope="app")
+    topo, total = registro.placar(codigo, 10)
+    if not topo:
+        st.caption("Ninguém terminou ainda.")
+        return
+    st.dataframe(
+        [{"#": i, "Nome": p, "Acertos": a, "Tempo (s)": round(t / 1000)} for i, (p, a, t) in enumerate(topo, 1)],
+        hide_index=True,
+    )
+    posicao = registro.posicao(codigo, nome)
+    st.caption(f"{total} no placar" + (f" · você está em {posicao}º" if posicao else ""))
 
 # -------------------- Geração do desafio --------------------
 c1, c2 = st.columns([1,1])
+area_tabuleiro = st.empty()
+
+def _mostrar_progresso(recebidos: int, total: int):
+    area_tabuleiro.info(f"⏳ Recebendo pares do Gemini... {recebidos}/{total}")
+
+def _abastecer_prefetch():
+    if prefetch:
+        fila_prefetch.abastecer(chave_prefetch, lambda p=pergunta.strip(), q=qtd_gemini, m=modelo, k=pool_chaves, b=obter_banco_decks(): _gerar_deck_prefetch(p, q, m, k, b))
+
+def _desafio_de_falha(e: Exception):
+    # Prazo estourado (aqui ou na sessão que lidera o mesmo pedido): antes do mock, qualquer deck pronto
+    pares_reserva = deck_de_reserva(pergunta.strip(), qtd_pares) if isinstance(e, TimeoutError) else None
+    if pares_reserva:
+        metricas.contar("jogo_desafios_total", origem="reserva")
+        st.info(f"⏱️ O Gemini não respondeu a tempo ({e}). Usando um deck já pronto para esta pergunta.")
+        _novo_desafio(pares_reserva)
+    else:
+        metricas.contar("jogo_desafios_total", origem="mock")
+        _registrar_fallback(getattr(e, "motivo", "erro_api:" + type(e).__name__), str(e))
+        st.warning(f"Falha ao gerar via Gemini: {e}. Usando exemplo mock.")
+        termos, conceitos, _ = gerar_pares_mock()
+        _novo_desafio(zip(termos, conceitos))
+
 with c1:
-    if st.button("🎲 Gerar Desafio"):
-        if API_KEY and (pergunta or "").strip():
+    if participante:
+        st.caption(f"🏫 Deck da sala {sala.codigo}: quem troca o desafio é o professor.")
+    elif revisar_agora:
+        pares_revisao = obter_agenda_revisao().proximos(aluno, qtd_pares)
+        if len(pares_revisao) >= MIN_PARES:
+            st.info(f"🧠 Desafio de revisão: {len(pares_revisao)} pares vencidos.")
+            metricas.contar("jogo_desafios_total", origem="revisao")
+            _novo_desafio(pares_revisao)
+    if not participante and st.button("🎲 Gerar Desafio"):
+        if API_KEYS and (pergunta or "").strip():
             try:
-                termos, conceitos, gabarito = gerar_pares_gemini(pergunta.strip(), max_itens=qtd_pares, modelo=modelo)
-                if embaralhar_auto:
-                    random.shuffle(termos); random.shuffle(conceitos)
-                st.session_state.desafio = {"termos": termos, "conceitos": conceitos, "gabarito": gabarito}
+                pares_prontos = fila_prefetch.retirar(chave_prefetch) if prefetch else None
+                origem = "prefetch"
+                if not pares_prontos and em_lote and not deck_grande:
+                    # O banco entra em rodada_do_lote como lote inteiro (um deck sorteado do banco
+                    # a cada clique repetiria pares entre rodadas). A rodada sai de uma permutação
+                    # do lote: mostrar os pares que chegam anunciaria pares fora dela. Só o progresso.
+                    pares_prontos, origem = rodada_do_lote(pergunta.strip(), qtd_pares, modelo, streaming, ao_receber=lambda p: _mostrar_progresso(len(p), POOL_TAMANHO), usar_banco=usar_banco)
+                    _rodadas = st.session_state.rodadas
+                    st.caption(f"📚 Lote de {len(_rodadas['ordem'])} pares · {len(_rodadas['ordem']) - _rodadas['cursor']} ainda não jogados")
+                elif not pares_prontos and usar_banco:
+                    origem = "banco"
+                    if deck_grande:
+                        pares_prontos = obter_banco_decks().reunir(pergunta.strip(), qtd_pares)
+                        pares_prontos = pares_prontos if len(pares_prontos) >= MIN_PARES else None
+                    else:
+                        pares_prontos = obter_banco_decks().buscar(pergunta.strip(), qtd_pares)
+                if not pares_prontos and deck_grande:
+                    st.info(f"📚 O banco local ainda não tem pares para um deck grande desta pergunta; gerando um deck de até {qtd_gemini} pares.")
+                if pares_prontos:
+                    metricas.contar("jogo_desafios_total", origem=origem)
+                    _novo_desafio(pares_prontos)
+                    _abastecer_prefetch()
+                elif streaming:
+                    # Termina (ou cai no deck de reserva/mock) num rerun seguinte, abaixo
+                    _iniciar_geracao(pergunta.strip(), qtd_gemini, modelo)
+                else:
+                    termos, conceitos, _ = gerar_pares_com_cache(pergunta.strip(), max_itens=qtd_gemini, modelo=modelo)
+                    metricas.contar("jogo_desafios_total", origem="gerado")  # Gemini ou cache persistente
+                    _novo_desafio(zip(termos, conceitos))
+                    _abastecer_prefetch()
             except Exception as e:
-                st.warning(f"Falha ao gerar via Gemini: {e}. Usando exemplo mock.")
-                termos, conceitos, gabarito = gerar_pares_mock()
-                if embaralhar_auto:
-                    random.shuffle(termos); random.shuffle(conceitos)
-                st.session_state.desafio = {"termos": termos, "conceitos": conceitos, "gabarito": gabarito}
+                _desafio_de_falha(e)
         else:
-            if not API_KEY:
+            if not API_KEYS:
+                _registrar_fallback("sem_chave")
                 st.warning("Sem GOOGLE_API_KEY configurada. Usando exemplo mock.")
             elif not (pergunta or "").strip():
+                _registrar_fallback("sem_pergunta")
                 st.warning("Digite uma pergunta antes de gerar com o Gemini. Usando exemplo mock.")
-            termos, conceitos, gabarito = gerar_pares_mock()
-            if embaralhar_auto:
-                random.shuffle(termos); random.shuffle(conceitos)
-            st.session_state.desafio = {"termos": termos, "conceitos": conceitos, "gabarito": gabarito}
+            metricas.contar("jogo_desafios_total", origem="mock")
+            termos, conceitos, _ = gerar_pares_mock()
+            _novo_desafio(zip(termos, conceitos))
+
+    # Geração em streaming que terminou desde o último rerun: o deck final vira o desafio
+    geracao = st.session_state.get("geracao")
+    if geracao is not None and geracao.terminou() and not participante:
+        serie = geracao.serie
+        st.session_state.geracao = None
+        try:
+            termos, conceitos, _ = geracao.resultado()
+        except Exception as e:
+            _desafio_de_falha(e)
+        else:
+            metricas.contar("jogo_desafios_total", origem="gerado")  # Gemini ou cache persistente
+            _novo_desafio(zip(termos, conceitos), serie=serie)
+            _abastecer_prefetch()
 
 with c2:
-    if st.session_state.get("desafio") and st.button("🔄 Novo Embaralhamento"):
-        d = st.session_state["desafio"]
-        termos, conceitos, gabarito = d["termos"], d["conceitos"], d["gabarito"]
-        random.shuffle(termos); random.shuffle(conceitos)
-        st.session_state.desafio = {"termos": termos, "conceitos": conceitos, "gabarito": gabarito}
-
-# Guard antes de usar o desafio
-if not st.session_state.desafio:
+    if participante:
+        if st.button("🔄 Novo Embaralhamento"):
+            sala_sessao["semente"] = random.getrandbits(32)
+    elif st.session_state.get("desafio") and st.button("🔄 Novo Embaralhamento"):
+        st.session_state.desafio = {**st.session_state.desafio, "semente": random.getrandbits(32), "serie": None}
+
+deck = None if participante else _deck_atual()
+# Professor: cada desafio novo vai para a sala (reembaralhar não troca o deck)
+if sala and sala_sessao["anfitriao"] and deck and deck.id != st.session_state.get("_desafio_publicado"):
+    obter_registro_salas().publicar(sala.codigo, deck, (pergunta or "").strip())
+    st.session_state._desafio_publicado = deck.id
+with painel_sala:
+    if sala:
+        placar_ao_vivo(sala.codigo, sala.versao, _nome_no_placar())
+    elif deck and st.button("Abrir sala com o desafio atual"):
+        _nova = obter_registro_salas().criar(deck, (pergunta or "").strip())
+        st.session_state.sala = {"codigo": _nova.codigo, "anfitriao": True, "semente": random.getrandbits(32)}
+        st.session_state._desafio_publicado = deck.id
+        st.rerun()
+
+# Guard antes de usar o desafio (o deck some do armazém se ficar muito tempo sem uso)
+geracao = None if participante else st.session_state.get("geracao")
+if not participante and deck is None and geracao is None:
+    st.session_state.desafio = None
     st.info("Clique em **Gerar Desafio** para começar.")
+    _encerrar_rerun()
     st.stop()
 
-termos = st.session_state.desafio["termos"]
-conceitos = st.session_state.desafio["conceitos"]
-gabarito = st.session_state.desafio["gabarito"]
-
-# -------------------- HTML/JS (com chaves escapadas) --------------------
-html_code = f"""
-<!DOCTYPE html>
-<html>
-<head>
-<meta charset="utf-8" />
-<style>
-  :root {{
-    --border:#e5e7eb; --muted:#cbd5e1; --bg:#ffffff; --panel:#f8fafc;
-    --ok:#16a34a; --err:#dc2626; --brand:#1d4ed8; --ink:#0f172a; --warn:#f59e0b;
-  }}
-  * {{ box-sizing:border-box; }}
-  body {{ font-family: system-ui, -apple-system, Segoe UI, Roboto, Arial, sans-serif; margin:0; }}
-  .game-root {{
-    border:1px solid var(--border); border-radius:14px; background:var(--bg);
-    box-shadow:0 1px 4px rgba(0,0,0,.05);
-  }}
-  .toolbar {{
-    position: sticky; top: 0; z-index: 10;
-    display:flex; gap:12px; align-items:center; justify-content:flex-start;
-    padding:12px; background:var(--bg); border-bottom:1px solid var(--border);
-  }}
-  .btn {{
-    padding:8px 12px; border-radius:10px; border:1px solid var(--muted);
-    background:#fff; cursor:pointer; font-weight:500;
-  }}
-  .btn:hover {{ background:#f8fafc; }}
-  .score {{ margin-left:auto; font-weight:600; }}
-
-  .row {{ display:flex; gap:24px; padding:14px; background:var(--panel); border-radius:0 0 14px 14px; }}
-  .col {{ flex:1; min-width:0; }}
-  .panel {{
-    background:#fff; border:1px solid var(--border); border-radius:12px;
-    box-shadow:0 1px 3px rgba(0,0,0,0.06); display:flex; flex-direction:column; min-height:660px;
-  }}
-  .panel h3 {{ margin:14px 14px 8px; }}
-  .panel-body {{
-    margin:0 14px 14px; border:1px dashed var(--muted); border-radius:10px;
-    background:#fafafa; padding:12px; height:600px; overflow-y:auto;
-  }}
-
-  .card-term {{
-    padding:14px 16px; background:var(--brand); color:white; border-radius:12px;
-    margin:8px 0; cursor:grab; user-select:none; font-weight:600; font-size:15px; text-align:center;
-    transition: transform 0.15s, box-shadow .15s; box-shadow:0 1px 2px rgba(0,0,0,.08);
-  }}
-  .card-term:active {{ cursor:grabbing; }}
-  .card-term:hover {{ transform:scale(1.03); }}
-
-  .concept-card {{
-    border:1px solid var(--muted); border-radius:12px; padding:12px; margin:10px 0; background:#ffffff;
-    box-shadow:0 1px 2px rgba(0,0,0,0.05);
-  }}
-  .concept-text {{ color:var(--ink); margin-bottom:8px; font-size:15px; font-weight:500; }}
-  .drop {{
-    border:2px dashed var(--muted); min-height:64px; border-radius:12px; padding:8px;
-    display:flex; align-items:center; justify-content:center; background:#fff; transition: background .15s, border-color .15s;
-  }}
-  .drop.over {{ background:#f1f5f9; }}
-  .correct {{ border-color:var(--ok) !important; background:#ecfdf5 !important; }}
-  .wrong   {{ border-color:var(--err) !important; background:#fef2f2 !important; }}
-
-  .badge {{ display:inline-block; padding:4px 8px; border-radius:8px; font-size:12px; margin-left:8px; }}
-  .ok  {{ background:var(--ok);  color:#fff; }}
-  .err {{ background:var(--err); color:#fff; }}
-
-  /* ===== Modal (popup) ===== */
-  .modal-backdrop {{
-    position: fixed; inset: 0; background: rgba(0,0,0,0.45);
-    display: none; align-items: center; justify-content: center; z-index: 9999;
-  }}
-  .modal {{
-    width: min(520px, 92vw);
-    background: #fff; border-radius: 16px; border: 1px solid var(--border);
-    box-shadow: 0 20px 60px rgba(0,0,0,.25);
-    padding: 24px; text-align: center; position: relative; overflow: hidden;
-  }}
-  .modal h2 {{ margin: 0 0 8px; }}
-  .modal p  {{ margin: 8px 0 16px; color: #334155; }}
-  .modal .close {{
-    position: absolute; top: 10px; right: 12px; border:1px solid var(--muted);
-    background:#fff; border-radius: 8px; padding: 6px 10px; cursor:pointer;
-  }}
-
-  /* Confetti simples */
-  .confetti {{
-    position: absolute; top: -10px; width: 8px; height: 14px; opacity: .9;
-    animation: fall 2.1s linear forwards;
-  }}
-  @keyframes fall {{
-    0%   {{ transform: translateY(-20px) rotate(0deg);   }}
-    100% {{ transform: translateY(700px) rotate(720deg); }}
-  }}
-
-  /* Animação de pulso para motivação */
-  .pulse {{ display:inline-block; animation: pulser 1s ease-in-out infinite; }}
-  @keyframes pulser {{
-    0%   {{ transform: scale(1);   }}
-    50%  {{ transform: scale(1.12);}}
-    100% {{ transform: scale(1);   }}
-  }}
-
-  .bar-wrap {{
-    height: 10px; background:#f1f5f9; border-radius: 999px; overflow:hidden; margin: 12px 0 6px;
-    border:1px solid var(--border);
-  }}
-  .bar-fill {{
-    height:100%; width:0%; background: linear-gradient(90deg, #22c55e, #3b82f6);
-    transition: width .6s ease;
-  }}
-  .hint {{ font-size: 13px; color:#64748b; }}
-</style>
-</head>
-<body>
-
-<div class="game-root">
-  <div class="toolbar">
-    <button class="btn" id="btnCheck">✅ Verificar</button>
-    <button class="btn" id="btnReset">🧹 Limpar</button>
-    <button class="btn" id="btnShow">👀 Mostrar gabarito</button>
-    <div id="score" class="score"></div>
-  </div>
-
-  <div class="row">
-    <!-- COLUNA TERMOS -->
-    <div class="col panel">
-      <h3>📝 Termos</h3>
-      <div class="panel-body" id="termsScroll">
-        <div id="terms"></div>
-      </div>
-    </div>
-
-    <!-- COLUNA CONCEITOS -->
-    <div class="col panel">
-      <h3>📖 Conceitos</h3>
-      <div class="panel-body" id="conceptsScroll">
-        <div id="concepts"></div>
-      </div>
-    </div>
-  </div>
-</div>
-
-<!-- Modal -->
-<div class="modal-backdrop" id="modalBackdrop" aria-hidden="true">
-  <div class="modal" role="dialog" aria-modal="true" aria-labelledby="modalTitle">
-    <button class="close" id="modalClose">✖</button>
-    <div id="modalContent"></div>
-  </div>
-</div>
-
-<script>
-const termos = {json.dumps(termos, ensure_ascii=False)};
-const conceitos = {json.dumps(conceitos, ensure_ascii=False)};
-const gabarito = {json.dumps(gabarito, ensure_ascii=False)};
-
-const $terms = document.getElementById("terms");
-const $concepts = document.getElementById("concepts");
-const $termsScroll = document.getElementById("termsScroll");
-const $conceptsScroll = document.getElementById("conceptsScroll");
-
-// Monta Termos
-for (let i=0;i<termos.length;i++) {{
-  const t = termos[i];
-  const el = document.createElement("div");
-  el.className = "card-term";
-  el.id = "drag-" + i;
-  el.textContent = t;
-  el.draggable = true;
-  el.addEventListener("dragstart", function(e) {{
-    e.dataTransfer.setData("text/plain", el.id);
-  }});
-  $terms.appendChild(el);
-}}
-
-// Monta Conceitos + drops
-for (let i=0;i<conceitos.length;i++) {{
-  const c = conceitos[i];
-  const card = document.createElement("div");
-  card.className = "concept-card";
-  const text = document.createElement("div");
-  text.className = "concept-text";
-  text.textContent = c;
-  const drop = document.createElement("div");
-  drop.className = "drop";
-  drop.id = "drop-" + i;
-
-  drop.addEventListener("dragover", function(e) {{
-    e.preventDefault();
-    drop.classList.add("over");
-  }});
-  drop.addEventListener("dragleave", function() {{ drop.classList.remove("over"); }});
-  drop.addEventListener("drop", function(e) {{
-    e.preventDefault();
-    drop.classList.remove("over");
-    const id = e.dataTransfer.getData("text/plain");
-    const dragged = document.getElementById(id);
-    if (!dragged) return;
-    if (drop.firstElementChild) {{
-      $terms.insertBefore(drop.firstElementChild, $terms.firstChild);
-    }}
-    drop.innerHTML = "";
-    drop.appendChild(dragged);
-  }});
-
-  card.appendChild(text);
-  card.appendChild(drop);
-  $concepts.appendChild(card);
-}}
-
-// ===== Modal =====
-const modalBackdrop = document.getElementById("modalBackdrop");
-const modalClose = document.getElementById("modalClose");
-const modalContent = document.getElementById("modalContent");
-
-function closeModal() {{
-  modalBackdrop.style.display = "none";
-  modalBackdrop.setAttribute("aria-hidden", "true");
-  // remove confetes remanescentes
-  const confs = document.querySelectorAll(".confetti");
-  for (let i=0;i<confs.length;i++) confs[i].remove();
-}}
-modalClose.addEventListener("click", closeModal);
-modalBackdrop.addEventListener("click", function(e) {{
-  if (e.target === modalBackdrop) closeModal();
-}});
-document.addEventListener("keydown", function(e) {{
-  if (e.key === "Escape") closeModal();
-}});
-
-// Confete
-function spawnConfetti(n) {{
-  if (!n) n = 60;
-  for (let i = 0; i < n; i++) {{
-    const piece = document.createElement("div");
-    piece.className = "confetti";
-    const left = Math.random() * 100;
-    const hue  = Math.floor(Math.random() * 360);
-    piece.style.left = left + "%";
-    piece.style.background = 'hsl(' + hue + ', 90%, 55%)';
-    piece.style.animationDelay = (Math.random() * 0.8) + "s";
-    piece.style.transform = 'translateY(-20px) rotate(' + (Math.random()*360) + 'deg)';
-    modalBackdrop.appendChild(piece);
-    setTimeout(function() {{ piece.remove(); }}, 2500);
-  }}
-}}
-
-function showSuccessModal(acertos, total, perc) {{
-  modalContent.innerHTML = ''
-    + '<h2 id="modalTitle">🎉 Parabéns! Resultado Perfeito</h2>'
-    + '<p>Você acertou <b>' + acertos + ' / ' + total + '</b> (' + Math.round(perc) + '%). Excelente!</p>'
-    + '<div class="bar-wrap"><div class="bar-fill" style="width:100%"></div></div>'
-    + '<p class="hint">Dica: tente aumentar a velocidade mantendo a precisão — você está pronto para o próximo nível! 🚀</p>';
-  modalBackdrop.style.display = "flex";
-  modalBackdrop.setAttribute("aria-hidden", "false");
-  spawnConfetti(80);
-}}
-
-function showMotivationModal(acertos, total, perc) {{
-  var tips = [
-    "Leia com calma os conceitos: identifique palavras-chave ⚡",
-    "Tente agrupar termos semelhantes e elimine os óbvios primeiro 🧠",
-    "Se pintar dúvida, use o gabarito para aprender e tente de novo 😉"
-  ];
-  var tip = tips[Math.floor(Math.random()*tips.length)];
-  modalContent.innerHTML = ''
-    + '<h2 id="modalTitle"><span class="pulse">💪 Quase lá!</span></h2>'
-    + '<p>Você acertou <b>' + acertos + ' / ' + total + '</b> (' + Math.round(perc) + '%). Continue — cada tentativa reforça a memória!</p>'
-    + '<div class="bar-wrap"><div class="bar-fill" id="barFill" style="width:0%"></div></div>'
-    + '<p class="hint">Sugestão: ' + tip + '</p>'
-    + '<button class="btn" id="btnTryAgain">Tentar novamente</button>';
-  modalBackdrop.style.display = "flex";
-  modalBackdrop.setAttribute("aria-hidden", "false");
-  setTimeout(function() {{
-    var fill = document.getElementById("barFill");
-    if (fill) fill.style.width = perc + "%";
-  }}, 50);
-  var btn = document.getElementById("btnTryAgain");
-  if (btn) btn.addEventListener("click", closeModal);
-}}
-
-// ===== Verificação, Limpar e Gabarito =====
-function verificar() {{
-  var acertos = 0;
-  var drops = document.querySelectorAll(".drop");
-  for (var d=0; d<drops.length; d++) drops[d].classList.remove("correct","wrong");
-  var badges = document.querySelectorAll(".badge");
-  for (var b=0; b<badges.length; b++) badges[b].remove();
-
-  var cards = document.querySelectorAll(".concept-card");
-  for (var i=0; i<cards.length; i++) {{
-    var card = cards[i];
-    var conceptTxt = card.querySelector(".concept-text").textContent.trim();
-    var drop = card.querySelector(".drop");
-    var termoEl = drop.firstElementChild;
-    if (!termoEl) continue;
-
-    var termo = termoEl.textContent.trim();
-    var conceitoCorreto = gabarito[termo];
-
-    if (conceitoCorreto && conceitoCorreto === conceptTxt) {{
-      drop.classList.add("correct");
-      acertos += 1;
-      var ok = document.createElement("span");
-      ok.className = "badge ok";
-      ok.textContent = "✔";
-      card.querySelector(".concept-text").appendChild(ok);
-    }} else {{
-      drop.classList.add("wrong");
-      var err = document.createElement("span");
-      err.className = "badge err";
-      err.textContent = "✘";
-      card.querySelector(".concept-text").appendChild(err);
-    }}
-  }}
-  var total = Object.keys(gabarito).length;
-  var perc = total ? (acertos/total)*100 : 0;
-  document.getElementById("score").textContent = 'Pontuação: ' + acertos + ' / ' + total;
-
-  if (acertos === total && total > 0) {{
-    showSuccessModal(acertos, total, perc);
-  }} else {{
-    showMotivationModal(acertos, total, perc);
-  }}
-}}
-
-function limpar() {{
-  document.getElementById("score").textContent = "";
-  var drops = document.querySelectorAll(".drop");
-  for (var i=0; i<drops.length; i++) {{
-    var drop = drops[i];
-    drop.classList.remove("correct","wrong");
-    var termo = drop.firstElementChild;
-    if (termo) $terms.insertBefore(termo, $terms.firstChild);
-  }}
-  var badges = document.querySelectorAll(".badge");
-  for (var b=0; b<badges.length; b++) badges[b].remove();
-}}
-
-function mostrarGabarito() {{
-  limpar();
-  var cards = document.querySelectorAll(".concept-card");
-  for (var i=0; i<cards.length; i++) {{
-    var card = cards[i];
-    var conceptTxt = card.querySelector(".concept-text").textContent.trim();
-    var termoCorreto = null;
-    for (var t in gabarito) {{
-      if (gabarito[t] === conceptTxt) {{ termoCorreto = t; break; }}
-    }}
-    if (!termoCorreto) continue;
-    var termosEls = document.querySelectorAll(".card-term");
-    var termoEl = null;
-    for (var k=0; k<termosEls.length; k++) {{
-      if (termosEls[k].textContent.trim() === termoCorreto) {{ termoEl = termosEls[k]; break; }}
-    }}
-    if (!termoEl) continue;
-    var drop = card.querySelector(".drop");
-    drop.innerHTML = "";
-    drop.appendChild(termoEl);
-  }}
-  verificar();
-}}
-
-document.getElementById("btnCheck").addEventListener("click", verificar);
-document.getElementById("btnReset").addEventListener("click", limpar);
-document.getElementById("btnShow").addEventListener("click", mostrarGabarito);
-
-// Auto-scroll em cada coluna
-function setupAutoScroll(container) {{
-  container.addEventListener("dragover", function(e) {{
-    var rect = container.getBoundingClientRect();
-    var threshold = 60;
-    var speed = 16;
-    if (e.clientY < rect.top + threshold) {{
-      container.scrollTop -= speed;
-    }} else if (e.clientY > rect.bottom - threshold) {{
-      container.scrollTop += speed;
-    }}
-  }});
-}}
-setupAutoScroll($termsScroll);
-setupAutoScroll($conceptsScroll);
-</script>
-
-</body>
-</html>
-"""
-
-st_html(html_code, height=840, scrolling=False)
+def _painel_tabuleiro(termos, conceitos, gabarito, desafio, geracao):
+    """
+    O tabuleiro fica sempre neste fragmento, no mesmo lugar da página, para o
+    navegador manter o iframe. Com uma geração em andamento, roda a cada
+    INTERVALO_PARCIAIS s: abre o jogo com MIN_PARES pares e o cresce a cada par novo.
+    """
+    if geracao is not None:
+        if geracao.terminou():
+            st.rerun(scope="app")  # o deck final vira o desafio no rerun completo
+        pares = geracao.pares()
+        if len(pares) < MIN_PARES:
+            st.info(f"⏳ Recebendo pares do Gemini... {len(pares)}/{qtd_gemini}")
+            return None
+        tabuleiro([t for t, _ in pares], [c for _, c in pares], dict(pares), serie=geracao.serie, embaralhar=embaralhar_auto, parcial=True)
+        st.caption(f"⏳ Recebendo pares do Gemini... {len(pares)}/{qtd_gemini} · já dá para jogar; Verificar libera com o deck completo.")
+        return None
+    resultado = tabuleiro(termos, conceitos, gabarito, serie=desafio.get("serie"), embaralhar=desafio.get("embaralhar", False))
+    enviado_em = resultado and resultado.get("enviado_em")
+    if enviado_em and st.session_state.get("_resultado_visto") != enviado_em:
+        # Verificação nova: placar, revisão e log ficam no rerun da página inteira
+        st.session_state._resultado_visto = enviado_em
+        st.rerun(scope="app")
+    return resultado
+
+desafio = {} if participante else (st.session_state.desafio or {})
+if participante:
+    termos, conceitos, gabarito = sala.embaralhado(sala_sessao["semente"])
+elif deck is not None:
+    termos, conceitos, gabarito = deck.embaralhado(desafio["semente"])
+else:
+    termos = conceitos = gabarito = None
+
+with area_tabuleiro:
+    resultado = st.fragment(_painel_tabuleiro, run_every=INTERVALO_PARCIAIS if geracao else None)(termos, conceitos, gabarito, desafio, geracao)
+
+if resultado and sala and not resultado.get("revelado"):
+    _marca = (sala.versao, resultado["acertos"], resultado.get("tempo_ms", 0))
+    if st.session_state.get("_placar_enviado") != _marca:  # o componente repete o último valor a cada rerun
+        obter_registro_salas().registrar(sala.codigo, _nome_no_placar(), *_marca)
+        st.session_state._placar_enviado = _marca
+
+if resultado and aluno:
+    _registrar_revisao(aluno, resultado, sala.deck.id if participante else deck.id, termos, gabarito)
+
+if resultado:
+    _registrar_eventos(resultado, sala.deck.id if participante else deck.id, gabarito)
+
+if resultado:
+    segundos = resultado.get("tempo_ms", 0) / 1000
+    st.caption(f"Último resultado: {resultado['acertos']} / {resultado['total']} em {segundos:.0f} s" + (" (gabarito revelado)" if resultado.get("revelado") else ""))
+
+_encerrar_rerun()
@@ -0,0 +1,180 @@
+# lote.py
+import argparse, asyncio, json, os, random, sys, time
+from nucleo import ErroGeracao, gerar_pares_async
+from texto import limpar_texto, normalizar_pergunta
+
+# -------------------- Geração de decks em lote (sem Streamlit) --------------------
+# Lê perguntas de um arquivo e gera os decks em paralelo com generate_content_async,
+# com teto de chamadas simultâneas, limite de requisições por minuto e novas
+# tentativas com backoff. A saída é JSONL no formato do banco (banco_decks.py
+# importar) e serve de progresso: rodar de novo pula as perguntas já geradas.
+#
+#   python lote.py edital.txt decks.jsonl --concorrencia 8 --rpm 300
+#   python banco_decks.py importar decks.jsonl
+
+MODELO_PADRAO = "gemini-1.5-flash"
+
+def ler_perguntas(arquivo) -> list:
+    """Uma pergunta por linha (texto) ou {"pergunta", "max_itens"?} por linha (JSONL)."""
+    perguntas = []
+    for linha in arquivo:
+        linha = linha.strip()
+        if not linha or linha.startswith("#"):
+            continue
+        if linha.startswith("{"):
+            item = json.loads(linha)
+            perguntas.append((limpar_texto(item["pergunta"]), item.get("max_itens")))
+        else:
+            perguntas.append((limpar_texto(linha), None))
+    return perguntas
+
+def ja_geradas(caminho: str) -> set:
+    """Perguntas (normalizadas) que já têm deck no arquivo de saída."""
+    feitas = set()
+    if not os.path.exists(caminho):
+        return feitas
+    with open(caminho, encoding="utf-8") as f:
+        for linha in f:
+            try:
+                feitas.add(normalizar_pergunta(json.loads(linha)["pergunta"]))
+            except (json.JSONDecodeError, KeyError, TypeError):
+                continue  # linha cortada por uma interrupção no meio da escrita
+    return feitas
+
+def _transitorio(e: Exception) -> bool:
+    """Erros que valem nova tentativa: cota, indisponibilidade, timeout e deck ruim."""
+    if isinstance(e, (ErroGeracao, asyncio.TimeoutError, ConnectionError)):
+        return True
+    from google.api_core import exceptions as gexc
+    return isinstance(e, (gexc.TooManyRequests, gexc.ServiceUnavailable, gexc.InternalServerError,
+                          gexc.DeadlineExceeded, gexc.Aborted))
+
+class _LimiteTaxa:
+    """Espaça o início das chamadas para no máximo `rpm` por minuto (None = sem limite)."""
+
+    def __init__(self, rpm: float | None):
+        self.intervalo = 60.0 / rpm if rpm else 0.0
+        self._proximo = 0.0
+        self._lock = asyncio.Lock()
+
+    async def aguardar(self):
+        if not self.intervalo:
+            return
+        async with self._lock:
+            agora = time.monotonic()
+            espera = self._proximo - agora
+            self._proximo = max(agora, self._proximo) + self.intervalo
+        if espera > 0:
+            await asyncio.sleep(espera)
+
+async def gerar_lote(perguntas, saida: str, model, max_itens: int = 6, concorrencia: int = 4,
+                     rpm: float | None = None, tentativas: int = 4, timeout: float = 60.0,
+                     backoff: float = 2.0, falhas: str | None = None, progresso=None) -> dict:
+    """
+    Gera um deck por pergunta com o GenerativeModel dado (cliente assíncrono) e
+    acrescenta cada um em `saida` assim que fica pronto. Perguntas já presentes
+    em `saida` (ou repetidas na entrada) são puladas. As que esgotarem as
+    tentativas vão para `falhas` (JSONL com o erro) e são refeitas na próxima rodada.
+    Retorna {"gerados", "pulados", "falhas"}.
+    """
+    feitas = ja_geradas(saida)
+    pendentes, pulados = [], 0
+    for pergunta, qtd in perguntas:
+        norm = normalizar_pergunta(pergunta)
+        if not norm or norm in feitas:
+            pulados += 1
+            continue
+        feitas.add(norm)
+        pendentes.append((pergunta, qtd or max_itens))
+
+    semaforo = asyncio.Semaphore(max(1, int(concorrencia)))
+    limite = _LimiteTaxa(rpm)
+    modelo = getattr(model, "model_name", "").removeprefix("models/") or None
+    contagem = {"gerados": 0, "pulados": pulados, "falhas": 0}
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    f_saida = open(saida, "a", encoding="utf-8")
+    f_falhas = open(falhas, "a", encoding="utf-8") if falhas else None
+
+    async def gerar(pergunta: str, qtd: int):
+        for tentativa in range(1, tentativas + 1):
+            try:
+                async with semaforo:
+                    await limite.aguardar()
+                    termos, _, gabarito = await asyncio.wait_for(gerar_pares_async(model, pergunta, qtd), timeout)
+                break
+            except Exception as e:
+                if tentativa == tentativas or not _transitorio(e):
+                    contagem["falhas"] += 1
+                    if f_falhas:
+                        f_falhas.write(json.dumps({"pergunta": pergunta, "erro": f"{type(e).__name__}: {e}",
+                                                   "tentativas": tentativa}, ensure_ascii=False) + "\n")
+                        f_falhas.flush()
+                    if progresso:
+                        progresso(pergunta, None, e)
+                    return
+            # backoff exponencial com jitter, fora do semáforo (não segura a vaga esperando)
+            await asyncio.sleep(backoff * 2 ** (tentativa - 1) * random.uniform(0.5, 1.5))
+        pares = [{"termo": t, "conceito": gabarito[t]} for t in termos]
+        f_saida.write(json.dumps({"pergunta": pergunta, "modelo": modelo, "pares": pares}, ensure_ascii=False) + "\n")
+        f_saida.flush()
+        contagem["gerados"] += 1
+        if progresso:
+            progresso(pergunta, len(pares), None)
+
+    try:
+        await asyncio.gather(*(gerar(p, q) for p, q in pendentes))
+    finally:
+        f_saida.close()
+        if f_falhas:
+            f_falhas.close()
+    return contagem
+
+def gerar_decks(perguntas, saida: str, api_key: str, modelo: str = MODELO_PADRAO, **opcoes) -> dict:
+    """Versão síncrona de gerar_lote: cria o cliente da chave dentro do próprio loop."""
+    from clientes_gemini import RegistroClientes
+
+    async def rodar():
+        model = RegistroClientes().modelo_async(api_key, modelo)
+        return await gerar_lote(perguntas, saida, model, **opcoes)
+
+    return asyncio.run(rodar())
+
+# -------------------- CLI --------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera decks em lote a partir de um arquivo de perguntas (JSONL de saída).")
+    parser.add_argument("perguntas", help="Arquivo com uma pergunta por linha, ou JSONL {\"pergunta\", \"max_itens\"?} ('-' para stdin)")
+    parser.add_argument("saida", help="JSONL de decks; também é o progresso para retomar")
+    parser.add_argument("--modelo", default=MODELO_PADRAO)
+    parser.add_argument("--max-itens", type=int, default=6)
+    parser.add_argument("--concorrencia", type=int, default=4, help="Chamadas simultâneas ao Gemini")
+    parser.add_argument("--rpm", type=float, default=None, help="Máximo de chamadas iniciadas por minuto")
+    parser.add_argument("--tentativas", type=int, default=4)
+    parser.add_argument("--timeout", type=float, default=60.0, help="Segundos por tentativa")
+    parser.add_argument("--falhas", default=None, help="JSONL das perguntas que falharam (padrão: <saida>.falhas.jsonl)")
+    parser.add_argument("--api-key", default=os.getenv("GOOGLE_API_KEY"))
+    args = parser.parse_args(argv)
+
+    if not args.api_key:
+        parser.error("defina GOOGLE_API_KEY ou use --api-key")
+    with (sys.stdin if args.perguntas == "-" else open(args.perguntas, encoding="utf-8")) as f:
+        perguntas = ler_perguntas(f)
+
+    def progresso(pergunta, n, erro):
+        if erro is None:
+            print(f"ok   {n:>3} pares  {pergunta}", file=sys.stderr)
+        else:
+            print(f"FALHA {type(erro).__name__}: {pergunta}", file=sys.stderr)
+
+    inicio = time.perf_counter()
+    contagem = gerar_decks(
+        perguntas, args.saida, args.api_key, args.modelo,
+        max_itens=args.max_itens, concorrencia=args.concorrencia, rpm=args.rpm,
+        tentativas=args.tentativas, timeout=args.timeout,
+        falhas=args.falhas or f"{args.saida}.falhas.jsonl", progresso=progresso,
+    )
+    print(f"{contagem['gerados']} gerado(s), {contagem['pulados']} pulado(s), {contagem['falhas']} falha(s) "
+          f"em {time.perf_counter() - inicio:.1f}s.")
+    return 1 if contagem["falhas"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+# metricas.py
+import os, threading, time
+from contextlib import contextmanager
+
+# -------------------- Métricas (formato Prometheus) --------------------
+# Contadores e histogramas com rótulos, sem dependências. O registro é do
+# processo (`metricas`, no fim do arquivo) e pode ser exportado como texto:
+# arquivo para o textfile collector do node_exporter ou endpoint HTTP /metrics.
+
+LIMITES_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+LIMITES_BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+def _rotulos(rotulos: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in rotulos.items()))
+
+def _formatar_rotulos(rotulos: tuple, extra: tuple = ()) -> str:
+    pares = rotulos + extra
+    if not pares:
+        return ""
+    esc = lambda v: v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in pares) + "}"
+
+class _Histograma:
+    __slots__ = ("limites", "contagens", "soma", "total")
+
+    def __init__(self, limites):
+        self.limites = tuple(limites)
+        self.contagens = [0] * len(self.limites)
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float):
+        for i, limite in enumerate(self.limites):
+            if valor <= limite:
+                self.contagens[i] += 1
+                break
+        self.soma += valor
+        self.total += 1
+
+    def quantil(self, q: float) -> float:
+        """Estimativa por interpolação linear dentro do balde (como histogram_quantile)."""
+        if not self.total:
+            return 0.0
+        alvo = q * self.total
+        acumulado, inferior = 0, 0.0
+        for limite, n in zip(self.limites, self.contagens):
+            if n and acumulado + n >= alvo:
+                return inferior + (limite - inferior) * (alvo - acumulado) / n
+            acumulado += n
+            inferior = limite
+        return self.limites[-1]  # acima do último balde
+
+class Metricas:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._contadores = {}   # nome -> {rotulos: valor}
+        self._histogramas = {}  # nome -> {rotulos: _Histograma}
+        self._ajuda = {}
+        self._gravado_em = float("-inf")
+
+    def descrever(self, nome: str, ajuda: str):
+        self._ajuda[nome] = ajuda
+
+    def contar(self, nome: str, valor: float = 1, **rotulos):
+        chave = _rotulos(rotulos)
+        with self._lock:
+            serie = self._contadores.setdefault(nome, {})
+            serie[chave] = serie.get(chave, 0) + valor
+
+    def observar(self, nome: str, valor: float, limites=LIMITES_SEGUNDOS, **rotulos):
+        chave = _rotulos(rotulos)
+        with self._lock:
+            serie = self._histogramas.setdefault(nome, {})
+            hist = serie.get(chave)
+            if hist is None:
+                hist = serie[chave] = _Histograma(limites)
+            hist.observar(valor)
+
+    @contextmanager
+    def cronometrar(self, nome: str, **rotulos):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(nome, time.perf_counter() - inicio, **rotulos)
+
+    def valor(self, nome: str, **rotulos) -> float:
+        return self._contadores.get(nome, {}).get(_rotulos(rotulos), 0)
+
+    def quantil(self, nome: str, q: float, min_amostras: int = 1, **rotulos) -> float | None:
+        """Quantil estimado de um histograma; None se ainda não há `min_amostras` observações."""
+        with self._lock:
+            hist = self._histogramas.get(nome, {}).get(_rotulos(rotulos))
+            if hist is None or hist.total < min_amostras:
+                return None
+            return hist.quantil(q)
+
+    def contadores(self, nome: str) -> dict:
+        """{rótulos (tupla de pares): valor} de um contador."""
+        with self._lock:
+            return dict(self._contadores.get(nome, {}))
+
+    def resumo(self) -> list:
+        """Linhas para o painel de debug: histograma, rótulos, n, média, p50, p95, p99."""
+        linhas = []
+        with self._lock:
+            for nome, serie in sorted(self._histogramas.items()):
+                for chave, h in sorted(serie.items()):
+                    linhas.append({
+                        "métrica": nome,
+                        "rótulos": ", ".join(f"{k}={v}" for k, v in chave),
+                        "n": h.total,
+                        "média": h.soma / h.total if h.total else 0.0,
+                        "p50": h.quantil(0.5),
+                        "p95": h.quantil(0.95),
+                        "p99": h.quantil(0.99),
+                    })
+        return linhas
+
+    def exportar_prometheus(self) -> str:
+        saida = []
+        with self._lock:
+            for nome, serie in sorted(self._contadores.items()):
+                if nome in self._ajuda:
+                    saida.append(f"# HELP {nome} {self._ajuda[nome]}")
+                saida.append(f"# TYPE {nome} counter")
+                for chave, v in sorted(serie.items()):
+                    saida.append(f"{nome}{_formatar_rotulos(chave)} {v}")
+            for nome, serie in sorted(self._histogramas.items()):
+                if nome in self._ajuda:
+                    saida.append(f"# HELP {nome} {self._ajuda[nome]}")
+                saida.append(f"# TYPE {nome} histogram")
+                for chave, h in sorted(serie.items()):
+                    acumulado = 0
+                    for limite, n in zip(h.limites, h.contagens):
+                        acumulado += n
+                        saida.append(f"{nome}_bucket{_formatar_rotulos(chave, (('le', repr(float(limite))),))} {acumulado}")
+                    saida.append(f"{nome}_bucket{_formatar_rotulos(chave, (('le', '+Inf'),))} {h.total}")
+                    saida.append(f"{nome}_sum{_formatar_rotulos(chave)} {h.soma}")
+                    saida.append(f"{nome}_count{_formatar_rotulos(chave)} {h.total}")
+        return "\n".join(saida) + "\n"
+
+    def gravar_arquivo(self, caminho: str):
+        """Grava o texto Prometheus de forma atômica (para o textfile collector)."""
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        tmp = f"{caminho}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.exportar_prometheus())
+        os.replace(tmp, caminho)
+
+    def gravar_se_preciso(self, caminho: str, intervalo: float = 10.0):
+        """Como gravar_arquivo, mas no máximo uma vez a cada `intervalo` segundos."""
+        agora = time.monotonic()
+        if agora - self._gravado_em < intervalo:
+            return
+        self._gravado_em = agora
+        self.gravar_arquivo(caminho)
+
+    def servir_http(self, porta: int, endereco: str = "0.0.0.0"):
+        """Sobe GET /metrics numa thread daemon; retorna o servidor (ThreadingHTTPServer)."""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        registro = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                corpo = registro.exportar_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, *args):
+                pass
+
+        servidor = ThreadingHTTPServer((endereco, int(porta)), _Handler)
+        threading.Thread(target=servidor.serve_forever, name="metricas-http", daemon=True).start()
+        return servidor
+
+metricas = Metricas()
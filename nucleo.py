@@ -0,0 +1,354 @@
+# nucleo.py
+import hashlib, json, time
+from contextlib import contextmanager
+from metricas import metricas
+from similares import filtrar_quase_iguais, quase_igual
+from texto import limpar_texto as _limpar_texto
+
+# -------------------- Núcleo do jogo (sem Streamlit) --------------------
+# Prompt, leitura/validação da resposta do Gemini, geração a partir de um
+# GenerativeModel já configurado, deck mock e dados do tabuleiro. Usado pela
+# interface (jogo.py), pelo gerador em lote (lote.py) e pelo benchmark.
+
+MIN_PARES = 4
+
+def _montar_prompt(pergunta: str, max_itens: int, evitar=()) -> str:
+    evitar = list(evitar)
+    aviso = f"\n- Não repita estes termos, já usados em rodadas anteriores: {json.dumps(evitar, ensure_ascii=False)}" if evitar else ""
+    return f"""
+Você é um gerador de flashcards objetivos para concursos públicos no Brasil.
+
+Tarefa: Dada a pergunta abaixo, gere entre 4 e {max_itens} pares de "termo" e "conceito" curtos, corretos e não ambíguos.
+- Evite termos quase iguais entre si.{aviso}
+- Conceitos devem ter 1–2 frases, no máximo ~160 caracteres cada.
+- Responda exclusivamente em português do Brasil.
+- Saída ESTRITAMENTE em JSON no formato:
+[
+  {{"termo": "Texto do termo", "conceito": "Texto do conceito"}},
+  ...
+]
+
+Pergunta do usuário: "{pergunta}"
+Somente JSON. Sem comentários, sem markdown, sem texto extra antes ou depois.
+"""
+
+def _aceitar_par(item, vistos_termos: set):
+    """Valida/limpa um item do JSON; retorna (termo, conceito) ou None se inválido ou repetido."""
+    if not isinstance(item, dict):
+        return None
+    termo = _limpar_texto(item.get("termo", ""))
+    conceito = _limpar_texto(item.get("conceito", ""))
+    if not termo or not conceito:
+        return None
+    if termo.lower() in vistos_termos:
+        return None
+    if len(conceito) > 220:
+        conceito = conceito[:217].rstrip() + "..."
+    vistos_termos.add(termo.lower())
+    return termo, conceito
+
+class _LeitorArrayJSON:
+    """
+    Parser incremental de um array JSON de objetos: recebe o texto em pedaços e
+    devolve cada {...} assim que ele fecha. Ignora texto antes do '[' (ex.: ```json).
+    """
+
+    def __init__(self):
+        self._no_array = False
+        self._fim = False
+        self._prof = 0
+        self._em_string = False
+        self._escape = False
+        self._buf = []
+
+    def alimentar(self, pedaco: str) -> list:
+        objetos = []
+        for ch in pedaco:
+            if self._fim:
+                break
+            if not self._no_array:
+                self._no_array = ch == "["
+                continue
+            if self._prof == 0:
+                if ch == "{":
+                    self._prof = 1
+                    self._buf = [ch]
+                elif ch == "]":
+                    self._fim = True
+                continue
+            self._buf.append(ch)
+            if self._em_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._em_string = False
+            elif ch == '"':
+                self._em_string = True
+            elif ch == "{":
+                self._prof += 1
+            elif ch == "}":
+                self._prof -= 1
+                if self._prof == 0:
+                    try:
+                        objetos.append(json.loads("".join(self._buf)))
+                    except json.JSONDecodeError:
+                        pass  # objeto malformado: descarta só ele
+                    self._buf = []
+        return objetos
+
+class ErroGeracao(ValueError):
+    """Falha ao gerar pares via Gemini; `motivo` registra por que o jogo caiu no mock."""
+
+    def __init__(self, motivo: str, mensagem: str):
+        super().__init__(mensagem)
+        self.motivo = motivo
+
+# Saída JSON nativa do modelo, já no formato esperado
+CONFIG_JSON = {
+    "response_mime_type": "application/json",
+    "response_schema": {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": {"termo": {"type": "string"}, "conceito": {"type": "string"}},
+            "required": ["termo", "conceito"],
+        },
+    },
+}
+MAX_REPAROS = 2
+
+def _montar_prompt_reparo(pergunta: str, faltam: int, termos_existentes) -> str:
+    return f"""
+Você é um gerador de flashcards objetivos para concursos públicos no Brasil.
+
+Pergunta do usuário: "{pergunta}"
+Já temos estes termos (não repita nem use variações deles): {json.dumps(list(termos_existentes), ensure_ascii=False)}
+
+Gere exatamente {faltam} novos pares de "termo" e "conceito" curtos, corretos e não ambíguos,
+com conceitos de 1–2 frases (no máximo ~160 caracteres), em português do Brasil.
+Somente JSON no formato [{{"termo": "...", "conceito": "..."}}].
+"""
+
+def _texto_resposta(resp) -> str:
+    try:
+        return resp.text or ""
+    except ValueError:
+        return ""  # resposta bloqueada/sem partes
+
+def _extrair_itens(text: str):
+    """
+    Uma passada: o modo JSON devolve o array puro; se vier texto em volta ou JSON
+    truncado, o leitor incremental aproveita os objetos completos.
+    Retorna (itens, motivo_da_falha_ou_None).
+    """
+    if not text.strip():
+        return [], "resposta_vazia"
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        data = _LeitorArrayJSON().alimentar(text)
+        return data, (None if data else "json_invalido")
+    if isinstance(data, dict):
+        data = [data]
+    if not isinstance(data, list):
+        return [], "json_invalido"
+    return data, None
+
+def _nome_modelo(model) -> str:
+    return getattr(model, "model_name", "").removeprefix("models/")
+
+def _contar_tokens(resp, modelo: str):
+    uso = getattr(resp, "usage_metadata", None)
+    if uso:
+        metricas.contar("jogo_gemini_tokens_total", uso.prompt_token_count or 0, modelo=modelo, tipo="entrada")
+        metricas.contar("jogo_gemini_tokens_total", uso.candidates_token_count or 0, modelo=modelo, tipo="saida")
+
+def _opcoes(timeout: float | None) -> dict:
+    """request_options da SDK: sem timeout a chamada pode bloquear indefinidamente."""
+    return {"request_options": {"timeout": timeout}} if timeout else {}
+
+@contextmanager
+def _medindo(modelo: str, etapa: str):
+    """Latência e erros de uma chamada ao Gemini, por modelo e etapa."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        metricas.contar("jogo_gemini_erros_total", modelo=modelo, etapa=etapa, erro=type(e).__name__)
+        raise
+    finally:
+        metricas.observar("jogo_gemini_segundos", time.perf_counter() - inicio, modelo=modelo, etapa=etapa)
+
+def _chamar_gemini(model, prompt: str, etapa: str, timeout: float | None = None):
+    """generate_content (JSON) com latência, tokens e erros registrados por modelo e etapa."""
+    modelo = _nome_modelo(model)
+    with _medindo(modelo, etapa):
+        resp = model.generate_content(prompt, generation_config=CONFIG_JSON, **_opcoes(timeout))
+    _contar_tokens(resp, modelo)
+    return resp
+
+async def _chamar_gemini_async(model, prompt: str, etapa: str, timeout: float | None = None):
+    """Como _chamar_gemini, com generate_content_async (para lotes em asyncio)."""
+    modelo = _nome_modelo(model)
+    with _medindo(modelo, etapa):
+        resp = await model.generate_content_async(prompt, generation_config=CONFIG_JSON, **_opcoes(timeout))
+    _contar_tokens(resp, modelo)
+    return resp
+
+def _validar_itens(itens, vistos_termos: set, pares: list):
+    with metricas.cronometrar("jogo_parse_segundos", etapa="validar"):
+        for item in itens:
+            par = _aceitar_par(item, vistos_termos)
+            if par:
+                pares.append(par)
+
+def _sem_quase_iguais(pares: list) -> list:
+    with metricas.cronometrar("jogo_parse_segundos", etapa="similares"):
+        mantidos = filtrar_quase_iguais(pares)
+    if len(mantidos) < len(pares):
+        metricas.contar("jogo_pares_descartados_total", len(pares) - len(mantidos), motivo="quase_igual")
+    return mantidos
+
+def _acrescentar_novos(pares: list, novos: list):
+    """Acrescenta os pares de um reparo que não são quase iguais aos que o deck já tem."""
+    for par in novos:
+        if quase_igual(par, pares):
+            metricas.contar("jogo_pares_descartados_total", motivo="quase_igual")
+            continue
+        pares.append(par)
+
+def interpretar_resposta(text: str, vistos_termos: set | None = None):
+    """
+    Texto da resposta -> (pares válidos, sem repetição nem quase iguais, motivo_da_falha_ou_None).
+    É o pipeline de extração/limpeza/deduplicação usado por todas as gerações.
+    """
+    with metricas.cronometrar("jogo_parse_segundos", etapa="extrair"):
+        itens, motivo = _extrair_itens(text)
+    pares = []
+    _validar_itens(itens, set() if vistos_termos is None else vistos_termos, pares)
+    return _sem_quase_iguais(pares), motivo
+
+# A geração (prompt, validação, reparos) é escrita uma vez, sem E/S: os passos
+# são um gerador que entrega (prompt, etapa) de cada chamada e recebe a resposta
+# por send(). _conduzir faz as chamadas de forma síncrona, _conduzir_async com
+# await; assim a versão do lote não se separa da interativa.
+
+def _passos_reparo(pergunta: str, pares: list, vistos_termos: set, max_itens: int, motivo=None):
+    """
+    Pede de novo só os pares que faltam (até MAX_REPAROS vezes) enquanto o deck
+    estiver abaixo do mínimo. Acrescenta em `pares`; levanta ErroGeracao se não bastar.
+    """
+    reparos = 0
+    while len(pares) < MIN_PARES and reparos < MAX_REPAROS:
+        reparos += 1
+        faltam = max_itens - len(pares)
+        resp = yield _montar_prompt_reparo(pergunta, faltam, (t for t, _ in pares)), "reparo"
+        novos, motivo = interpretar_resposta(_texto_resposta(resp), vistos_termos)
+        _acrescentar_novos(pares, novos)
+    if len(pares) < MIN_PARES:
+        raise ErroGeracao(motivo or "poucos_pares", f"Poucos pares válidos retornados pelo modelo ({len(pares)} após {reparos} reparo(s))")
+
+def _passos_geracao(pergunta: str, max_itens: int, evitar=()):
+    """Passos de um deck completo; o valor final é a lista de pares."""
+    resp = yield _montar_prompt(pergunta, max_itens, evitar), "geracao"
+    vistos_termos = set()
+    pares, motivo = interpretar_resposta(_texto_resposta(resp), vistos_termos)
+    yield from _passos_reparo(pergunta, pares, vistos_termos, max_itens, motivo)
+    return pares
+
+def _conduzir(passos, chamar):
+    """Executa os passos com chamar(prompt, etapa) -> resposta; retorna o valor final."""
+    try:
+        pedido = next(passos)
+        while True:
+            pedido = passos.send(chamar(*pedido))
+    except StopIteration as fim:
+        return fim.value
+
+async def _conduzir_async(passos, chamar):
+    """Como _conduzir, com chamar(prompt, etapa) assíncrono."""
+    try:
+        pedido = next(passos)
+        while True:
+            pedido = passos.send(await chamar(*pedido))
+    except StopIteration as fim:
+        return fim.value
+
+def _deck(pares):
+    return [t for t, _ in pares], [c for _, c in pares], {t: c for t, c in pares}
+
+def gerar_pares(model, pergunta: str, max_itens: int = 6, timeout: float | None = None, evitar=()):
+    """
+    Gera um deck com o GenerativeModel dado (`timeout` em segundos por chamada;
+    `evitar`: termos que o prompt pede para não repetir).
+    Retorna (termos, conceitos, gabarito_dict)
+    """
+    chamar = lambda prompt, etapa: _chamar_gemini(model, prompt, etapa, timeout)
+    return _deck(_conduzir(_passos_geracao(pergunta, max_itens, evitar), chamar))
+
+async def gerar_pares_async(model, pergunta: str, max_itens: int = 6, timeout: float | None = None, evitar=()):
+    """
+    gerar_pares sem bloquear o loop: mesma validação, mesmos reparos.
+    Retorna (termos, conceitos, gabarito_dict)
+    """
+    chamar = lambda prompt, etapa: _chamar_gemini_async(model, prompt, etapa, timeout)
+    return _deck(await _conduzir_async(_passos_geracao(pergunta, max_itens, evitar), chamar))
+
+def gerar_pares_stream(model, pergunta: str, max_itens: int = 6, timeout: float | None = None, evitar=()):
+    """
+    Versão em streaming: gera (termo, conceito) um a um, já validados e sem repetição,
+    conforme os objetos do array JSON vão ficando completos na resposta.
+    """
+    modelo = _nome_modelo(model)
+    leitor = _LeitorArrayJSON()
+    pares = []
+    vistos_termos = set()
+    inicio = time.perf_counter()
+    chunk = None
+    try:
+        for chunk in model.generate_content(_montar_prompt(pergunta, max_itens, evitar), generation_config=CONFIG_JSON, stream=True, **_opcoes(timeout)):
+            for item in leitor.alimentar(_texto_resposta(chunk)):
+                par = _aceitar_par(item, vistos_termos)
+                if par and quase_igual(par, pares):
+                    metricas.contar("jogo_pares_descartados_total", motivo="quase_igual")
+                elif par:
+                    if not pares:
+                        metricas.observar("jogo_gemini_primeiro_par_segundos", time.perf_counter() - inicio, modelo=modelo)
+                    pares.append(par)
+                    yield par
+    except Exception as e:
+        metricas.contar("jogo_gemini_erros_total", modelo=modelo, etapa="stream", erro=type(e).__name__)
+        raise
+    finally:
+        metricas.observar("jogo_gemini_segundos", time.perf_counter() - inicio, modelo=modelo, etapa="stream")
+    if chunk is not None:
+        _contar_tokens(chunk, modelo)  # o último pedaço traz o uso total
+    recebidos = len(pares)
+    reparo = _passos_reparo(pergunta, pares, vistos_termos, max_itens, None if recebidos else "json_invalido")
+    _conduzir(reparo, lambda prompt, etapa: _chamar_gemini(model, prompt, etapa, timeout))
+    yield from pares[recebidos:]
+
+def gerar_pares_mock():
+    base = {
+        "Legalidade": "A administração só pode agir conforme a lei.",
+        "Impessoalidade": "Os atos devem visar ao interesse público, sem favorecimento.",
+        "Moralidade": "Os atos devem respeitar princípios éticos.",
+        "Publicidade": "Os atos devem ser transparentes e acessíveis.",
+        "Eficiência": "Os serviços devem ser prestados de forma adequada e rápida."
+    }
+    termos = list(base.keys())
+    conceitos = list(base.values())
+    return termos, conceitos, base
+
+# -------------------- Dados do tabuleiro --------------------
+def dados_tabuleiro(termos, conceitos, gabarito) -> dict:
+    """
+    Argumentos do componente do tabuleiro. O navegador trabalha com ids (posições
+    nas listas): resposta[id_termo] = id_conceito; deck_id identifica o deck/embaralhamento.
+    """
+    id_conceito = {c: i for i, c in enumerate(conceitos)}
+    resposta = [id_conceito.get(gabarito.get(t), -1) for t in termos]
+    deck_id = hashlib.sha1(json.dumps([termos, conceitos], ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+    return {"termos": termos, "conceitos": conceitos, "resposta": resposta, "deck_id": deck_id}
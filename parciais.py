@@ -0,0 +1,37 @@
+# parciais.py
+import threading
+import uuid
+
+# -------------------- Geração em segundo plano com pares parciais --------------------
+# O stream do Gemini roda num executor, fora do rerun: a página continua
+# respondendo e o tabuleiro (um fragmento com run_every) lê os pares que já
+# chegaram. `serie` identifica a geração para o navegador, que cresce o
+# tabuleiro no lugar em vez de remontá-lo a cada par novo.
+
+class GeracaoParcial:
+    def __init__(self, executor, gerar):
+        """gerar(ao_receber) -> resultado; ao_receber(pares_ate_agora) a cada par novo."""
+        self.serie = uuid.uuid4().hex[:12]
+        self._lock = threading.Lock()
+        self._pares = []
+        self.futuro = executor.submit(gerar, self._receber)
+
+    def _receber(self, pares):
+        with self._lock:
+            # Só cresce: quem espera outra sessão recebe [] e não apaga o que já veio
+            if len(pares) > len(self._pares):
+                self._pares = list(pares)
+
+    def pares(self) -> list:
+        with self._lock:
+            return list(self._pares)
+
+    def terminou(self) -> bool:
+        return self.futuro.done()
+
+    def resultado(self):
+        """Resultado de gerar() (ou a exceção dela); só depois de terminou()."""
+        return self.futuro.result(timeout=0)
+
+    def cancelar(self):
+        self.futuro.cancel()
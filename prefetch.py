@@ -0,0 +1,59 @@
+# prefetch.py
+import threading
+from collections import deque
+
+# -------------------- Fila de desafios pré-carregados --------------------
+# Enquanto o aluno joga, os próximos decks da mesma pergunta/configuração são
+# gerados em segundo plano. O executor é compartilhado pelo processo (o número
+# de workers é o teto de chamadas simultâneas ao Gemini); a fila é da sessão.
+
+class FilaPrefetch:
+    def __init__(self, executor, tamanho: int = 2):
+        self.executor = executor
+        self.tamanho = int(tamanho)
+        self.chave = None
+        self._lock = threading.Lock()
+        self._prontos = deque()
+        self._pendentes = []
+        self._geracao = 0  # muda a cada cancelamento; resultados antigos são descartados
+
+    def cancelar(self):
+        with self._lock:
+            self._geracao += 1
+            for fut in self._pendentes:
+                fut.cancel()
+            self._pendentes = []
+            self._prontos.clear()
+            self.chave = None
+
+    def _concluir(self, geracao, fut):
+        with self._lock:
+            if fut in self._pendentes:
+                self._pendentes.remove(fut)
+            if geracao != self._geracao or fut.cancelled() or fut.exception() is not None:
+                return
+            if len(self._prontos) < self.tamanho:
+                self._prontos.append(fut.result())
+
+    def abastecer(self, chave, gerar):
+        """Agenda gerar() até a fila ter `tamanho` decks (prontos + em andamento) para a chave."""
+        if chave != self.chave:
+            self.cancelar()
+        with self._lock:
+            self.chave = chave
+            geracao = self._geracao
+            faltam = self.tamanho - len(self._prontos) - len(self._pendentes)
+            novos = [self.executor.submit(gerar) for _ in range(max(0, faltam))]
+            self._pendentes.extend(novos)
+        for fut in novos:
+            fut.add_done_callback(lambda f, g=geracao: self._concluir(g, f))
+
+    def retirar(self, chave):
+        """Retorna um deck pronto para a chave (ou None, sem esperar)."""
+        with self._lock:
+            if chave != self.chave or not self._prontos:
+                return None
+            return self._prontos.popleft()
+
+    def prontos(self) -> int:
+        return len(self._prontos)
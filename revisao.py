@@ -0,0 +1,129 @@
+# revisao.py
+import hashlib, os, time
+from conexoes import ConexoesSQLite, transacao
+from similares import filtrar_quase_iguais
+from texto import normalizar_pergunta
+
+# -------------------- Revisão espaçada (estilo SM-2) --------------------
+# Um cartão por (aluno, par termo/conceito). A fila de vencidos é o índice
+# (aluno, prioridade) do SQLite: escolher os próximos N custa O(log n + N)
+# mesmo com dezenas de milhares de cartões, e cada resposta grava só a sua linha.
+# Vencido é sempre vence_em <= agora; prioridade = vencimento adiantado pelos
+# erros só ordena a fila, para os pares mais errados aparecerem antes dos que
+# só venceram. Como prioridade <= vence_em, o filtro por prioridade no índice
+# limita a varredura sem mudar quem está vencido.
+# O agendamento só anda quando o cartão está vencido: acertar de novo um par
+# que ainda não venceu (mesmo deck reembaralhado, outro desafio com o mesmo
+# par) conta o acerto mas não estica o intervalo. Um erro sempre traz o
+# cartão de volta, e conta lapso só na primeira vez.
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS cartoes (
+    aluno         TEXT NOT NULL,
+    cartao        TEXT NOT NULL,
+    termo         TEXT NOT NULL,
+    conceito      TEXT NOT NULL,
+    repeticoes    INTEGER NOT NULL DEFAULT 0,
+    intervalo     REAL NOT NULL DEFAULT 0,
+    facilidade    REAL NOT NULL DEFAULT 2.5,
+    vence_em      REAL NOT NULL,
+    prioridade    REAL NOT NULL,
+    lapsos        INTEGER NOT NULL DEFAULT 0,
+    acertos       INTEGER NOT NULL DEFAULT 0,
+    erros         INTEGER NOT NULL DEFAULT 0,
+    atualizado_em REAL NOT NULL,
+    PRIMARY KEY (aluno, cartao)
+);
+CREATE INDEX IF NOT EXISTS idx_cartoes_fila ON cartoes (aluno, prioridade);
+"""
+
+DIA = 24 * 3600
+REVER_APOS_ERRO = 10 * 60   # par errado volta em 10 minutos
+PESO_LAPSO = 5 * 60         # cada lapso adianta o cartão 5 minutos na fila
+
+def id_cartao(termo: str, conceito: str) -> str:
+    bruto = f"{normalizar_pergunta(termo)}\x1f{normalizar_pergunta(conceito)}"
+    return hashlib.sha1(bruto.encode("utf-8")).hexdigest()
+
+def _agendar(repeticoes: int, intervalo: float, facilidade: float, correto: bool):
+    """Passo do SM-2 (acerto = nota 4, erro = nota 1). Retorna (repeticoes, intervalo_em_dias, facilidade, segundos_ate_vencer)."""
+    q = 4 if correto else 1
+    facilidade = max(1.3, facilidade + 0.1 - (5 - q) * (0.08 + (5 - q) * 0.02))
+    if q < 3:
+        return 0, 0.0, facilidade, REVER_APOS_ERRO
+    repeticoes += 1
+    if repeticoes == 1:
+        intervalo = 1.0
+    elif repeticoes == 2:
+        intervalo = 6.0
+    else:
+        intervalo = intervalo * facilidade
+    return repeticoes, intervalo, facilidade, intervalo * DIA
+
+class AgendaRevisao:
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self._conexao = ConexoesSQLite(caminho)
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        self._conexao().executescript(_ESQUEMA)
+
+    def registrar(self, aluno: str, respostas, agora: float | None = None):
+        """Registra [(termo, conceito, correto), ...] de um aluno, em uma transação."""
+        agora = time.time() if agora is None else agora
+        with transacao(self._conexao()) as con:
+            for termo, conceito, correto in respostas:
+                cartao = id_cartao(termo, conceito)
+                row = con.execute(
+                    "SELECT repeticoes, intervalo, facilidade, lapsos, vence_em FROM cartoes WHERE aluno = ? AND cartao = ?",
+                    (aluno, cartao),
+                ).fetchone()
+                repeticoes, intervalo, facilidade, lapsos, vence_em = row or (0, 0.0, 2.5, 0, agora)
+                vencido = vence_em <= agora
+                if correto and not vencido:
+                    pass  # antes da hora: só conta o acerto
+                elif not correto and not vencido and repeticoes == 0:
+                    vence_em = agora + REVER_APOS_ERRO  # já estava em reaprendizado: sem lapso novo
+                else:
+                    repeticoes, intervalo, facilidade, espera = _agendar(repeticoes, intervalo, facilidade, correto)
+                    lapsos += 0 if correto else 1
+                    vence_em = agora + espera
+                con.execute(
+                    "INSERT INTO cartoes (aluno, cartao, termo, conceito, repeticoes, intervalo, facilidade, "
+                    "vence_em, prioridade, lapsos, acertos, erros, atualizado_em) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (aluno, cartao) DO UPDATE SET "
+                    "repeticoes = excluded.repeticoes, intervalo = excluded.intervalo, "
+                    "facilidade = excluded.facilidade, vence_em = excluded.vence_em, "
+                    "prioridade = excluded.prioridade, lapsos = excluded.lapsos, "
+                    "acertos = acertos + excluded.acertos, erros = erros + excluded.erros, "
+                    "atualizado_em = excluded.atualizado_em",
+                    (aluno, cartao, termo, conceito, repeticoes, intervalo, facilidade,
+                     vence_em, vence_em - lapsos * PESO_LAPSO, lapsos,
+                     int(bool(correto)), int(not correto), agora),
+                )
+
+    def proximos(self, aluno: str, n: int, agora: float | None = None):
+        """Até n pares vencidos, dos mais urgentes/mais errados primeiro: [(termo, conceito), ...]."""
+        agora = time.time() if agora is None else agora
+        linhas = self._conexao().execute(
+            "SELECT termo, conceito FROM cartoes WHERE aluno = ? AND prioridade <= ? AND vence_em <= ? "
+            "ORDER BY prioridade LIMIT ?",
+            (aluno, agora, agora, 2 * int(n)),
+        )
+        # Sem termos nem conceitos repetidos ou quase iguais no mesmo desafio (o gabarito ficaria ambíguo)
+        pares, termos, conceitos = [], set(), set()
+        for termo, conceito in linhas:
+            if termo in termos or conceito in conceitos:
+                continue
+            termos.add(termo); conceitos.add(conceito)
+            pares.append((termo, conceito))
+        return filtrar_quase_iguais(pares, n)
+
+    def estatisticas(self, aluno: str, agora: float | None = None) -> dict:
+        agora = time.time() if agora is None else agora
+        con = self._conexao()
+        total = con.execute("SELECT COUNT(*) FROM cartoes WHERE aluno = ?", (aluno,)).fetchone()[0]
+        vencidos = con.execute(
+            "SELECT COUNT(*) FROM cartoes WHERE aluno = ? AND prioridade <= ? AND vence_em <= ?", (aluno, agora, agora)
+        ).fetchone()[0]
+        return {"cartoes": total, "vencidos": vencidos}
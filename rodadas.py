@@ -0,0 +1,34 @@
+# rodadas.py
+import random
+from collections import deque
+from texto import normalizar_pergunta
+
+# -------------------- Rodadas a partir de um lote de pares --------------------
+# Uma chamada ao Gemini traz um lote grande de pares para a pergunta; cada
+# "Gerar Desafio" tira a próxima rodada de `n` pares de uma permutação própria
+# da sessão, sem repetir par até o lote acabar. Ao montar a ordem de um lote
+# novo, os termos vistos recentemente ficam por último (só saem se faltar par).
+
+def chave_termo(termo: str) -> str:
+    return normalizar_pergunta(termo)
+
+def ordem_rodadas(termos, semente, recentes=()) -> list:
+    """Permutação dos índices do lote para a sessão, com os termos de `recentes` no fim."""
+    ordem = list(range(len(termos)))
+    random.Random(semente).shuffle(ordem)
+    recentes = set(recentes)
+    return sorted(ordem, key=lambda i: chave_termo(termos[i]) in recentes)  # sorted é estável
+
+def proxima_rodada(ordem, cursor: int, n: int, minimo: int):
+    """
+    Os próximos `n` índices de `ordem` a partir de `cursor` e o novo cursor. A
+    última rodada pode vir menor; se sobrarem menos que `minimo`, o lote acabou: ([], cursor).
+    """
+    indices = list(ordem[cursor:cursor + n])
+    if len(indices) < minimo:
+        return [], cursor
+    return indices, cursor + len(indices)
+
+def lembrar(recentes: deque, termos):
+    """Acrescenta os termos de uma rodada aos recentes (deque com maxlen)."""
+    recentes.extend(chave_termo(t) for t in termos)
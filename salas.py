@@ -0,0 +1,109 @@
+# salas.py
+import bisect, random, threading, time
+from decks import Deck
+
+# -------------------- Salas de aula --------------------
+# O professor gera um deck e abre uma sala; a sala aponta para o Deck compartilhado
+# (decks.py), e cada participante guarda na sessão apenas o código da sala e a
+# semente do próprio embaralhamento. O placar é uma lista ordenada mantida a
+# cada resultado (bisect): consultar o topo ou a posição de alguém não reordena nada.
+
+ALFABETO_CODIGO = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"  # sem 0/O e 1/I, para ditar em voz alta
+TAMANHO_CODIGO = 5
+
+class Sala:
+    __slots__ = ("codigo", "pergunta", "deck", "versao", "ativa_em", "_placar", "_ranking")
+
+    def __init__(self, codigo: str, pergunta: str, deck: Deck):
+        self.codigo = codigo
+        self.pergunta = pergunta
+        self.versao = 0
+        self.ativa_em = time.monotonic()
+        self._trocar(deck)
+
+    def _trocar(self, deck: Deck):
+        self.deck = deck
+        self.versao += 1
+        self._placar = {}   # participante -> chave no ranking
+        self._ranking = []  # chaves (-acertos, tempo_ms, participante), melhor primeiro
+
+    def embaralhado(self, semente) -> tuple:
+        """(termos, conceitos, gabarito) na ordem própria de um participante; o gabarito é compartilhado."""
+        return self.deck.embaralhado(f"{semente}:{self.versao}")
+
+class RegistroSalas:
+    def __init__(self, ttl: float = 4 * 3600):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._salas = {}  # código -> Sala
+
+    def _expirar(self, agora: float):
+        for codigo in [c for c, s in self._salas.items() if agora - s.ativa_em > self.ttl]:
+            del self._salas[codigo]
+
+    def criar(self, deck: Deck, pergunta: str = "") -> Sala:
+        """Abre uma sala com o deck; retorna a Sala (com o código)."""
+        with self._lock:
+            self._expirar(time.monotonic())
+            while True:
+                codigo = "".join(random.choices(ALFABETO_CODIGO, k=TAMANHO_CODIGO))
+                if codigo not in self._salas:
+                    break
+            sala = self._salas[codigo] = Sala(codigo, pergunta, deck)
+        return sala
+
+    def obter(self, codigo: str) -> Sala | None:
+        sala = self._salas.get((codigo or "").strip().upper())
+        if sala is not None:
+            sala.ativa_em = time.monotonic()
+        return sala
+
+    def publicar(self, codigo: str, deck: Deck, pergunta: str | None = None) -> bool:
+        """Troca o deck da sala (novo desafio do professor) e zera o placar; False se o deck é o mesmo."""
+        with self._lock:
+            sala = self._salas.get(codigo)
+            if sala is None or deck.id == sala.deck.id:
+                return False
+            sala._trocar(deck)
+            if pergunta is not None:
+                sala.pergunta = pergunta
+        return True
+
+    def registrar(self, codigo: str, participante: str, versao: int, acertos: int, tempo_ms: int) -> bool:
+        """Guarda o melhor resultado do participante no deck atual; True se o placar mudou."""
+        chave = (-int(acertos), int(tempo_ms), participante)
+        with self._lock:
+            sala = self._salas.get(codigo)
+            if sala is None or versao != sala.versao:
+                return False  # resultado de um deck que o professor já trocou
+            anterior = sala._placar.get(participante)
+            if anterior is not None:
+                if anterior <= chave:
+                    return False
+                del sala._ranking[bisect.bisect_left(sala._ranking, anterior)]
+            bisect.insort(sala._ranking, chave)
+            sala._placar[participante] = chave
+            sala.ativa_em = time.monotonic()
+        return True
+
+    def placar(self, codigo: str, n: int = 10):
+        """Os n primeiros [(participante, acertos, tempo_ms)] e o total de participantes."""
+        sala = self._salas.get(codigo)
+        if sala is None:
+            return [], 0
+        with self._lock:
+            topo = sala._ranking[:n]
+            total = len(sala._ranking)
+        return [(p, -a, t) for a, t, p in topo], total
+
+    def posicao(self, codigo: str, participante: str) -> int | None:
+        """Posição (1 = primeiro) do participante no placar, ou None."""
+        sala = self._salas.get(codigo)
+        if sala is None:
+            return None
+        with self._lock:
+            chave = sala._placar.get(participante)
+            return None if chave is None else bisect.bisect_left(sala._ranking, chave) + 1
+
+    def total(self) -> int:
+        return len(self._salas)
@@ -0,0 +1,145 @@
+# similares.py
+import re, unicodedata
+import numpy as np
+
+# -------------------- Pares quase iguais --------------------
+# "Legalidade" e "Princípio da Legalidade" no mesmo deck deixam o jogo ambíguo,
+# e conceitos que são paráfrases um do outro também. Cada texto vira um vetor
+# TF-IDF de n-gramas de caracteres (com hashing, dimensão fixa), normalizado;
+# a similaridade de cosseno sai de um produto de matrizes por bloco de candidatos.
+# O IDF vem do próprio lote: prefixos comuns a muitos termos ("Poder ...",
+# "Mandado de ...") pesam pouco, o que distingue o termo de fato.
+# Pares de contraste são conteúdo de concurso ("sanável" x "insanável", "com"
+# x "sem margem de escolha", "admite" x "não admite"): as palavras de
+# polaridade pesam mais, e conceito parecido só derruba um par sozinho quando
+# é quase literal; abaixo disso, só se os termos também forem próximos.
+
+DIMENSAO = 1 << 11
+N_GRAMA = 3
+LIMIAR_TERMO = 0.75
+LIMIAR_CONCEITO = 0.7          # conceito parecido derruba o par se os termos passam de LIMIAR_TERMO_PROXIMO
+LIMIAR_TERMO_PROXIMO = 0.6
+LIMIAR_CONCEITO_LITERAL = 0.9  # conceito quase literal derruba o par sozinho
+BLOCO = 256
+PESO_NUMERO = 3.0  # "Lei 8.112" x "Lei 8.666", "Art. 5º" x "Art. 37": o número é o que distingue
+PESO_POLARIDADE = 3.0  # "admite" x "não admite": a negação é o que distingue
+
+_POLARIDADE = ("nao", "sem", "com", "nem", "nunca", "jamais", "vedado", "vedada", "salvo", "exceto")
+
+# Palavras que não distinguem um termo do outro (artigos, preposições e cabeças genéricas)
+_VAZIAS = frozenset(
+    "a o as os e ou de da do das dos em no na nos nas ao aos por para se que um uma "
+    "principio principios".split()
+)
+_RE_ACENTOS = re.compile(r"[\u0300-\u036f]")
+_RE_SEPARADORES = re.compile(r"[^\w\n]+|_+")
+_RE_VAZIAS = re.compile(r"\b(?:" + "|".join(sorted(_VAZIAS, key=len, reverse=True)) + r")\b")
+_RE_PLURAL = re.compile(r"\b(\w{3,})s\b")  # plural simples: "atos" ~ "ato"
+_RE_POLARIDADE = re.compile(r"(?<= )(?:" + "|".join(_POLARIDADE) + r")(?= )")
+_BITS = DIMENSAO.bit_length() - 1
+
+def _normalizar_lote(textos) -> list:
+    """Mesma normalização de normalizar_pergunta, mas com regex sobre o lote inteiro de uma vez."""
+    s = "\n".join(t.replace("\n", " ") for t in textos)
+    s = _RE_ACENTOS.sub("", unicodedata.normalize("NFKD", s.casefold()))
+    s = _RE_PLURAL.sub(r"\1", _RE_VAZIAS.sub(" ", _RE_SEPARADORES.sub(" ", s)))
+    return s.split("\n")
+
+class _Vetorizador:
+    """
+    TF-IDF com hashing de um lote de textos, guardado esparso (linha, coluna, peso).
+    Os n-gramas saem de uma passada vetorizada sobre o lote concatenado; as linhas
+    densas são montadas por bloco (a matriz inteira pode ser grande).
+    """
+
+    def __init__(self, textos):
+        linhas = [" " + "  ".join(t.split()) + " " for t in _normalizar_lote(list(textos))]
+        self.n = len(linhas)
+        inicios = np.cumsum([0] + [len(l) + 2 for l in linhas])[:-1]
+        texto = "  ".join(linhas)
+        cod = np.frombuffer(texto.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+        if cod.size < N_GRAMA:
+            cod = np.zeros(N_GRAMA, dtype=np.uint64)
+        polaridade = np.zeros(cod.size, dtype=bool)
+        for m in _RE_POLARIDADE.finditer(texto):
+            polaridade[m.start():m.end()] = True
+        # n-grama válido = centro dentro de uma palavra (os que cruzam palavras ou textos têm espaço no centro)
+        validos = np.flatnonzero(cod[1:-1] != ord(" "))
+        h = (cod[validos] * np.uint64(1_000_003) + cod[validos + 1]) * np.uint64(1_000_003) + cod[validos + 2]
+        colunas = ((h * np.uint64(0x9E3779B97F4A7C15)) >> np.uint64(64 - _BITS)).astype(np.int64)
+        linha_de = np.searchsorted(inicios, validos, side="right") - 1
+        digitos = (cod >= ord("0")) & (cod <= ord("9"))
+        com_numero = digitos[validos] | digitos[validos + 1] | digitos[validos + 2]
+        de_polaridade = polaridade[validos + 1]
+
+        todas = linha_de * DIMENSAO + colunas
+        chaves, contagens = np.unique(todas, return_counts=True)
+        self._linhas, self._colunas = chaves // DIMENSAO, chaves % DIMENSAO
+        df = np.bincount(self._colunas, minlength=DIMENSAO)
+        idf = np.log((1 + self.n) / (1 + df)) + 1
+        peso = (contagens * idf[self._colunas]
+                * np.where(np.isin(chaves, todas[com_numero]), PESO_NUMERO, 1.0)
+                * np.where(np.isin(chaves, todas[de_polaridade]), PESO_POLARIDADE, 1.0))
+        normas = np.sqrt(np.bincount(self._linhas, weights=peso * peso, minlength=self.n))
+        self._pesos = (peso / np.maximum(normas[self._linhas], 1e-12)).astype(np.float32)
+        self._inicio_linha = np.searchsorted(self._linhas, np.arange(self.n + 1))
+
+    def matriz(self, inicio: int, fim: int) -> np.ndarray:
+        a, b = self._inicio_linha[inicio], self._inicio_linha[fim]
+        m = np.zeros((fim - inicio, DIMENSAO), dtype=np.float32)
+        m[self._linhas[a:b] - inicio, self._colunas[a:b]] = self._pesos[a:b]
+        return m
+
+def _quase_iguais(st, sc, limiar_termo: float, limiar_conceito: float):
+    """Matriz (ou vetor) booleana: termos quase iguais, conceito quase literal, ou conceitos e termos próximos."""
+    return ((st >= limiar_termo) | (sc >= LIMIAR_CONCEITO_LITERAL)
+            | ((sc >= limiar_conceito) & (st >= LIMIAR_TERMO_PROXIMO)))
+
+def filtrar_quase_iguais(pares, max_pares: int | None = None,
+                         limiar_termo: float = LIMIAR_TERMO, limiar_conceito: float = LIMIAR_CONCEITO) -> list:
+    """
+    Percorre [(termo, conceito), ...] em ordem e mantém cada par que não é
+    quase igual (_quase_iguais) a um par já mantido. Para em `max_pares`.
+    """
+    pares = list(pares)
+    if len(pares) < 2:
+        return pares[:max_pares]
+    vt = _Vetorizador(t for t, _ in pares)
+    vc = _Vetorizador(c for _, c in pares)
+    limite = len(pares) if max_pares is None else int(max_pares)
+    mantidos = []
+    kt = np.empty((0, DIMENSAO), dtype=np.float32)
+    kc = np.empty((0, DIMENSAO), dtype=np.float32)
+    for inicio in range(0, len(pares), BLOCO):
+        fim = min(inicio + BLOCO, len(pares))
+        bt, bc = vt.matriz(inicio, fim), vc.matriz(inicio, fim)
+        # contra os já mantidos: uma multiplicação para o bloco inteiro
+        ruim = np.zeros(fim - inicio, dtype=bool)
+        if len(kt):
+            ruim = _quase_iguais(bt @ kt.T, bc @ kc.T, limiar_termo, limiar_conceito).any(axis=1)
+        # dentro do bloco: quem vem antes (e foi mantido) ganha
+        parecidos = _quase_iguais(bt @ bt.T, bc @ bc.T, limiar_termo, limiar_conceito)
+        novos = []
+        for i in np.flatnonzero(~ruim):
+            if novos and parecidos[i, novos].any():
+                continue
+            novos.append(i)
+            if len(mantidos) + len(novos) >= limite:
+                break
+        mantidos.extend(pares[inicio + i] for i in novos)
+        if len(mantidos) >= limite:
+            break
+        kt = np.vstack([kt, bt[novos]])
+        kc = np.vstack([kc, bc[novos]])
+    return mantidos
+
+def quase_igual(par, pares, limiar_termo: float = LIMIAR_TERMO, limiar_conceito: float = LIMIAR_CONCEITO) -> bool:
+    """True se o par é quase igual a algum de `pares` (para checar um par de cada vez, no streaming)."""
+    pares = list(pares)
+    if not pares:
+        return False
+    vt = _Vetorizador([t for t, _ in pares] + [par[0]])
+    vc = _Vetorizador([c for _, c in pares] + [par[1]])
+    n = len(pares)
+    mt, mc = vt.matriz(0, n + 1), vc.matriz(0, n + 1)
+    return bool(_quase_iguais(mt[:n] @ mt[n], mc[:n] @ mc[n], limiar_termo, limiar_conceito).any())
@@ -0,0 +1,411 @@
+// ===== Protocolo de componente do Streamlit (sem dependências) =====
+// O HTML/CSS/JS é estático (servido e cacheado uma vez); a cada rerun só chegam
+// os dados do deck via "streamlit:render", e os resultados voltam por
+// "streamlit:setComponentValue".
+function enviar(type, data) {
+  window.parent.postMessage(Object.assign({ isStreamlitMessage: true, type: type }, data), "*");
+}
+function enviarResultado(valor) {
+  enviar("streamlit:setComponentValue", { value: valor, dataType: "json" });
+}
+
+// Termos e conceitos são identificados pela posição (ids numéricos estáveis);
+// resposta[idTermo] = idConceito é o gabarito pré-calculado no Python.
+var termos = [];
+var conceitos = [];
+var resposta = [];
+var deckId = null;
+var inicio = 0;
+var colocacoes = [];
+var limpezas = [];    // ms de cada clique em "Limpar" (vão junto no próximo resultado)
+var noConceito = [];  // idConceito -> idTermo colocado ali (-1 = vazio)
+var ondeTermo = [];   // idTermo -> idConceito onde está (-1 = na coluna de termos)
+var livres = [];      // ids dos termos ainda na coluna de termos, na ordem exibida
+var marca = [];       // idConceito -> "" | "correct" | "wrong"
+var ordemTermos = [];     // ids dos termos na ordem de partida (volta a ela em "Limpar")
+var ordemConceitos = [];  // ids dos conceitos na ordem exibida
+
+// Deck chegando em streaming: a mesma `serie` volta a cada rerun com mais pares no
+// fim das listas, e o tabuleiro cresce no lugar (colocações e tempo continuam).
+// O Python manda a ordem original e `embaralhar`; as posições são sorteadas aqui.
+var serie = null;
+var embaralhar = false;
+
+// Decks grandes: só as linhas visíveis (+ folga) existem no DOM, com altura fixa.
+// A linha de conceito tem a altura do cartão com o conceito mais longo, medida
+// na largura atual da coluna (de novo a cada redimensionamento).
+var LIMITE_VIRTUAL = 60;
+var ALTURA_TERMO = 56;
+var ESPACO_CONCEITO = 8;
+var FOLGA = 6;
+var virtual = false;
+var alturaConceito = 0;  // 0 = medir no próximo render
+
+const $root = document.querySelector(".game-root");
+const $terms = document.getElementById("terms");
+const $concepts = document.getElementById("concepts");
+const $termsScroll = document.getElementById("termsScroll");
+const $conceptsScroll = document.getElementById("conceptsScroll");
+
+function inserir(lista, id) {
+  if (embaralhar) lista.splice(Math.floor(Math.random() * (lista.length + 1)), 0, id);
+  else lista.push(id);
+}
+
+function definirParcial(parcial) {
+  document.getElementById("btnCheck").disabled = parcial === true;
+  document.getElementById("btnShow").disabled = parcial === true;
+}
+
+function montar(args) {
+  termos = args.termos || [];
+  conceitos = args.conceitos || [];
+  resposta = args.resposta || [];
+  deckId = args.deck_id;
+  serie = args.serie || null;
+  embaralhar = args.embaralhar === true;
+  ordemTermos = [];
+  ordemConceitos = [];
+  for (var t = 0; t < termos.length; t++) inserir(ordemTermos, t);
+  for (var c = 0; c < conceitos.length; c++) inserir(ordemConceitos, c);
+  virtual = termos.length > LIMITE_VIRTUAL;
+  alturaConceito = 0;
+  $root.classList.toggle("virtual", virtual);
+  $termsScroll.scrollTop = 0;
+  $conceptsScroll.scrollTop = 0;
+  definirParcial(args.parcial);
+  closeModal();
+  limpar();
+  inicio = Date.now();
+  colocacoes = [];
+  limpezas = [];
+}
+
+function comecaCom(lista, prefixo) {
+  if (lista.length < prefixo.length) return false;
+  for (var i = 0; i < prefixo.length; i++) {
+    if (lista[i] !== prefixo[i]) return false;
+  }
+  return true;
+}
+
+// Mesma série e só pares novos no fim: acrescenta sem mexer no que já está na tela.
+// Retorna false quando o deck mudou de outro jeito (aí é montar do zero).
+function crescer(args) {
+  var novosTermos = args.termos || [];
+  var novosConceitos = args.conceitos || [];
+  if (!serie || args.serie !== serie || !comecaCom(novosTermos, termos) || !comecaCom(novosConceitos, conceitos)) return false;
+  for (var t = termos.length; t < novosTermos.length; t++) {
+    ondeTermo.push(-1);
+    inserir(ordemTermos, t);
+    inserir(livres, t);
+  }
+  for (var c = conceitos.length; c < novosConceitos.length; c++) {
+    noConceito.push(-1);
+    marca.push("");
+    inserir(ordemConceitos, c);
+  }
+  termos = novosTermos;
+  conceitos = novosConceitos;
+  resposta = args.resposta || [];
+  deckId = args.deck_id;
+  virtual = termos.length > LIMITE_VIRTUAL;
+  alturaConceito = 0;
+  $root.classList.toggle("virtual", virtual);
+  definirParcial(args.parcial);
+  render();
+  return true;
+}
+
+// ===== Renderização (estado -> DOM) =====
+function criarTermo(t) {
+  const el = document.createElement("div");
+  el.className = "card-term";
+  el.textContent = termos[t];
+  el.title = termos[t];
+  el.draggable = true;
+  el.dataset.t = t;
+  return el;
+}
+
+function criarConceito(c) {
+  const card = document.createElement("div");
+  card.className = "concept-card";
+  const text = document.createElement("div");
+  text.className = "concept-text";
+  text.textContent = conceitos[c];
+  text.title = conceitos[c];
+  if (marca[c]) {
+    const badge = document.createElement("span");
+    badge.className = marca[c] === "correct" ? "badge ok" : "badge err";
+    badge.textContent = marca[c] === "correct" ? "✔" : "✘";
+    text.appendChild(badge);
+  }
+  const drop = document.createElement("div");
+  drop.className = "drop" + (marca[c] ? " " + marca[c] : "");
+  drop.dataset.c = c;
+  if (noConceito[c] >= 0) drop.appendChild(criarTermo(noConceito[c]));
+  card.appendChild(text);
+  card.appendChild(drop);
+  return card;
+}
+
+function renderColuna(container, scrollEl, n, altura, criar) {
+  container.innerHTML = "";
+  if (!virtual) {
+    container.style.height = "";
+    for (let i = 0; i < n; i++) container.appendChild(criar(i));
+    return;
+  }
+  const ini = Math.max(0, Math.floor(scrollEl.scrollTop / altura) - FOLGA);
+  const fim = Math.min(n, Math.ceil((scrollEl.scrollTop + scrollEl.clientHeight) / altura) + FOLGA);
+  container.style.height = (n * altura) + "px";
+  for (let i = ini; i < fim; i++) {
+    const el = criar(i);
+    el.style.top = (i * altura) + "px";
+    container.appendChild(el);
+  }
+}
+
+function renderTermos() {
+  renderColuna($terms, $termsScroll, livres.length, ALTURA_TERMO, function(i) { return criarTermo(livres[i]); });
+}
+function medirAlturaConceito() {
+  var maior = 0;
+  for (var c = 1; c < conceitos.length; c++) {
+    if (conceitos[c].length > conceitos[maior].length) maior = c;
+  }
+  var card = criarConceito(maior);
+  card.style.visibility = "hidden";
+  $concepts.appendChild(card);
+  alturaConceito = card.offsetHeight + ESPACO_CONCEITO;
+  $concepts.removeChild(card);
+}
+
+function renderConceitos() {
+  if (virtual && !alturaConceito) medirAlturaConceito();
+  renderColuna($concepts, $conceptsScroll, conceitos.length, alturaConceito, function(i) {
+    var card = criarConceito(ordemConceitos[i]);
+    if (virtual) card.style.height = (alturaConceito - ESPACO_CONCEITO) + "px";
+    return card;
+  });
+}
+function render() {
+  renderTermos();
+  renderConceitos();
+}
+
+var quadroPendente = false;
+function renderNoProximoQuadro() {
+  if (quadroPendente) return;
+  quadroPendente = true;
+  requestAnimationFrame(function() { quadroPendente = false; render(); });
+}
+$termsScroll.addEventListener("scroll", function() { if (virtual) renderNoProximoQuadro(); });
+$conceptsScroll.addEventListener("scroll", function() { if (virtual) renderNoProximoQuadro(); });
+window.addEventListener("resize", function() {
+  if (!virtual) return;
+  alturaConceito = 0;
+  renderNoProximoQuadro();
+});
+
+// ===== Arrastar e soltar (delegado: funciona com linhas recriadas) =====
+function colocar(t, c) {
+  if (ondeTermo[t] === c) return;
+  if (ondeTermo[t] >= 0) {
+    noConceito[ondeTermo[t]] = -1;
+  } else {
+    livres.splice(livres.indexOf(t), 1);
+  }
+  const anterior = noConceito[c];
+  if (anterior >= 0) {
+    ondeTermo[anterior] = -1;
+    livres.unshift(anterior);
+  }
+  noConceito[c] = t;
+  ondeTermo[t] = c;
+  colocacoes.push({ t: t, c: c, ms: Date.now() - inicio });
+  render();
+}
+
+document.addEventListener("dragstart", function(e) {
+  const el = e.target.closest && e.target.closest(".card-term");
+  if (el) e.dataTransfer.setData("text/plain", el.dataset.t);
+});
+$concepts.addEventListener("dragover", function(e) {
+  const drop = e.target.closest(".drop");
+  if (!drop) return;
+  e.preventDefault();
+  drop.classList.add("over");
+});
+$concepts.addEventListener("dragleave", function(e) {
+  const drop = e.target.closest(".drop");
+  if (drop) drop.classList.remove("over");
+});
+$concepts.addEventListener("drop", function(e) {
+  const drop = e.target.closest(".drop");
+  if (!drop) return;
+  e.preventDefault();
+  drop.classList.remove("over");
+  const t = parseInt(e.dataTransfer.getData("text/plain"), 10);
+  if (isNaN(t) || t < 0 || t >= termos.length) return;
+  colocar(t, parseInt(drop.dataset.c, 10));
+});
+
+// ===== Modal =====
+const modalBackdrop = document.getElementById("modalBackdrop");
+const modalClose = document.getElementById("modalClose");
+const modalContent = document.getElementById("modalContent");
+
+function closeModal() {
+  modalBackdrop.style.display = "none";
+  modalBackdrop.setAttribute("aria-hidden", "true");
+  // remove confetes remanescentes
+  const confs = document.querySelectorAll(".confetti");
+  for (let i=0;i<confs.length;i++) confs[i].remove();
+}
+modalClose.addEventListener("click", closeModal);
+modalBackdrop.addEventListener("click", function(e) {
+  if (e.target === modalBackdrop) closeModal();
+});
+document.addEventListener("keydown", function(e) {
+  if (e.key === "Escape") closeModal();
+});
+
+// Confete
+function spawnConfetti(n) {
+  if (!n) n = 60;
+  for (let i = 0; i < n; i++) {
+    const piece = document.createElement("div");
+    piece.className = "confetti";
+    const left = Math.random() * 100;
+    const hue  = Math.floor(Math.random() * 360);
+    piece.style.left = left + "%";
+    piece.style.background = 'hsl(' + hue + ', 90%, 55%)';
+    piece.style.animationDelay = (Math.random() * 0.8) + "s";
+    piece.style.transform = 'translateY(-20px) rotate(' + (Math.random()*360) + 'deg)';
+    modalBackdrop.appendChild(piece);
+    setTimeout(function() { piece.remove(); }, 2500);
+  }
+}
+
+function showSuccessModal(acertos, total, perc) {
+  modalContent.innerHTML = ''
+    + '<h2 id="modalTitle">🎉 Parabéns! Resultado Perfeito</h2>'
+    + '<p>Você acertou <b>' + acertos + ' / ' + total + '</b> (' + Math.round(perc) + '%). Excelente!</p>'
+    + '<div class="bar-wrap"><div class="bar-fill" style="width:100%"></div></div>'
+    + '<p class="hint">Dica: tente aumentar a velocidade mantendo a precisão — você está pronto para o próximo nível! 🚀</p>';
+  modalBackdrop.style.display = "flex";
+  modalBackdrop.setAttribute("aria-hidden", "false");
+  spawnConfetti(80);
+}
+
+function showMotivationModal(acertos, total, perc) {
+  var tips = [
+    "Leia com calma os conceitos: identifique palavras-chave ⚡",
+    "Tente agrupar termos semelhantes e elimine os óbvios primeiro 🧠",
+    "Se pintar dúvida, use o gabarito para aprender e tente de novo 😉"
+  ];
+  var tip = tips[Math.floor(Math.random()*tips.length)];
+  modalContent.innerHTML = ''
+    + '<h2 id="modalTitle"><span class="pulse">💪 Quase lá!</span></h2>'
+    + '<p>Você acertou <b>' + acertos + ' / ' + total + '</b> (' + Math.round(perc) + '%). Continue — cada tentativa reforça a memória!</p>'
+    + '<div class="bar-wrap"><div class="bar-fill" id="barFill" style="width:0%"></div></div>'
+    + '<p class="hint">Sugestão: ' + tip + '</p>'
+    + '<button class="btn" id="btnTryAgain">Tentar novamente</button>';
+  modalBackdrop.style.display = "flex";
+  modalBackdrop.setAttribute("aria-hidden", "false");
+  setTimeout(function() {
+    var fill = document.getElementById("barFill");
+    if (fill) fill.style.width = perc + "%";
+  }, 50);
+  var btn = document.getElementById("btnTryAgain");
+  if (btn) btn.addEventListener("click", closeModal);
+}
+
+// ===== Verificação, Limpar e Gabarito (O(n), sobre o estado) =====
+function verificar(revelado) {
+  var acertos = 0;
+  var respostas = [];
+  for (var c = 0; c < conceitos.length; c++) {
+    var t = noConceito[c];
+    if (t < 0) { marca[c] = ""; continue; }
+    var correto = resposta[t] === c;
+    marca[c] = correto ? "correct" : "wrong";
+    if (correto) acertos += 1;
+    respostas.push({ t: t, c: c, ok: correto });
+  }
+  render();
+  var total = termos.length;
+  var perc = total ? (acertos/total)*100 : 0;
+  document.getElementById("score").textContent = 'Pontuação: ' + acertos + ' / ' + total;
+  enviarResultado({
+    deck_id: deckId, acertos: acertos, total: total, revelado: revelado === true,
+    tempo_ms: Date.now() - inicio, respostas: respostas, colocacoes: colocacoes,
+    limpezas: limpezas, rodada: inicio, enviado_em: Date.now()
+  });
+
+  if (acertos === total && total > 0) {
+    showSuccessModal(acertos, total, perc);
+  } else {
+    showMotivationModal(acertos, total, perc);
+  }
+}
+
+function limpar() {
+  document.getElementById("score").textContent = "";
+  noConceito = new Array(conceitos.length).fill(-1);
+  ondeTermo = new Array(termos.length).fill(-1);
+  marca = new Array(conceitos.length).fill("");
+  livres = ordemTermos.slice();
+  render();
+}
+
+function mostrarGabarito() {
+  noConceito = new Array(conceitos.length).fill(-1);
+  marca = new Array(conceitos.length).fill("");
+  livres = [];
+  for (var i = 0; i < ordemTermos.length; i++) {
+    var t = ordemTermos[i];
+    var c = resposta[t];
+    if (c >= 0 && c < conceitos.length && noConceito[c] < 0) {
+      noConceito[c] = t;
+      ondeTermo[t] = c;
+    } else {
+      ondeTermo[t] = -1;
+      livres.push(t);
+    }
+  }
+  verificar(true);
+}
+
+document.getElementById("btnCheck").addEventListener("click", function() { verificar(false); });
+document.getElementById("btnReset").addEventListener("click", function() { limpezas.push(Date.now() - inicio); limpar(); });
+document.getElementById("btnShow").addEventListener("click", mostrarGabarito);
+
+// Auto-scroll em cada coluna
+function setupAutoScroll(container) {
+  container.addEventListener("dragover", function(e) {
+    var rect = container.getBoundingClientRect();
+    var threshold = 60;
+    var speed = 16;
+    if (e.clientY < rect.top + threshold) {
+      container.scrollTop -= speed;
+    } else if (e.clientY > rect.bottom - threshold) {
+      container.scrollTop += speed;
+    }
+  });
+}
+setupAutoScroll($termsScroll);
+setupAutoScroll($conceptsScroll);
+
+// ===== Ciclo de vida do componente =====
+window.addEventListener("message", function(e) {
+  if (!e.data || e.data.type !== "streamlit:render") return;
+  var args = e.data.args || {};
+  // Mesmo deck (rerun por outro widget): mantém o tabuleiro como está
+  if (args.deck_id === deckId) definirParcial(args.parcial);
+  else if (!crescer(args)) montar(args);
+});
+enviar("streamlit:componentReady", { apiVersion: 1 });
+enviar("streamlit:setFrameHeight", { height: 840 });
@@ -0,0 +1,5 @@
+# conftest.py
+import os, sys
+
+# Os módulos do jogo ficam na raiz do repositório
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,61 @@
+import io, json
+import pytest
+from banco_decks import BancoDecks, palavras_chave, similaridade
+from texto import normalizar_pergunta
+
+PRINCIPIOS = [("Legalidade", "Agir conforme a lei."), ("Impessoalidade", "Sem favorecimento."),
+              ("Moralidade", "Respeito à ética."), ("Publicidade", "Transparência dos atos."),
+              ("Eficiência", "Serviço adequado e rápido.")]
+PODERES = [("Poder hierárquico", "Organiza a estrutura interna."), ("Poder disciplinar", "Aplica penalidades."),
+           ("Poder regulamentar", "Edita decretos."), ("Poder de polícia", "Limita direitos individuais.")]
+
+@pytest.fixture
+def banco(tmp_path):
+    banco = BancoDecks(str(tmp_path / "banco.sqlite3"))
+    banco.adicionar("Quais são os princípios da Administração Pública?", PRINCIPIOS)
+    banco.adicionar("Quais são os poderes administrativos?", PODERES)
+    banco.adicionar("Quais são os atos administrativos quanto à formação?",
+                    [("Ato simples", "Um órgão."), ("Ato complexo", "Dois órgãos."), ("Ato composto", "Um órgão e outro verifica."),
+                     ("Ato vinculado", "Sem escolha.")])
+    return banco
+
+def test_palavras_chave_sem_molde_e_no_singular():
+    assert palavras_chave(normalizar_pergunta("Quais são os princípios da Administração Pública?")) == {
+        "principio", "administracao", "publica"}
+
+def test_similaridade_ignora_o_molde_da_pergunta():
+    a = normalizar_pergunta("Quais são os princípios da Administração Pública?")
+    b = normalizar_pergunta("Explique os princípios da administração pública")
+    assert similaridade(a, b) == 1.0
+
+def test_mesma_pergunta_com_outras_palavras_acha_o_deck(banco):
+    pares = banco.buscar("Explique os princípios da administração pública", 4)
+    assert len(pares) == 4 and set(pares) <= set(PRINCIPIOS)
+
+def test_assunto_diferente_com_o_mesmo_molde_nao_casa(banco):
+    assert banco.buscar("Quais são os poderes da Administração Pública?", 4) is None
+    assert banco.buscar("Quais são os atos da Administração Pública?", 4) is None
+
+def test_exige_pares_suficientes(banco):
+    assert banco.buscar("princípios da administração pública", 6) is None
+
+def test_pergunta_so_de_palavras_vazias(banco):
+    assert banco.buscar("Quais são os?", 4) is None
+
+def test_deck_identico_entra_uma_vez(banco):
+    assert not banco.adicionar("Quais são os poderes administrativos?", PODERES)
+    assert banco.total() == 3
+
+def test_reunir_junta_decks_sem_repetir(banco):
+    banco.adicionar("Poderes administrativos", PODERES[:2] + [("Poder normativo", "Regulamenta leis.")])
+    pares = banco.reunir("poderes", 50)
+    assert len(pares) == len({t for t, _ in pares}) == 5
+
+def test_exportar_e_importar(banco, tmp_path):
+    saida = io.StringIO()
+    assert banco.exportar_jsonl(saida) == 3
+    outro = BancoDecks(str(tmp_path / "outro.sqlite3"))
+    assert outro.importar_jsonl(io.StringIO(saida.getvalue())) == 3
+    assert outro.importar_jsonl(io.StringIO(saida.getvalue())) == 0
+    assert json.loads(saida.getvalue().splitlines()[1])["pares"][0] == {"termo": "Poder hierárquico", "conceito": "Organiza a estrutura interna."}
+    assert outro.buscar("poderes administrativos", 4)
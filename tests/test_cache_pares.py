@@ -0,0 +1,88 @@
+import sqlite3, threading, time
+import pytest
+from cache_pares import CachePares, chave_pares
+from conexoes import ConexoesSQLite
+
+PARES = [("Legalidade", "Agir conforme a lei."), ("Publicidade", "Atos transparentes.")]
+
+@pytest.fixture
+def caminho(tmp_path):
+    return str(tmp_path / "pares.sqlite3")
+
+def _linhas(caminho):
+    with sqlite3.connect(caminho) as con:
+        return con.execute("SELECT COUNT(*) FROM pares").fetchone()[0]
+
+def test_chave_depende_de_pergunta_quantidade_e_modelo():
+    chaves = {chave_pares("p", 6, "flash"), chave_pares("p", 8, "flash"), chave_pares("p", 6, "pro"), chave_pares("q", 6, "flash")}
+    assert len(chaves) == 4
+
+def test_guardar_e_obter(caminho):
+    cache = CachePares(caminho)
+    assert cache.obter("k") is None
+    cache.guardar("k", PARES)
+    assert cache.obter("k") == PARES
+    stats = cache.estatisticas()
+    assert (stats["acertos"], stats["falhas"], stats["entradas"]) == (1, 1, 1)
+
+def test_sondagem_nao_conta(caminho):
+    cache = CachePares(caminho)
+    cache.guardar("k", PARES)
+    cache.obter("k", contar=False)
+    cache.obter("x", contar=False)
+    stats = cache.estatisticas()
+    assert (stats["acertos"], stats["falhas"]) == (0, 0)
+
+def test_expirada_e_falha_mas_obter_nao_apaga(caminho):
+    cache = CachePares(caminho, ttl=60)
+    cache.guardar("k", PARES)
+    with sqlite3.connect(caminho) as con:
+        con.execute("UPDATE pares SET criado_em = criado_em - 120")
+    assert cache.obter("k") is None
+    assert _linhas(caminho) == 1  # leitura não escreve
+    cache.guardar("outra", PARES)
+    assert _linhas(caminho) == 1  # o guardar levou a expirada
+
+def test_obter_nao_segura_o_lock_de_escrita(caminho):
+    cache = CachePares(caminho, intervalo_contadores=3600)
+    cache.guardar("k", PARES)
+    escritor = sqlite3.connect(caminho, isolation_level=None)
+    escritor.execute("BEGIN IMMEDIATE")
+    try:
+        inicio = time.monotonic()
+        assert cache.obter("k") == PARES
+        assert time.monotonic() - inicio < 1
+    finally:
+        escritor.execute("ROLLBACK")
+        escritor.close()
+
+def test_lru_usa_os_acessos_ainda_nao_gravados(caminho):
+    cache = CachePares(caminho, max_entradas=2, intervalo_contadores=3600)
+    cache.guardar("a", PARES)
+    time.sleep(0.01)
+    cache.guardar("b", PARES)
+    time.sleep(0.01)
+    cache.obter("a")  # "a" passa a ser a mais recente, só na memória
+    cache.guardar("c", PARES)
+    assert cache.obter("a") == PARES
+    assert cache.obter("b") is None
+
+def test_contadores_pendentes_vao_ao_disco_no_intervalo(caminho):
+    cache = CachePares(caminho, intervalo_contadores=0)
+    cache.obter("x")
+    with sqlite3.connect(caminho) as con:
+        assert dict(con.execute("SELECT nome, valor FROM contadores"))["falhas"] == 1
+
+def test_conexao_volta_ao_estoque_quando_a_thread_termina(caminho):
+    conexoes = ConexoesSQLite(caminho)
+    usadas = []
+
+    def rodar():
+        usadas.append(id(conexoes()))
+
+    for _ in range(3):
+        t = threading.Thread(target=rodar)
+        t.start()
+        t.join()
+    assert len(set(usadas)) == 1
+    assert conexoes.livres() == 1
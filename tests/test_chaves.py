@@ -0,0 +1,99 @@
+import time
+import pytest
+from chaves import ModeloDoPool, PoolChaves, SemCota
+
+gexc = pytest.importorskip("google.api_core.exceptions")
+
+A, B = "aaaa1111", "bbbb2222"
+
+def test_balde_divide_as_fichas_entre_as_chaves():
+    pool = PoolChaves([A, B], rpm=60, rajada=2, espera_max=0.5)
+    assert sorted(pool.reservar("flash") for _ in range(4)) == [A, A, B, B]
+    with pytest.raises(SemCota):
+        pool.reservar("flash", timeout=0.1)
+
+def test_balde_volta_a_encher_com_o_tempo():
+    pool = PoolChaves([A], rpm=600, rajada=1)  # uma ficha a cada 0,1 s
+    pool.reservar("flash")
+    inicio = time.monotonic()
+    assert pool.reservar("flash", timeout=1) == A
+    assert 0.05 < time.monotonic() - inicio < 0.5
+
+def test_baldes_separados_por_modelo():
+    pool = PoolChaves([A], rpm=60, rajada=1)
+    pool.reservar("flash")
+    assert pool.reservar("pro", timeout=0) == A
+    with pytest.raises(SemCota):
+        pool.reservar("flash", timeout=0)
+
+def test_sem_limite_por_padrao():
+    pool = PoolChaves([A])
+    assert all(pool.reservar("flash", timeout=0) == A for _ in range(100))
+
+def test_erro_de_cota_poe_de_castigo_e_tenta_a_outra_chave():
+    pool = PoolChaves([A, B], recuo_base=0.2)
+    chamadas = []
+
+    def fn(chave):
+        chamadas.append(chave)
+        if chave == A:
+            raise gexc.ResourceExhausted("cota")
+        return "ok"
+
+    assert pool.executar(fn, "flash") == "ok"
+    assert pool.executar(fn, "flash") == "ok"
+    assert chamadas == [A, B, B]  # A ficou de castigo
+    uso = {u["chave"]: u for u in pool.uso()}
+    assert uso["…1111"]["erros_cota"] == 1 and uso["…1111"]["castigo_s"] > 0
+
+def test_recuo_dobra_a_cada_falha_seguida():
+    pool = PoolChaves([A], recuo_base=10, recuo_max=25)
+    pool.reservar("flash")
+    castigos = []
+    for _ in range(3):
+        pool.falha(A, gexc.ResourceExhausted("cota"), "flash")
+        castigos.append(pool.uso()[0]["castigo_s"])
+    assert castigos == [10, 20, 25]
+
+def test_outros_erros_nao_trocam_de_chave():
+    pool = PoolChaves([A, B])
+    chamadas = []
+
+    def fn(chave):
+        chamadas.append(chave)
+        raise ValueError("json")
+
+    with pytest.raises(ValueError):
+        pool.executar(fn, "flash")
+    assert len(chamadas) == 1
+
+def test_stream_so_troca_de_chave_antes_do_primeiro_item():
+    pool = PoolChaves([A, B])
+
+    def fn(chave):
+        if chave == A:
+            raise gexc.ResourceExhausted("cota")
+        yield 1
+        raise gexc.ResourceExhausted("cota no meio")
+
+    itens = []
+    with pytest.raises(gexc.ResourceExhausted):
+        for item in pool.executar_stream(fn, "flash"):
+            itens.append(item)
+    assert itens == [1]
+
+def test_modelo_do_pool_gasta_uma_ficha_por_chamada():
+    pool = PoolChaves([A], rpm=60, rajada=2, espera_max=0)
+
+    class Modelo:
+        def __init__(self, chave, nome):
+            self.nome = nome
+
+        def generate_content(self, prompt, stream=False, **kw):
+            return iter(["a", "b"]) if stream else prompt
+
+    model = ModeloDoPool(pool, Modelo, "flash")
+    assert model.generate_content("p1") == "p1"
+    assert list(model.generate_content("p2", stream=True)) == ["a", "b"]
+    with pytest.raises(SemCota):
+        model.generate_content("p3")
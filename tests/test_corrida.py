@@ -0,0 +1,81 @@
+import threading, time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from corrida import PrazoEsgotado, correr
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=4) as ex:
+        yield ex
+
+def _lento(c):
+    c.pares.append(("t", "c"))
+    c.parar.wait(5)
+    return "tarde"
+
+def test_primario_rapido_vence_sem_largar_reserva(executor):
+    largou = threading.Event()
+
+    def reserva(c):
+        largou.set()
+        return "reserva"
+
+    assert correr(executor, lambda c: "primario", reserva, atraso_reserva=1) == ("primario", "primario")
+    assert not largou.is_set()
+
+def test_reserva_vence_e_o_perdedor_e_avisado(executor):
+    corredores = []
+
+    def primario(c):
+        corredores.append(c)
+        c.parar.wait(5)
+        return "tarde"
+
+    assert correr(executor, primario, lambda c: "reserva", atraso_reserva=0.05, prazo=5) == ("reserva", "reserva")
+    assert corredores[0].parar.is_set()
+
+def test_primario_que_falha_com_pares_parciais_larga_a_reserva(executor):
+    def primario(c):
+        c.pares += [("a", "1"), ("b", "2")]
+        time.sleep(0.1)
+        raise ValueError("poucos pares")
+
+    resultado = correr(executor, primario, lambda c: "reserva", atraso_reserva=5, prazo=5, ao_progresso=lambda p: None)
+    assert resultado == ("reserva", "reserva")
+
+def test_todos_falham_levanta_o_primeiro_erro(executor):
+    def falha(msg):
+        def fn(c):
+            raise ValueError(msg)
+        return fn
+
+    with pytest.raises(ValueError, match="primario"):
+        correr(executor, falha("primario"), falha("reserva"), atraso_reserva=5)
+
+def test_prazo_esgotado_leva_os_parciais_e_para_os_corredores(executor):
+    corredores = []
+
+    def primario(c):
+        corredores.append(c)
+        return _lento(c)
+
+    inicio = time.monotonic()
+    with pytest.raises(PrazoEsgotado) as erro:
+        correr(executor, primario, prazo=0.2)
+    assert time.monotonic() - inicio < 2
+    assert erro.value.parciais == [("t", "c")]
+    assert corredores[0].parar.is_set()
+
+def test_erro_em_ao_progresso_para_os_corredores(executor):
+    corredores = []
+
+    def primario(c):
+        corredores.append(c)
+        return _lento(c)
+
+    def ao_progresso(pares):
+        raise RuntimeError("rerun")
+
+    with pytest.raises(RuntimeError):
+        correr(executor, primario, ao_progresso=ao_progresso)
+    assert corredores[0].parar.is_set()
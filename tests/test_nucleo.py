@@ -0,0 +1,65 @@
+import json
+import pytest
+from nucleo import ErroGeracao, _LeitorArrayJSON, gerar_pares
+
+ITENS = [
+    {"termo": "Legalidade", "conceito": "A administração só pode agir conforme a lei."},
+    {"termo": "Aspas \"e\" {chaves}", "conceito": "Texto com ] e \\ no meio."},
+    {"termo": "Publicidade", "conceito": "Os atos devem ser transparentes e acessíveis."},
+]
+
+def _ler_em_pedacos(texto: str, tamanho: int) -> list:
+    leitor = _LeitorArrayJSON()
+    objetos = []
+    for i in range(0, len(texto), tamanho):
+        objetos += leitor.alimentar(texto[i:i + tamanho])
+    return objetos
+
+@pytest.mark.parametrize("tamanho", [1, 2, 3, 7, 1000])
+def test_leitor_em_pedacos_de_qualquer_tamanho(tamanho):
+    texto = "```json\n" + json.dumps(ITENS, ensure_ascii=False) + "\n```"
+    assert _ler_em_pedacos(texto, tamanho) == ITENS
+
+def test_leitor_devolve_cada_objeto_assim_que_fecha():
+    leitor = _LeitorArrayJSON()
+    assert leitor.alimentar('[{"termo": "A", "conc') == []
+    assert leitor.alimentar('eito": "x"}, {"termo"') == [{"termo": "A", "conceito": "x"}]
+
+def test_leitor_descarta_objeto_malformado_e_segue():
+    texto = '[{"termo": "A", "conceito": x}, {"termo": "B", "conceito": "y"}]'
+    assert _ler_em_pedacos(texto, 4) == [{"termo": "B", "conceito": "y"}]
+
+def test_leitor_para_no_fim_do_array():
+    texto = '[{"termo": "A", "conceito": "x"}] [{"termo": "B", "conceito": "y"}]'
+    assert _ler_em_pedacos(texto, 5) == [{"termo": "A", "conceito": "x"}]
+
+class _Resposta:
+    def __init__(self, texto):
+        self.text = texto
+
+class _Modelo:
+    model_name = "models/teste"
+
+    def __init__(self, *textos):
+        self.textos = list(textos)
+        self.prompts = []
+
+    def generate_content(self, prompt, **kw):
+        self.prompts.append(prompt)
+        return _Resposta(self.textos.pop(0))
+
+def _deck(*termos):
+    return json.dumps([{"termo": t, "conceito": f"Definição própria de {t} com palavras {t.lower()}x"} for t in termos])
+
+def test_gerar_pares_repara_deck_curto():
+    model = _Modelo(_deck("Alfa", "Beta"), _deck("Gama", "Delta", "Épsilon"))
+    termos, conceitos, gabarito = gerar_pares(model, "pergunta", max_itens=5)
+    assert termos == ["Alfa", "Beta", "Gama", "Delta", "Épsilon"]
+    assert gabarito["Gama"] == conceitos[2]
+    assert len(model.prompts) == 2
+
+def test_gerar_pares_desiste_apos_os_reparos():
+    model = _Modelo("[]", "[]", "[]")
+    with pytest.raises(ErroGeracao):
+        gerar_pares(model, "pergunta")
+    assert len(model.prompts) == 3
@@ -0,0 +1,51 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from parciais import GeracaoParcial
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=1) as ex:
+        yield ex
+
+def test_pares_chegam_antes_do_fim(executor):
+    chegou, liberar = threading.Event(), threading.Event()
+
+    def gerar(ao_receber):
+        ao_receber([("A", "a")])
+        ao_receber([("A", "a"), ("B", "b")])
+        chegou.set()
+        liberar.wait(5)
+        return "deck"
+
+    geracao = GeracaoParcial(executor, gerar)
+    assert chegou.wait(5)
+    assert geracao.pares() == [("A", "a"), ("B", "b")]
+    assert not geracao.terminou()
+    liberar.set()
+    geracao.futuro.result(5)
+    assert geracao.terminou() and geracao.resultado() == "deck"
+
+def test_lista_menor_nao_apaga_os_pares(executor):
+    # Quem espera outra sessão (voo único) recebe [] no meio do caminho
+    def gerar(ao_receber):
+        ao_receber([("A", "a")])
+        ao_receber([])
+        return None
+
+    geracao = GeracaoParcial(executor, gerar)
+    geracao.futuro.result(5)
+    assert geracao.pares() == [("A", "a")]
+
+def test_erro_da_geracao_sai_no_resultado(executor):
+    def gerar(ao_receber):
+        raise TimeoutError("prazo")
+
+    geracao = GeracaoParcial(executor, gerar)
+    with pytest.raises(TimeoutError):
+        geracao.futuro.result(5)
+    with pytest.raises(TimeoutError):
+        geracao.resultado()
+
+def test_series_diferentes(executor):
+    assert GeracaoParcial(executor, lambda r: None).serie != GeracaoParcial(executor, lambda r: None).serie
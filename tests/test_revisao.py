@@ -0,0 +1,72 @@
+import pytest
+from revisao import DIA, REVER_APOS_ERRO, AgendaRevisao, _agendar, id_cartao
+
+PAR = ("Legalidade", "A administração só pode agir conforme a lei.")
+MINUTO = 60
+
+@pytest.fixture
+def agenda(tmp_path):
+    return AgendaRevisao(str(tmp_path / "revisao.sqlite3"))
+
+def _cartao(agenda, aluno="ana", par=PAR):
+    return agenda._conexao().execute(
+        "SELECT repeticoes, intervalo, lapsos, vence_em FROM cartoes WHERE aluno = ? AND cartao = ?",
+        (aluno, id_cartao(*par)),
+    ).fetchone()
+
+def _responder(agenda, correto, agora, par=PAR):
+    agenda.registrar("ana", [(*par, correto)], agora=agora)
+
+def test_sm2_intervalos():
+    assert _agendar(0, 0, 2.5, True)[:2] == (1, 1.0)
+    assert _agendar(1, 1.0, 2.5, True)[:2] == (2, 6.0)
+    rep, intervalo, facilidade, _ = _agendar(2, 6.0, 2.5, True)
+    assert (rep, intervalo) == (3, 6.0 * facilidade)
+    assert _agendar(3, 15.0, 2.5, False)[:2] == (0, 0.0)
+
+def test_acerto_antes_de_vencer_nao_estica_o_intervalo(agenda):
+    _responder(agenda, True, 0)
+    _responder(agenda, True, MINUTO)  # mesmo par, deck reembaralhado
+    repeticoes, intervalo, _, vence_em = _cartao(agenda)
+    assert (repeticoes, intervalo, vence_em) == (1, 1.0, DIA)
+
+def test_acerto_vencido_avanca(agenda):
+    _responder(agenda, True, 0)
+    _responder(agenda, True, DIA)
+    assert _cartao(agenda)[:2] == (2, 6.0)
+
+def test_erro_repetido_antes_de_vencer_conta_um_lapso(agenda):
+    _responder(agenda, False, 0)
+    _responder(agenda, False, MINUTO)
+    _, _, lapsos, vence_em = _cartao(agenda)
+    assert lapsos == 1 and vence_em == MINUTO + REVER_APOS_ERRO
+
+def test_cartao_com_varios_lapsos_so_aparece_quando_vence(agenda):
+    # Dois lapsos adiantam a prioridade em 10 min, o mesmo que REVER_APOS_ERRO:
+    # o cartão não pode entrar na fila antes de vencer e aí não andar ao acertar.
+    _responder(agenda, True, 0)
+    _responder(agenda, False, DIA)
+    _responder(agenda, True, DIA + REVER_APOS_ERRO)
+    _responder(agenda, False, 2 * DIA + REVER_APOS_ERRO)
+    errou_em = 2 * DIA + REVER_APOS_ERRO
+    assert _cartao(agenda)[2] == 2
+    assert agenda.proximos("ana", 6, agora=errou_em + MINUTO) == []
+    assert agenda.estatisticas("ana", agora=errou_em + MINUTO)["vencidos"] == 0
+
+    venceu = errou_em + REVER_APOS_ERRO
+    assert agenda.proximos("ana", 6, agora=venceu) == [PAR]
+    _responder(agenda, True, venceu)
+    assert _cartao(agenda)[:2] == (1, 1.0)
+    assert agenda.estatisticas("ana", agora=venceu + MINUTO)["vencidos"] == 0
+
+def test_fila_poe_os_mais_errados_primeiro(agenda):
+    outro = ("Publicidade", "Os atos devem ser transparentes e acessíveis.")
+    _responder(agenda, False, 0)
+    _responder(agenda, False, REVER_APOS_ERRO)  # segundo lapso de PAR
+    _responder(agenda, False, REVER_APOS_ERRO, par=outro)
+    # Os dois vencidos em 2 * REVER_APOS_ERRO; PAR tem mais lapsos
+    assert agenda.proximos("ana", 6, agora=3 * REVER_APOS_ERRO)[0] == PAR
+
+def test_cartoes_separados_por_aluno(agenda):
+    _responder(agenda, False, 0)
+    assert agenda.estatisticas("bia", agora=DIA) == {"cartoes": 0, "vencidos": 0}
@@ -0,0 +1,37 @@
+from collections import deque
+from rodadas import lembrar, ordem_rodadas, proxima_rodada
+
+def test_rodadas_cobrem_o_lote_sem_repetir():
+    ordem = ordem_rodadas([f"T{i}" for i in range(14)], semente=7)
+    vistos, cursor = [], 0
+    while True:
+        indices, cursor = proxima_rodada(ordem, cursor, 6, 4)
+        if not indices:
+            break
+        vistos += indices
+    # 6 + 6; os 2 que sobram não dão uma rodada mínima de 4
+    assert len(vistos) == 12 and len(set(vistos)) == 12
+    assert cursor == 12
+
+def test_ultima_rodada_pode_vir_menor():
+    ordem = list(range(10))
+    assert proxima_rodada(ordem, 6, 6, 4) == ([6, 7, 8, 9], 10)
+    assert proxima_rodada(ordem, 10, 6, 4) == ([], 10)
+
+def test_ordem_e_uma_permutacao_reproduzivel():
+    termos = [f"T{i}" for i in range(20)]
+    assert ordem_rodadas(termos, 1) == ordem_rodadas(termos, 1)
+    assert sorted(ordem_rodadas(termos, 1)) == list(range(20))
+
+def test_termos_recentes_ficam_no_fim():
+    termos = ["Legalidade", "Moralidade", "Publicidade", "Eficiência"]
+    recentes = deque(maxlen=10)
+    lembrar(recentes, ["Moralidade", "Eficiência"])
+    ordem = ordem_rodadas(termos, semente=3, recentes=recentes)
+    assert {termos[i] for i in ordem[-2:]} == {"Moralidade", "Eficiência"}
+
+def test_recentes_comparados_sem_acento_e_caixa():
+    recentes = deque(maxlen=10)
+    lembrar(recentes, ["EFICIÊNCIA"])
+    ordem = ordem_rodadas(["Eficiencia", "Legalidade"], semente=0, recentes=recentes)
+    assert ordem[-1] == 0
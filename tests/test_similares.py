@@ -0,0 +1,51 @@
+import pytest
+from similares import filtrar_quase_iguais, quase_igual
+
+# Pares de contraste: definições que diferem por uma palavra de polaridade ou um prefixo
+CONTRASTES = [
+    [("Nulidade absoluta", "Vício insanável que não admite convalidação."),
+     ("Nulidade relativa", "Vício sanável que admite convalidação.")],
+    [("Ato vinculado", "Ato praticado sem margem de escolha do administrador."),
+     ("Ato discricionário", "Ato praticado com margem de escolha do administrador.")],
+    [("Competência exclusiva", "Atribuída a um só ente, não admite delegação."),
+     ("Competência privativa", "Atribuída a um só ente, admite delegação.")],
+    [("Competência exclusiva", "Indelegável, atribuída a um único ente."),
+     ("Competência privativa", "Delegável, atribuída a um único ente.")],
+    [("Prescrição", "Perda da pretensão pelo decurso do prazo."),
+     ("Decadência", "Perda do direito pelo decurso do prazo.")],
+]
+
+@pytest.mark.parametrize("pares", CONTRASTES)
+def test_pares_de_contraste_ficam(pares):
+    assert filtrar_quase_iguais(pares) == pares
+    assert not quase_igual(pares[1], pares[:1])
+
+def test_termo_quase_igual_sai():
+    pares = [("Princípio da Legalidade", "A administração só age conforme a lei."),
+             ("Legalidade", "Só é permitido fazer o que a lei autoriza."),
+             ("Moralidade", "Ética na administração.")]
+    assert [t for t, _ in filtrar_quase_iguais(pares)] == ["Princípio da Legalidade", "Moralidade"]
+
+def test_conceito_quase_literal_sai_mesmo_com_termos_diferentes():
+    pares = [("Publicidade", "Dever de divulgar os atos oficiais para conhecimento público."),
+             ("Transparência", "Dever de divulgar os atos oficiais para o conhecimento do público.")]
+    assert filtrar_quase_iguais(pares) == pares[:1]
+    assert quase_igual(pares[1], pares[:1])
+
+def test_conceito_parecido_sai_quando_os_termos_tambem_sao():
+    pares = [("Lei 8.112", "Regime jurídico dos servidores públicos civis da União."),
+             ("Lei n. 8.112/90", "Regime jurídico dos servidores civis da União."),
+             ("Lei 8.666", "Licitações e contratos.")]
+    assert [t for t, _ in filtrar_quase_iguais(pares)] == ["Lei 8.112", "Lei 8.666"]
+
+def test_numero_distingue_termos():
+    pares = [("Lei 8.112", "Servidores."), ("Lei 8.666", "Licitações.")]
+    assert filtrar_quase_iguais(pares) == pares
+
+def test_para_em_max_pares_e_vale_entre_blocos():
+    pares = [(f"Termo {chr(65 + i % 26)}{i // 26}", f"Conceito próprio número {i} sobre {chr(65 + i % 26)}") for i in range(300)]
+    pares.append(("Termo A0", "Conceito próprio número 0 sobre A"))  # repete o primeiro, em outro bloco
+    mantidos = filtrar_quase_iguais(pares)
+    assert ("Termo A0", "Conceito próprio número 0 sobre A") in mantidos
+    assert len(mantidos) < len(pares)
+    assert len(filtrar_quase_iguais(pares, 5)) == 5
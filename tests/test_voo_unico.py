@@ -0,0 +1,95 @@
+import threading
+import pytest
+from voo_unico import EsperaEsgotada, LiderInterrompido, VooUnico
+
+def _esperar_lider(voo, chave, fn, **kw):
+    """Roda voo.executar numa thread e retorna (thread, saida) com resultado ou erro."""
+    saida = {}
+
+    def rodar():
+        try:
+            saida["resultado"] = voo.executar(chave, fn, **kw)
+        except BaseException as e:
+            saida["erro"] = e
+
+    t = threading.Thread(target=rodar)
+    t.start()
+    return t, saida
+
+def test_quem_espera_recebe_o_resultado_do_lider():
+    voo, liberar, chamadas = VooUnico(), threading.Event(), []
+
+    def lider():
+        chamadas.append(1)
+        liberar.wait(5)
+        return "deck"
+
+    t, saida = _esperar_lider(voo, "k", lider)
+    esperando = threading.Event()
+    t2, saida2 = _esperar_lider(voo, "k", lambda: pytest.fail("não devia rodar"), ao_esperar=esperando.set)
+    assert esperando.wait(5)
+    liberar.set()
+    t.join(5); t2.join(5)
+    assert saida["resultado"] == ("deck", True)
+    assert saida2["resultado"] == ("deck", False)
+    assert chamadas == [1]
+    assert voo.em_andamento() == 0
+
+def test_quem_espera_recebe_o_erro_do_lider():
+    voo, liberar = VooUnico(), threading.Event()
+
+    def lider():
+        liberar.wait(5)
+        raise ValueError("falhou")
+
+    t, saida = _esperar_lider(voo, "k", lider)
+    esperando = threading.Event()
+    t2, saida2 = _esperar_lider(voo, "k", lambda: None, ao_esperar=esperando.set)
+    assert esperando.wait(5)
+    liberar.set()
+    t.join(5); t2.join(5)
+    assert isinstance(saida["erro"], ValueError)
+    assert saida2["erro"] is saida["erro"]
+
+def test_timeout_do_proprio_lider_nao_vira_espera_esgotada():
+    voo, liberar = VooUnico(), threading.Event()
+
+    def lider():
+        liberar.wait(5)
+        raise TimeoutError("prazo do Gemini")
+
+    t, _ = _esperar_lider(voo, "k", lider)
+    esperando = threading.Event()
+    t2, saida2 = _esperar_lider(voo, "k", lambda: None, timeout=5, ao_esperar=esperando.set)
+    assert esperando.wait(5)
+    liberar.set()
+    t.join(5); t2.join(5)
+    assert type(saida2["erro"]) is TimeoutError
+
+def test_espera_esgotada_sem_parar_o_lider():
+    voo, liberar = VooUnico(), threading.Event()
+    t, saida = _esperar_lider(voo, "k", lambda: liberar.wait(5) and "deck")
+    while not voo.em_andamento():
+        pass
+    with pytest.raises(EsperaEsgotada):
+        voo.executar("k", lambda: None, timeout=0.05)
+    liberar.set()
+    t.join(5)
+    assert saida["resultado"] == ("deck", True)
+
+def test_lider_interrompido_libera_quem_espera_com_erro_comum():
+    voo, liberar = VooUnico(), threading.Event()
+
+    def lider():
+        liberar.wait(5)
+        raise KeyboardInterrupt  # como o rerun/stop do Streamlit: BaseException
+
+    t, saida = _esperar_lider(voo, "k", lider)
+    esperando = threading.Event()
+    t2, saida2 = _esperar_lider(voo, "k", lambda: None, ao_esperar=esperando.set)
+    assert esperando.wait(5)
+    liberar.set()
+    t.join(5); t2.join(5)
+    assert isinstance(saida["erro"], KeyboardInterrupt)
+    assert isinstance(saida2["erro"], LiderInterrompido)
+    assert voo.em_andamento() == 0
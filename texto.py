@@ -0,0 +1,13 @@
+# texto.py
+import re, unicodedata
+
+# -------------------- Normalização de texto --------------------
+def limpar_texto(s: str) -> str:
+    s = (s or "").strip()
+    s = re.sub(r"\s+", " ", s)
+    return s
+
+def normalizar_pergunta(s: str) -> str:
+    # Sem diferença de caixa nem de acentos: "Princípios" == "principios"
+    s = unicodedata.normalize("NFKD", limpar_texto(s).casefold())
+    return "".join(ch for ch in s if not unicodedata.combining(ch))
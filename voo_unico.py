@@ -0,0 +1,65 @@
+# voo_unico.py
+import threading
+from concurrent.futures import Future
+
+# -------------------- Voo único (coalescência de chamadas iguais) --------------------
+# Quando várias sessões pedem o mesmo deck ao mesmo tempo (turma inteira clicando
+# em "Gerar Desafio" na mesma pergunta), só a primeira chama o Gemini; as outras
+# esperam o mesmo Future e recebem o mesmo resultado (ou a mesma exceção).
+# A chave sai do registro assim que o líder termina: chamadas posteriores não
+# reaproveitam resultado velho (para isso existe o cache).
+
+class EsperaEsgotada(TimeoutError):
+    """O líder não terminou dentro do prazo de quem estava esperando."""
+    motivo = "espera_coalescida"
+
+class LiderInterrompido(RuntimeError):
+    """O líder foi interrompido (rerun/stop da sessão dele) antes de terminar."""
+    motivo = "lider_interrompido"
+
+class VooUnico:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._voos = {}  # chave -> Future
+
+    def executar(self, chave, fn, timeout: float | None = None, ao_esperar=None):
+        """
+        Executa fn() uma vez por chave entre chamadas simultâneas.
+        Retorna (resultado, lider): lider=False quando o resultado veio de outra chamada.
+        Quem espera chama ao_esperar() antes de bloquear e desiste após `timeout`
+        segundos (EsperaEsgotada); o líder segue.
+        """
+        with self._lock:
+            fut = self._voos.get(chave)
+            lider = fut is None
+            if lider:
+                fut = self._voos[chave] = Future()
+        if not lider:
+            if ao_esperar:
+                ao_esperar()
+            try:
+                return fut.result(timeout), False
+            except TimeoutError:
+                if fut.done():
+                    raise  # o próprio líder falhou com timeout
+                raise EsperaEsgotada(f"Geração igual em andamento não terminou em {timeout:.0f}s") from None
+
+        try:
+            resultado = fn()
+        except BaseException as e:
+            # O rerun/stop do Streamlit (BaseException) também interrompe o líder; quem
+            # espera é liberado com um erro comum, não com o controle de fluxo da outra sessão
+            self._encerrar(chave, fut)
+            fut.set_exception(e if isinstance(e, Exception) else LiderInterrompido("A geração igual foi interrompida"))
+            raise
+        self._encerrar(chave, fut)
+        fut.set_result(resultado)
+        return resultado, True
+
+    def _encerrar(self, chave, fut):
+        with self._lock:
+            if self._voos.get(chave) is fut:
+                del self._voos[chave]
+
+    def em_andamento(self) -> int:
+        return len(self._voos)